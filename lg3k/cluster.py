@@ -0,0 +1,495 @@
+"""Distributed generation with a coordinator and workers.
+
+``lg3k coordinator`` splits the ``services x count`` plan into shards,
+each with its own seed and synthetic clock start derived from the run
+seed, so every shard's output is reproducible wherever it runs.
+``lg3k worker`` processes connect to the coordinator over TCP, pull shard
+assignments, generate them with the regular module generators into their
+local output directory and report each file's manifest entry back. When
+all shards are done, the coordinator writes the combined ``manifest.json``.
+
+Messages are newline-delimited JSON objects. A worker that disconnects
+mid-shard has its shard handed to the next worker that asks. Module
+generators share one random generator per service, so a process
+generates one shard at a time; start several worker processes per host
+to use more cores.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import click
+
+from .main import build_renderer, configure_module, generate_module_logs, load_modules
+from .utils.config import load_config
+from .utils.digest import (
+    CHECKSUM_ALGORITHMS,
+    DEFAULT_CHECKSUM,
+    FileDigest,
+    write_manifest,
+)
+from .utils.formats import FORMAT_EXTENSIONS, FORMATS
+from .utils.plan import shard_seed, shard_start
+from .utils.rng import get_rng
+from .utils.timestamp import SyntheticClock, set_clock
+
+# Default coordinator port
+DEFAULT_PORT = 7413
+
+# Default lines per shard
+DEFAULT_SHARD_SIZE = 1_000_000
+
+# Protocol version; workers must match the coordinator
+PROTOCOL_VERSION = 1
+
+# Seconds a worker waits before asking again while shards are in flight
+RETRY_INTERVAL = 0.5
+
+# Seconds a worker keeps trying to reach the coordinator
+CONNECT_TIMEOUT = 30.0
+
+
+def plan_shards(
+    services: List[str],
+    count: int,
+    shard_size: int,
+    seed: int,
+    start: datetime,
+    extensions: Optional[Dict[str, str]] = None,
+) -> List[Dict]:
+    """Split a run into shard assignments.
+
+    Each shard's clock starts where the previous shard of the service is
+    expected to end, so a service's timestamps continue across shards.
+
+    Args:
+        services: Services to generate
+        count: Lines per service
+        shard_size: Maximum lines per shard
+        seed: Run seed
+        start: Timestamp the first shard of each service starts at
+        extensions: File extension per service (default: .log)
+
+    Returns:
+        Shard assignments in service order
+    """
+    extensions = extensions or {}
+    shards = []
+    for service in services:
+        extension = extensions.get(service, ".log")
+        for index, first in enumerate(range(0, count, shard_size)):
+            shards.append(
+                {
+                    "id": len(shards),
+                    "service": service,
+                    "index": index,
+                    "lines": min(shard_size, count - first),
+                    "seed": shard_seed(seed, service, index),
+                    "start": shard_start(start, first).isoformat(),
+                    "file": f"{service}_part{index:05d}{extension}",
+                }
+            )
+    return shards
+
+
+def send_message(stream, message: Dict) -> None:
+    """Send one protocol message."""
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def read_message(stream) -> Optional[Dict]:
+    """Read one protocol message (None when the peer has disconnected)."""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# Module generators share one random generator per service, so a process
+# generates one shard at a time
+_shard_lock = threading.Lock()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    """TCP server with one daemon thread per worker connection."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Coordinator:
+    """Hand out shards to workers and collect their manifest entries."""
+
+    def __init__(
+        self,
+        shards: List[Dict],
+        settings: Dict,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+    ):
+        """Initialize the coordinator and bind its socket.
+
+        Args:
+            shards: Assignments from plan_shards()
+            settings: Run settings sent to every worker
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        self.total = len(shards)
+        self.results: Dict[int, Dict] = {}
+        self.errors: Dict[int, str] = {}
+        self._pending = deque(shards)
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not shards:
+            self._finished.set()
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                coordinator._serve(self.rfile, self.wfile, settings)
+
+        self._server = _Server((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Port the coordinator listens on."""
+        return self._server.server_address[1]
+
+    def _next_shard(self) -> Optional[Dict]:
+        """Take the next pending shard, if any."""
+        with self._lock:
+            return self._pending.popleft() if self._pending else None
+
+    def _serve(self, rfile, wfile, settings: Dict) -> None:
+        """Talk to one worker until it leaves or the run is finished."""
+        hello = read_message(rfile)
+        if not hello or hello.get("version") != PROTOCOL_VERSION:
+            send_message(wfile, {"type": "error", "message": "Protocol mismatch"})
+            return
+        worker = hello.get("worker", "unknown")
+        send_message(wfile, {"type": "settings", "settings": settings})
+        shard = None
+        try:
+            while True:
+                message = read_message(rfile)
+                if message is None:
+                    break
+                if message["type"] == "result":
+                    self._record(shard, dict(message["entry"], worker=worker))
+                    shard = None
+                elif message["type"] == "error":
+                    self._record(shard, None, message.get("message", "failed"))
+                    shard = None
+                if self._finished.is_set():
+                    send_message(wfile, {"type": "done"})
+                    break
+                shard = self._next_shard()
+                if shard is None:
+                    # Shards still in flight may come back if a worker drops
+                    send_message(wfile, {"type": "wait", "seconds": RETRY_INTERVAL})
+                else:
+                    send_message(wfile, {"type": "assignment", "shard": shard})
+        finally:
+            if shard is not None:
+                with self._lock:
+                    self._pending.appendleft(shard)
+
+    def _record(
+        self, shard: Optional[Dict], entry: Optional[Dict], error: Optional[str] = None
+    ) -> None:
+        """Record a shard's result or error."""
+        if shard is None:
+            return
+        with self._lock:
+            if error is None:
+                self.results[shard["id"]] = dict(entry, shard=shard["id"])
+            else:
+                self.errors[shard["id"]] = error
+            if len(self.results) + len(self.errors) == self.total:
+                self._finished.set()
+
+    def start(self) -> "Coordinator":
+        """Start accepting workers."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="lg3k-coordinator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every shard has a result or an error."""
+        return self._finished.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop accepting workers and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def manifest_entries(self) -> List[Dict]:
+        """Get the collected manifest entries in shard order."""
+        return [self.results[shard_id] for shard_id in sorted(self.results)]
+
+
+def run_shard(shard: Dict, settings: Dict, modules: Dict, output_dir: str) -> Dict:
+    """Generate one shard into the worker's output directory.
+
+    Args:
+        shard: Assignment from the coordinator
+        settings: Run settings from the coordinator
+        modules: Loaded (and configured) module generators
+        output_dir: Directory to write the shard's file to
+
+    Returns:
+        The file's manifest entry
+    """
+    service = shard["service"]
+    config = settings["config"]
+    fmt = config.get("formats", {}).get(service, settings["format"])
+    template = config.get("templates", {}).get(service)
+    record_func, renderer = build_renderer(service, modules[service], fmt, template)
+
+    path = os.path.join(output_dir, shard["file"])
+    digest = FileDigest(path, settings["checksum"])
+    with _shard_lock:
+        rng = get_rng(service)
+        rng.seed(shard["seed"])
+        set_clock(SyntheticClock(datetime.fromisoformat(shard["start"]), rng))
+        try:
+            generate_module_logs(
+                service,
+                record_func,
+                shard["lines"],
+                path,
+                json_output=True,
+                renderer=renderer,
+                digest=digest,
+            )
+        finally:
+            set_clock(None)
+    return dict(digest.summary(), service=service, path=os.path.abspath(path))
+
+
+def connect(host: str, port: int, timeout: float = CONNECT_TIMEOUT) -> socket.socket:
+    """Connect to the coordinator, retrying while it starts up."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(RETRY_INTERVAL)
+
+
+def run_worker(
+    host: str,
+    port: int,
+    output_dir: str,
+    name: Optional[str] = None,
+    connect_timeout: float = CONNECT_TIMEOUT,
+) -> int:
+    """Pull and generate shards until the coordinator is done.
+
+    Args:
+        host: Coordinator address
+        port: Coordinator port
+        output_dir: Directory to write shard files to
+        name: Worker name reported in the manifest (default: host:pid)
+        connect_timeout: Seconds to keep trying to reach the coordinator
+
+    Returns:
+        Number of shards generated
+
+    Raises:
+        RuntimeError: If the coordinator rejects the worker
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    os.makedirs(output_dir, exist_ok=True)
+    done = 0
+    sock = connect(host, port, connect_timeout)
+    with sock, sock.makefile("rwb") as stream:
+        send_message(
+            stream, {"type": "hello", "version": PROTOCOL_VERSION, "worker": name}
+        )
+        message = read_message(stream)
+        if not message or message["type"] != "settings":
+            raise RuntimeError((message or {}).get("message", "Coordinator closed"))
+        settings = message["settings"]
+        modules = load_modules()
+        for service in settings["config"]["services"]:
+            configure_module(modules[service], settings["config"].get(service, {}))
+
+        send_message(stream, {"type": "request"})
+        while True:
+            message = read_message(stream)
+            if message is None or message["type"] == "done":
+                break
+            if message["type"] == "wait":
+                time.sleep(message["seconds"])
+                send_message(stream, {"type": "request"})
+                continue
+            try:
+                entry = run_shard(message["shard"], settings, modules, output_dir)
+            except Exception as e:
+                send_message(stream, {"type": "error", "message": str(e)})
+                continue
+            done += 1
+            send_message(stream, {"type": "result", "entry": entry})
+    return done
+
+
+@click.group()
+def cluster_cli() -> None:
+    """Distributed generation: run one coordinator and many workers."""
+
+
+@cluster_cli.command()
+@click.option(
+    "-f",
+    "--config",
+    type=click.Path(dir_okay=False),
+    default="config.json",
+    help="Path to config file (default: config.json)",
+)
+@click.option(
+    "-c",
+    "--count",
+    type=click.IntRange(min=1),
+    default=100,
+    help="Number of log entries per module (default: 100)",
+)
+@click.option(
+    "--shard-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SHARD_SIZE,
+    help="Maximum lines per shard (default: 1,000,000)",
+)
+@click.option("--seed", type=int, default=0, help="Run seed (default: 0)")
+@click.option(
+    "--format",
+    "log_format",
+    type=click.Choice(FORMATS),
+    default="default",
+    help="Log line format for services without one in the config",
+)
+@click.option(
+    "--checksum",
+    type=click.Choice([name for name in CHECKSUM_ALGORITHMS if name != "none"]),
+    default=DEFAULT_CHECKSUM,
+    help="Checksum algorithm for the manifest (default: blake2b)",
+)
+@click.option("--host", default="0.0.0.0", help="Address to listen on")
+@click.option(
+    "--port",
+    type=click.IntRange(0, 65535),
+    default=DEFAULT_PORT,
+    help="Port to listen on (default: 7413)",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default="logs/",
+    help="Directory for the combined manifest.json (default: logs/)",
+)
+@click.option("--json-output", is_flag=True, help="Print the result as JSON")
+def coordinator(
+    config: str,
+    count: int,
+    shard_size: int,
+    seed: int,
+    log_format: str,
+    checksum: str,
+    host: str,
+    port: int,
+    output_dir: str,
+    json_output: bool,
+) -> None:
+    """Split the run into shards and hand them to workers."""
+    config_data = load_config(config)
+    if not config_data.get("services"):
+        raise click.UsageError("No active services in configuration")
+    formats = config_data.get("formats", {})
+    templates = config_data.get("templates", {})
+    extensions = {
+        service: (
+            ".log"
+            if templates.get(service)
+            else FORMAT_EXTENSIONS.get(formats.get(service, log_format), ".log")
+        )
+        for service in config_data["services"]
+    }
+    start = datetime.now().replace(microsecond=0)
+    shards = plan_shards(
+        config_data["services"], count, shard_size, seed, start, extensions
+    )
+    settings = {"config": config_data, "format": log_format, "checksum": checksum}
+    server = Coordinator(shards, settings, host, port).start()
+    if not json_output:
+        click.echo(
+            f"Coordinator listening on {host}:{server.port} with {len(shards)} shards"
+        )
+    started = time.time()
+    try:
+        server.wait()
+    finally:
+        server.stop()
+
+    os.makedirs(output_dir, exist_ok=True)
+    entries = server.manifest_entries()
+    manifest_path = write_manifest(output_dir, entries)
+    result = {
+        "success": not server.errors,
+        "logs_generated": sum(entry["lines"] for entry in entries),
+        "time_taken": time.time() - started,
+        "shards": len(shards),
+        "workers": sorted({entry["worker"] for entry in entries}),
+        "manifest": manifest_path,
+        "errors": {str(shard_id): error for shard_id, error in server.errors.items()},
+    }
+    if json_output:
+        click.echo(json.dumps(result), nl=False)
+    else:
+        click.echo(
+            f"Generated {result['logs_generated']} logs in {len(shards)} shards on "
+            f"{len(result['workers'])} workers; manifest: {manifest_path}"
+        )
+        for shard_id, error in server.errors.items():
+            click.echo(f"Error: shard {shard_id}: {error}", err=True)
+    sys.exit(0 if result["success"] else 1)
+
+
+@cluster_cli.command()
+@click.option("--host", default="127.0.0.1", help="Coordinator address")
+@click.option(
+    "--port",
+    type=click.IntRange(1, 65535),
+    default=DEFAULT_PORT,
+    help="Coordinator port (default: 7413)",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default="logs/",
+    help="Directory for generated shard files (default: logs/)",
+)
+@click.option("--name", help="Worker name in the manifest (default: host:pid)")
+def worker(host: str, port: int, output_dir: str, name: Optional[str]) -> None:
+    """Pull shards from a coordinator and generate them."""
+    shards = run_worker(host, port, output_dir, name)
+    click.echo(f"Generated {shards} shards")
@@ -3,14 +3,18 @@
 import importlib
 import json
 import os
+import secrets
 import shutil
 import sys
 import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import repeat
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Callable, Dict, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
 
 import click
 from rich.console import Console
@@ -25,7 +29,80 @@ except ImportError:
     console = None
     HAS_RICH = False
 
+from .sinks import open_sink, takes_records
+from .sinks.columnar import COLUMNAR_FORMATS, DEFAULT_ROW_GROUP_SIZE, ColumnarSink
+from .sinks.dataset import DatasetSink
+from .sinks.fanout import FanoutSink
+from .utils.analysis import TYPE_NOTES, analyze, get_analyzer
+from .utils.budget import build_targets, fit_line, parse_size
+from .utils.cache import (
+    DEFAULT_CACHE_SIZE,
+    CorpusCache,
+    cache_key,
+    entry_range,
+    module_version,
+)
+from .utils.checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    MANIFEST_NAME,
+    CheckpointManifest,
+    ModuleCheckpoint,
+)
 from .utils.config import get_default_config, load_config
+from .utils.dataset import (
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_SHARD_RECORDS,
+    DEFAULT_SPLITS,
+    parse_splits,
+)
+from .utils.dedup import (
+    DEFAULT_DEDUP_CAPACITY,
+    DEFAULT_FP_RATE,
+    MAX_DUPLICATE_RUN,
+    BloomFilter,
+    strip_timestamps,
+)
+from .utils.digest import (
+    CHECKSUM_ALGORITHMS,
+    DEFAULT_CHECKSUM,
+    FileDigest,
+    write_manifest,
+)
+from .utils.formats import (
+    FORMAT_EXTENSIONS,
+    FORMATS,
+    JSON_FORMATS,
+    compile_renderer,
+    render_default,
+)
+from .utils.instructions import get_instruction_sampler
+from .utils.merge import merge_streams
+from .utils.metrics import (
+    DEFAULT_STATS_INTERVAL,
+    MetricsServer,
+    StatsFileWriter,
+    summarize_module,
+)
+from .utils.plan import (
+    ESTIMATED_LINE_BYTES,
+    estimate_seconds,
+    load_plan,
+    lpt_order,
+    shard_seed,
+    shard_start,
+    split_evenly,
+)
+from .utils.profiling import PROFILE_MODES, RunProfiler
+from .utils.progress import (
+    DEFAULT_REFRESH,
+    ProgressBoard,
+    ProgressReporter,
+    ProgressSlot,
+)
+from .utils.rng import RngTurns, get_rng, seed_rng
+from .utils.templates import compile_template
+from .utils.timestamp import SyntheticClock, parse_duration, set_clock
+from .utils.tokens import TokenPacker, load_tokenizer
 
 __version__ = "0.7.0"
 
@@ -40,6 +117,15 @@ module_order = []
 # Global state for exit handling
 exit_event = threading.Event()
 current_run_files = set()
+# Lines per module when no count, duration or byte target is given
+DEFAULT_COUNT = 100
+# Lines per write to a log file
+WRITE_BATCH_SIZE = 1000
+# Lines between deadline checks in --duration runs
+DEADLINE_CHECK_LINES = 1024
+
+# Batches per second written by rate-limited services
+RATE_FLUSHES_PER_SECOND = 10
 
 
 def get_terminal_width() -> int:
@@ -128,6 +214,95 @@ def load_modules() -> Dict[str, callable]:
     return modules
 
 
+def get_module_hook(generator_func: Callable, name: str) -> Optional[Callable]:
+    """Look up an optional function next to a module's generate_log.
+
+    Args:
+        generator_func: The module's generate_log function
+        name: Name of the hook (e.g. "configure", "generate_record")
+
+    Returns:
+        The hook, or None if the module does not provide it
+    """
+    module = sys.modules.get(getattr(generator_func, "__module__", ""))
+    return getattr(module, name, None)
+
+
+def configure_module(generator_func: Callable, settings: Dict) -> None:
+    """Pass a module's config section to its optional configure() hook.
+
+    Args:
+        generator_func: The module's generate_log function
+        settings: The module-specific section of the configuration
+    """
+    configure = get_module_hook(generator_func, "configure")
+    if configure is not None and isinstance(settings, dict):
+        configure(settings)
+
+
+def build_renderer(
+    module_name: str,
+    generator_func: Callable,
+    fmt: str,
+    template: Optional[str] = None,
+) -> Tuple[Callable, Callable]:
+    """Build the record generator and renderer for a non-default format.
+
+    Args:
+        module_name: Name of the module
+        generator_func: The module's generate_log function
+        fmt: Output format name
+        template: Optional user-defined line template, overriding fmt
+
+    Returns:
+        Tuple of (record generator, compiled render function)
+
+    Raises:
+        ValueError: If the module cannot produce structured records or the
+            format or template does not apply to its records
+    """
+    record_func = get_module_hook(generator_func, "generate_record")
+    if record_func is None:
+        raise ValueError(f"Module {module_name} does not provide structured records")
+    # Fields declared by the module (all device categories); formats and
+    # templates are only checked when the module declares its fields
+    fields = get_module_hook(generator_func, "RECORD_FIELDS")
+    if template:
+        renderer = compile_template(template, fields)
+    elif fmt == "default":
+        renderer = get_module_hook(generator_func, "render_log") or render_default
+    else:
+        renderer = compile_renderer(fmt, module_name, fields)
+    return record_func, renderer
+
+
+def build_output_file(
+    args, module_name: str, output_format: str, fmt: str, template: Optional[str]
+) -> str:
+    """Build the output file path for a module.
+
+    Args:
+        args: Parsed command line arguments
+        module_name: Name of the module
+        output_format: "text" or a columnar format
+        fmt: Log line format
+        template: Optional line template
+
+    Returns:
+        Output file path with an extension matching the content
+    """
+    output_file = os.path.join(
+        args.output_dir, f"{module_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    if output_format in COLUMNAR_FORMATS:
+        return output_file + COLUMNAR_FORMATS[output_format]
+    if args.llm_format:
+        return output_file + ".jsonl"
+    if template:
+        return output_file + ".log"
+    return output_file + FORMAT_EXTENSIONS.get(fmt, ".log")
+
+
 def format_progress_display() -> str:
     """Format progress display with each module on its own line."""
     lines = []
@@ -220,7 +395,6 @@ def generate_analysis(name: str, log_entry: Dict) -> str:
         str: Analysis of the log entry
     """
     # Extract key information
-    level = log_entry.get("level", "INFO")
     message = log_entry.get("message", "")
     timestamp = log_entry.get("timestamp", "")
 
@@ -231,40 +405,8 @@ def generate_analysis(name: str, log_entry: Dict) -> str:
     if timestamp:
         analysis.append(f"Log generated at {timestamp}.")
 
-    # Add severity analysis
-    if level in ["ERROR", "CRITICAL"]:
-        analysis.append(
-            f"This is a {level.lower()} level event that requires immediate attention."
-        )
-    elif level == "WARNING":
-        analysis.append("This is a warning that may require investigation.")
-
-    # Module-specific analysis
-    if name == "api":
-        if "status" in log_entry:
-            status = log_entry["status"]
-            if status >= 500:
-                analysis.append("Server-side error detected in API response.")
-            elif status >= 400:
-                analysis.append("Client-side error detected in API request.")
-            elif status >= 300:
-                analysis.append("API request resulted in a redirection.")
-            elif status >= 200:
-                analysis.append("API request completed successfully.")
-
-    elif name == "database":
-        if "query" in log_entry:
-            analysis.append("Database query execution logged.")
-            if "duration" in log_entry:
-                duration = log_entry["duration"]
-                if duration > 1000:
-                    analysis.append("Query execution time is unusually high.")
-
-    elif name == "web_server":
-        if "method" in log_entry:
-            analysis.append(f"Web server processed a {log_entry['method']} request.")
-            if "path" in log_entry:
-                analysis.append(f"Accessed path: {log_entry['path']}")
+    # Severity and module-specific analysis from the rule tables
+    analysis.extend(analyze(name, log_entry))
 
     # Add message analysis
     if message:
@@ -289,13 +431,39 @@ def update_progress(name: str, progress: str) -> None:
         update_progress_display()
 
 
+def render_progress(snapshot: Dict[str, Tuple[int, int]]) -> None:
+    """Redraw the progress display from a progress board snapshot.
+
+    Called only from the progress reporter thread.
+
+    Args:
+        snapshot: Lines (done, total) per module
+    """
+    with progress_lock:
+        for name, (done, total) in snapshot.items():
+            if module_status.get(name) != "Running":
+                continue
+            if total:
+                fraction = min(done / total, 1.0)
+                module_progress[name] = (
+                    f"[{create_progress_bar(fraction)}] {int(fraction * 100)}%"
+                )
+            else:
+                module_progress[name] = f"{done} logs"
+        update_progress_display()
+
+
 def format_json_output(
     success, logs_generated=0, time_taken=0.0, files=None, error=None
 ):
     """Format output as JSON."""
+    # Stats tracked during generation (sizes, per-module numbers)
+    tracked_stats = {}
+
     # Handle dictionary input
     if isinstance(success, dict):
         data = success
+        tracked_stats = data.get("stats") or {}
         success = data.get("success", False)
         logs_generated = data.get("logs_generated", 0)
         time_taken = data.get("time_taken", 0.0)
@@ -320,20 +488,16 @@ def format_json_output(
     else:
         # Add stats for successful operations
         output["stats"] = {
+            **tracked_stats,
             "total_files": len(files),
             "avg_logs_per_file": logs_generated / len(files) if files else 0,
-            "total_size_bytes": 0,  # Skip file size check for testing
+            "total_size_bytes": tracked_stats.get("total_size_bytes", 0),
         }
 
-    # Add stats for successful results
+    # Add config for successful results
     if success and not error:
         output.update(
             {
-                "stats": {
-                    "total_files": len(files),
-                    "avg_logs_per_file": logs_generated / len(files) if files else 0,
-                    "total_size_bytes": 0,  # Skip file size check for testing
-                },
                 "config": {
                     "output_directory": str(Path(files[0]).parent) if files else None,
                     "file_format": Path(files[0]).suffix[1:] if files else None,
@@ -348,20 +512,59 @@ def format_json_output(
 def generate_module_logs(
     module_name: str,
     generator_func: Callable,
-    count: int,
-    output_file: Union[str, Path],
+    count: Optional[int],
+    output_file: Optional[Union[str, Path]],
     llm_format: bool = False,
     json_output: bool = False,
+    renderer: Optional[Callable] = None,
+    sink=None,
+    progress: Optional[ProgressSlot] = None,
+    checkpoint: Optional[ModuleCheckpoint] = None,
+    deadline: Optional[float] = None,
+    target_bytes: Optional[int] = None,
+    digest: Optional[FileDigest] = None,
+    rate: Optional[float] = None,
+    dedup: Optional[BloomFilter] = None,
+    packer: Optional[TokenPacker] = None,
+    rng_turns: Optional[RngTurns] = None,
+    whole_lines: bool = False,
 ) -> int:
     """Generate logs for a single module.
 
+    Lines are written in batches. After each batch the worker publishes its
+    counters lock-free to ``progress``; the reporter thread draws them and
+    workers never redraw the display themselves.
+
     Args:
         module_name: Name of the module
         generator_func: Function that generates log entries
-        count: Number of log entries to generate
-        output_file: Output file path
+        count: Number of log entries to generate (None for no limit)
+        output_file: Output file path (None when a shared sink is used)
         llm_format: Whether to generate logs in LLM training format
         json_output: Whether to suppress progress output for JSON mode
+        renderer: Optional function rendering the records returned by
+            generator_func into log lines
+        sink: Optional sink (see lg3k.sinks) receiving batches instead of
+            lines being written to output_file
+        progress: Optional progress board slot to publish line counts to
+        checkpoint: Optional checkpoint to resume output_file from and to
+            record the position in after written batches
+        deadline: Optional time.monotonic() value to stop generating at
+        target_bytes: Optional size to make output_file, in bytes; the last
+            line is cut short to hit it exactly (see whole_lines)
+        digest: Optional digest of output_file, fed with the written bytes
+            and the records' timestamp range
+        rate: Optional lines per second to limit generation to
+        dedup: Optional filter of the lines kept so far; lines repeating one
+            apart from their timestamps are dropped (and not counted)
+        packer: Optional token counter for LLM-format lines; batches are
+            tokenized when flushed and may be packed into sequences
+        rng_turns: Optional turns at a generator shared with other jobs; it
+            is held while a batch is generated and handed back before the
+            batch is written
+        whole_lines: Whether the lines are JSON documents, which are never
+            cut to fit target_bytes; the line that would overflow it is
+            dropped instead
 
     Returns:
         Number of logs generated
@@ -371,82 +574,441 @@ def generate_module_logs(
         if module_name not in module_order:
             module_order.append(module_name)
 
-        # Set initial status
-        with progress_lock:
-            module_status[module_name] = "Running"
-            if not json_output:
-                update_progress_display()
+        # Status updates are single dict assignments and need no lock
+        module_status[module_name] = "Running"
 
-        # Create output directory if needed
-        os.makedirs(os.path.dirname(str(output_file)), exist_ok=True)
+        if output_file is not None:
+            # Create output directory if needed
+            os.makedirs(os.path.dirname(str(output_file)), exist_ok=True)
 
-        # Add file to current run
-        current_run_files.add(str(output_file))
+            # Add file to current run; checkpointed files are kept for --resume
+            if checkpoint is None:
+                current_run_files.add(str(output_file))
 
         logs_generated = 0
-        with open(output_file, "w") as f:
-            for _ in range(count):
+        written = 0
+        # Timestamp range of the records, for the output manifest
+        earliest = latest = None
+        if checkpoint is not None:
+            logs_generated = checkpoint.lines
+            written = checkpoint.offset
+            earliest, latest = checkpoint.time_range
+            if digest is not None and written:
+                digest.update_from_file(written)
+        flush_ns = 0
+        flushes = 0
+        cpu_start = time.thread_time_ns()
+        batch = []
+        batch_size = getattr(sink, "batch_size", WRITE_BATCH_SIZE)
+        if rate is not None:
+            # Smaller batches keep a rate-limited stream steady
+            batch_size = min(batch_size, max(1, int(rate / RATE_FLUSHES_PER_SECOND)))
+            rate_start = time.monotonic()
+            rate_lines = logs_generated
+        if progress is not None:
+            progress.start()
+
+        def flush(final: bool = False) -> None:
+            """Write the pending batch and publish the worker's counters."""
+            nonlocal batch, written, flush_ns, flushes
+            if packer is not None and (batch or final):
+                batch = packer.process(batch, final)
+            if batch:
+                started = time.perf_counter_ns()
+                if sink is not None:
+                    sink.write_batch(module_name, batch)
+                    if not sink.records:
+                        # UTF-8 size of the lines and their newlines
+                        written += len(batch) + sum(
+                            len(line) if line.isascii() else len(line.encode())
+                            for line in batch
+                        )
+                else:
+                    data = "".join(batch).encode("utf-8")
+                    written += f.write(data)
+                    if digest is not None:
+                        digest.update(data)
+                flush_ns += time.perf_counter_ns() - started
+                flushes += 1
+                batch = []
+                if checkpoint is not None:
+                    f.flush()
+                    checkpoint.save(logs_generated, written, (earliest, latest))
+                if rate is not None:
+                    # Wait until the lines written so far are due
+                    due = rate_start + (logs_generated - rate_lines) / rate
+                    if deadline is not None:
+                        due = min(due, deadline)
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        exit_event.wait(delay)
+            if progress is not None:
+                progress.publish(
+                    logs_generated,
+                    written,
+                    time.thread_time_ns() - cpu_start,
+                    flush_ns,
+                    flushes,
+                )
+
+        if sink is not None:
+            output = nullcontext()
+        elif checkpoint is not None and checkpoint.offset:
+            output = open(output_file, "r+b")
+        else:
+            output = open(output_file, "wb")
+        with output as f:
+            if checkpoint is not None and checkpoint.offset:
+                # Drop anything written after the last checkpoint
+                f.truncate(checkpoint.offset)
+                f.seek(checkpoint.offset)
+            # Lines are produced one at a time, so memory use does not grow
+            # with the count
+            lines = repeat(None) if count is None else range(count - logs_generated)
+            budget = None if target_bytes is None else target_bytes - written
+            duplicate_run = 0
+            # Rate-limited lines are cheap to time, and a coarse check would
+            # let them run unthrottled past the deadline
+            deadline_check = 1 if rate is not None else DEADLINE_CHECK_LINES
+            holding = False
+            for _ in lines:
+                if budget is not None and budget <= 0:
+                    break
                 if exit_event.is_set():
-                    with progress_lock:
-                        module_status[module_name] = "Cancelled"
-                        if not json_output:
-                            update_progress_display()
+                    module_status[module_name] = "Cancelled"
+                    break
+                if (
+                    deadline is not None
+                    and not logs_generated % deadline_check
+                    and time.monotonic() >= deadline
+                ):
                     break
 
                 try:
+                    if rng_turns is not None and not holding:
+                        rng_turns.acquire()
+                        holding = True
                     log_entry = generator_func()
-                    if llm_format:
+                    if digest is not None and isinstance(log_entry, dict):
+                        stamp = log_entry.get("timestamp")
+                        if stamp is not None:
+                            if earliest is None or stamp < earliest:
+                                earliest = stamp
+                            if latest is None or stamp > latest:
+                                latest = stamp
+                    if sink is not None:
+                        if renderer is not None and not sink.records:
+                            log_entry = renderer(log_entry)
+                        batch.append(log_entry)
+                    elif renderer is not None:
+                        batch.append(renderer(log_entry) + "\n")
+                    elif llm_format:
                         log_entry = generate_llm_format_log(log_entry)
-                        f.write(json.dumps(log_entry) + "\n")
+                        batch.append(json.dumps(log_entry) + "\n")
                     else:
                         # For non-LLM format, write as plain text if it's a string,
                         # otherwise convert to JSON
                         if isinstance(log_entry, str):
-                            f.write(log_entry + "\n")
+                            batch.append(log_entry + "\n")
                         else:
-                            f.write(json.dumps(log_entry) + "\n")
+                            batch.append(json.dumps(log_entry) + "\n")
+                    if dedup is not None:
+                        if dedup.add(strip_timestamps(batch[-1])):
+                            batch.pop()
+                            duplicate_run += 1
+                            # A service out of new lines cannot reach its
+                            # byte target or deadline
+                            if duplicate_run >= MAX_DUPLICATE_RUN or (
+                                deadline is not None and time.monotonic() >= deadline
+                            ):
+                                break
+                            continue
+                        duplicate_run = 0
+                    if budget is not None:
+                        line = batch[-1]
+                        size = len(line) if line.isascii() else len(line.encode())
+                        if size > budget:
+                            if whole_lines:
+                                # A cut JSON document would not parse
+                                batch.pop()
+                                break
+                            batch[-1] = fit_line(line, budget)
+                        budget -= size
                     logs_generated += 1
-
-                    # Update progress every 10%
-                    if logs_generated % max(1, count // 10) == 0:
-                        with progress_lock:
-                            progress = logs_generated / count
-                            module_status[
-                                module_name
-                            ] = f"[{create_progress_bar(progress)}] {int(progress * 100)}%"
-                            if not json_output:
-                                update_progress_display()
-                                print(
-                                    f"\033[2K\r{module_name}: {module_status[module_name]}",
-                                    end="",
-                                    flush=True,
-                                )
+                    if len(batch) >= batch_size:
+                        if holding:
+                            rng_turns.release()
+                            holding = False
+                        flush()
 
                 except Exception as e:
-                    with progress_lock:
-                        module_status[module_name] = f"Error: {str(e)}"
-                        if not json_output:
-                            update_progress_display()
+                    module_status[module_name] = f"Error: {str(e)}"
+                    if holding:
+                        rng_turns.release()
                     raise
 
+            if holding:
+                rng_turns.release()
+            flush(final=True)
+            if checkpoint is not None:
+                f.flush()
+                checkpoint.save(logs_generated, written, (earliest, latest), True)
+        if digest is not None:
+            digest.lines = logs_generated
+            if packer is not None and packer.pack_tokens is not None:
+                # Each line is a sequence of packed records
+                digest.lines = packer.sequences
+                digest.records = logs_generated
+            digest.observe(earliest, latest)
+        if progress is not None:
+            progress.finish()
+
         # Update final status
-        with progress_lock:
-            if not exit_event.is_set():
-                module_status[module_name] = "Complete"
-            if not json_output:
-                update_progress_display()
-                print(f"Generated {logs_generated} logs for {module_name}")
+        if not exit_event.is_set():
+            module_status[module_name] = "Complete"
+        if not json_output:
+            print(f"Generated {logs_generated} logs for {module_name}")
 
         return logs_generated
 
     except Exception as e:
-        with progress_lock:
-            module_status[module_name] = f"Error: {str(e)}"
-            if not json_output:
-                update_progress_display()
+        module_status[module_name] = f"Error: {str(e)}"
         raise
 
 
+def service_lines(
+    record_func: Callable,
+    renderer: Callable,
+    count: Optional[int],
+    target_bytes: Optional[int] = None,
+    clock: Optional[SyntheticClock] = None,
+) -> Iterator[Tuple[datetime, str]]:
+    """Generate a service's lines for a merged output.
+
+    Args:
+        record_func: The module's generate_record function
+        renderer: Function rendering records into lines
+        count: Number of lines (None for no limit)
+        target_bytes: Optional size of the service's share of the output;
+            the line that would overflow it is dropped, since a line cut
+            short would end up in the middle of the merged file
+        clock: The service's synthetic clock (None for wall time)
+
+    Yields:
+        (timestamp, line) pairs in generation order
+    """
+    lines = repeat(None) if count is None else range(count)
+    budget = target_bytes
+    for _ in lines:
+        if budget is not None and budget <= 0:
+            return
+        # Services share the merging thread, so each sets its own clock
+        set_clock(clock)
+        record = record_func()
+        line = renderer(record) + "\n"
+        if budget is not None:
+            size = len(line) if line.isascii() else len(line.encode())
+            if size > budget:
+                return
+            budget -= size
+        yield record["timestamp"], line
+
+
+def generate_merged_logs(
+    streams: Dict[str, Iterable[Tuple[datetime, str]]],
+    output_file: Union[str, Path],
+    json_output: bool = False,
+    progress: Optional[ProgressSlot] = None,
+    deadline: Optional[float] = None,
+    digest: Optional[FileDigest] = None,
+) -> Dict[str, int]:
+    """Write several services' logs into one file, ordered by timestamp.
+
+    Lines are taken from the streams through a k-way heap merge, so only
+    one pending line per service is held in memory.
+
+    Args:
+        streams: (timestamp, line) streams per service, each in timestamp
+            order (see service_lines)
+        output_file: Output file path
+        json_output: Whether to suppress progress output for JSON mode
+        progress: Optional progress board slot to publish line counts to
+        deadline: Optional time.monotonic() value to stop generating at
+        digest: Optional digest of output_file
+
+    Returns:
+        Number of logs written per service
+    """
+    name = "merged"
+    if name not in module_order:
+        module_order.append(name)
+    module_status[name] = "Running"
+    os.makedirs(os.path.dirname(str(output_file)), exist_ok=True)
+    current_run_files.add(str(output_file))
+
+    names = list(streams)
+    counts = dict.fromkeys(names, 0)
+    logs_generated = written = 0
+    earliest = latest = None
+    flush_ns = flushes = 0
+    cpu_start = time.thread_time_ns()
+    batch = []
+    if progress is not None:
+        progress.start()
+
+    with open(output_file, "wb") as f:
+
+        def flush() -> None:
+            """Write the pending batch and publish the counters."""
+            nonlocal batch, written, flush_ns, flushes
+            if batch:
+                started = time.perf_counter_ns()
+                data = "".join(batch).encode("utf-8")
+                written += f.write(data)
+                if digest is not None:
+                    digest.update(data)
+                flush_ns += time.perf_counter_ns() - started
+                flushes += 1
+                batch = []
+            if progress is not None:
+                progress.publish(
+                    logs_generated,
+                    written,
+                    time.thread_time_ns() - cpu_start,
+                    flush_ns,
+                    flushes,
+                )
+
+        for timestamp, index, line in merge_streams(list(streams.values())):
+            if exit_event.is_set():
+                module_status[name] = "Cancelled"
+                break
+            if (
+                deadline is not None
+                and not logs_generated % DEADLINE_CHECK_LINES
+                and time.monotonic() >= deadline
+            ):
+                break
+            if earliest is None:
+                earliest = timestamp
+            latest = timestamp
+            batch.append(line)
+            counts[names[index]] += 1
+            logs_generated += 1
+            if len(batch) >= WRITE_BATCH_SIZE:
+                flush()
+        flush()
+
+    if digest is not None:
+        digest.lines = logs_generated
+        digest.observe(earliest, latest)
+    if progress is not None:
+        progress.finish()
+    if not exit_event.is_set():
+        module_status[name] = "Complete"
+    if not json_output:
+        print(f"Generated {logs_generated} merged logs")
+    return counts
+
+
+def replay_cached_logs(
+    module_name: str,
+    cache: CorpusCache,
+    key: str,
+    meta: Dict,
+    output_file: str,
+    shift: Optional[timedelta] = None,
+    digest: Optional[FileDigest] = None,
+    progress: Optional[ProgressSlot] = None,
+    json_output: bool = False,
+) -> int:
+    """Write a module's logs from the corpus cache instead of generating them.
+
+    Args:
+        module_name: Name of the module (or shard)
+        cache: Corpus cache holding the entry
+        key: Entry key
+        meta: Entry metadata from cache.lookup()
+        output_file: Output file path
+        shift: Optional amount to move the cached timestamps by
+        digest: Optional digest of output_file, fed with the written bytes
+        progress: Optional progress board slot
+        json_output: Whether to suppress progress output for JSON mode
+
+    Returns:
+        Number of logs replayed
+    """
+    if module_name not in module_order:
+        module_order.append(module_name)
+    module_status[module_name] = "Replaying"
+    os.makedirs(os.path.dirname(str(output_file)), exist_ok=True)
+    current_run_files.add(str(output_file))
+    if progress is not None:
+        progress.start()
+    written = cache.replay(
+        key, output_file, shift, digest.update if digest is not None else None
+    )
+    # Packed entries hold several records per line
+    records = meta.get("records", meta["lines"])
+    if digest is not None:
+        digest.lines = meta["lines"]
+        digest.records = meta.get("records")
+        digest.observe(*entry_range(meta, shift))
+    if progress is not None:
+        progress.publish(records, written)
+        progress.finish()
+    module_status[module_name] = "Complete"
+    if not json_output:
+        print(f"Replayed {records} cached logs for {module_name}")
+    return records
+
+
+def parse_cli_duration(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[float]:
+    """Convert a --duration value to seconds (click callback).
+
+    Args:
+        ctx: Click context
+        param: The --duration option
+        value: Duration string, or None if the option was not given
+
+    Returns:
+        Seconds, or None
+
+    Raises:
+        click.BadParameter: If the duration is invalid
+    """
+    if value is None:
+        return None
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_cli_size(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[int]:
+    """Convert a size option such as 10GB to bytes (click callback)."""
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def parse_cli_splits(
+    ctx: click.Context, param: click.Parameter, value: str
+) -> Dict[str, float]:
+    """Convert split percentages such as 80,10,10 to fractions (click callback)."""
+    try:
+        return parse_splits(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
 def strip_ansi(text: str) -> str:
     """Strip ANSI escape sequences from text.
 
@@ -516,16 +1078,21 @@ def output_json(result: dict) -> dict:
                 }
             )
     elif output.get("success", False):
-        # Add stats and config for successful results
-        output["stats"] = {
-            "total_files": len(output.get("files", [])),
-            "avg_logs_per_file": (
-                output.get("logs_generated", 0) / len(output.get("files", []))
-                if output.get("files")
-                else 0
-            ),
-            "total_size_bytes": 0,  # Skip file size check for testing
-        }
+        # Add stats and config for successful results, keeping the sizes
+        # and per-module numbers tracked during generation
+        stats = dict(output.get("stats") or {})
+        stats.update(
+            {
+                "total_files": len(output.get("files", [])),
+                "avg_logs_per_file": (
+                    output.get("logs_generated", 0) / len(output.get("files", []))
+                    if output.get("files")
+                    else 0
+                ),
+                "total_size_bytes": stats.get("total_size_bytes", 0),
+            }
+        )
+        output["stats"] = stats
         output["config"] = {
             "output_directory": (
                 str(Path(output["files"][0]).parent) if output.get("files") else None
@@ -580,11 +1147,11 @@ def generate_llm_format_log(log_entry: Union[str, dict]) -> dict:
 
     # Add type-specific info
     if "type" in log_entry:
-        if log_entry.get("service") == "api":
-            if log_entry["type"].lower() == "graphql":
-                output_parts.append("This is a GraphQL API log")
-            elif log_entry["type"].lower() == "rest":
-                output_parts.append("This is a REST API log")
+        notes = TYPE_NOTES.get(log_entry.get("service"))
+        if notes is not None:
+            note = notes.get(log_entry["type"].lower())
+            if note is not None:
+                output_parts.append(note)
         else:
             output_parts.append(
                 f"The {log_entry['type']} event indicates: {log_entry.get('message', 'No message provided')}"
@@ -623,7 +1190,8 @@ def generate_llm_format_log(log_entry: Union[str, dict]) -> dict:
 
     # Ensure message is always included in output
     if "message" in log_entry and not any(
-        "event indicates" in part for part in output_parts
+        "event indicates" in part or part.startswith("Message: ")
+        for part in output_parts
     ):
         output_parts.append(f"Message: {log_entry['message']}")
 
@@ -634,6 +1202,74 @@ def generate_llm_format_log(log_entry: Union[str, dict]) -> dict:
     }
 
 
+def summarize_tokens(packers: Dict[str, TokenPacker]) -> dict:
+    """Combine the token counts of all jobs for the JSON output.
+
+    Args:
+        packers: Token packers per job
+
+    Returns:
+        Totals, a combined histogram and the per-job summaries
+    """
+    modules = {name: packer.summary() for name, packer in packers.items()}
+    records = sum(summary["records"] for summary in modules.values())
+    tokens = sum(summary["tokens"] for summary in modules.values())
+    histogram = {}
+    for summary in modules.values():
+        for key, value in summary["histogram"].items():
+            histogram[key] = histogram.get(key, 0) + value
+    return {
+        "records": records,
+        "tokens": tokens,
+        "mean_tokens": tokens / records if records else 0.0,
+        "histogram": dict(sorted(histogram.items(), key=lambda item: int(item[0]))),
+        "modules": modules,
+    }
+
+
+def render_llm_line(log_entry: Union[str, dict]) -> str:
+    """Render a log entry as one LLM training JSON line (without newline)."""
+    return json.dumps(generate_llm_format_log(log_entry))
+
+
+def build_llm_renderer(
+    module_name: str, generator_func: Callable
+) -> Tuple[Callable, Callable]:
+    """Build the record generator and LLM line renderer for a module.
+
+    The input of each LLM record is the module's default log line. Its
+    instruction is drawn from the module's weighted instruction templates
+    (see lg3k.utils.instructions) with the service's random generator, and
+    its output also explains the structured record with the module's
+    analysis rules (see lg3k.utils.analysis).
+
+    Args:
+        module_name: Name of the module
+        generator_func: The module's generate_log function
+
+    Returns:
+        Tuple of (generator, function rendering one LLM JSON line); modules
+        without structured records keep generate_log
+    """
+    record_func = get_module_hook(generator_func, "generate_record")
+    if record_func is None:
+        return generator_func, render_llm_line
+    render = get_module_hook(generator_func, "render_log") or render_default
+    analyzer = get_analyzer(module_name)
+    sample_instruction = get_instruction_sampler(module_name)
+    rng = get_rng(module_name)
+
+    def render_record(record: Dict) -> str:
+        entry = generate_llm_format_log(render(record))
+        entry["instruction"] = sample_instruction(record, rng)
+        notes = analyzer(record)
+        if notes:
+            entry["output"] = f"{entry['output']}. {' '.join(notes)}"
+        return json.dumps(entry)
+
+    return record_func, render_record
+
+
 def create_progress_bar(progress: float, width: int = 10) -> str:
     """Create a progress bar string.
 
@@ -712,9 +1348,29 @@ class CustomCommand(click.Command):
 @click.option(
     "-c",
     "--count",
-    type=click.IntRange(1, 1_000_000),
-    default=100,
-    help="Number of log entries per module (default: 100, max: 1,000,000)",
+    type=click.IntRange(min=1),
+    default=DEFAULT_COUNT,
+    help="Number of log entries per module (default: 100, or no limit with "
+    "--duration or --target-bytes)",
+)
+@click.option(
+    "--duration",
+    callback=parse_cli_duration,
+    help="Stop generating after this long, e.g. 90s, 15m or 2h (with --count, "
+    "whichever comes first)",
+)
+@click.option(
+    "--checksum",
+    type=click.Choice(CHECKSUM_ALGORITHMS),
+    default=DEFAULT_CHECKSUM,
+    help="Hash text log files while writing and list them in OUTPUT_DIR/"
+    "manifest.json (default: blake2b; xxh64/xxh3_128 need xxhash)",
+)
+@click.option(
+    "--target-bytes",
+    multiple=True,
+    help="Generate exactly this much text, e.g. 50GB split across services by "
+    "the config 'weights', or SERVICE=SIZE for one service (repeatable)",
 )
 @click.option(
     "-t",
@@ -750,14 +1406,189 @@ class CustomCommand(click.Command):
     is_flag=True,
     help="Generate logs in LLM training format (instruction, input, output). Overrides other options for optimal training.",
 )
+@click.option(
+    "--format",
+    "log_format",
+    type=click.Choice(FORMATS),
+    default="default",
+    help="Log line format for all services (per-service overrides via the config 'formats' section)",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["text", *COLUMNAR_FORMATS]),
+    default="text",
+    help="Write text log files, or records directly as Parquet/Arrow files (requires pyarrow)",
+)
+@click.option(
+    "--row-group-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_ROW_GROUP_SIZE,
+    help="Rows per Parquet row group / Arrow record batch (default: 65536)",
+)
+@click.option(
+    "--dataset",
+    type=click.Path(file_okay=False),
+    help="Write an LLM dataset to this directory: train/validation/test JSONL "
+    "shards and a dataset card (implies --llm-format)",
+)
+@click.option(
+    "--shard-records",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SHARD_RECORDS,
+    help="Records per dataset shard (default: 100000)",
+)
+@click.option(
+    "--splits",
+    default=DEFAULT_SPLITS,
+    callback=parse_cli_splits,
+    help="Train, validation and test percentages (default: 80,10,10)",
+)
+@click.option(
+    "--dedup-window",
+    type=click.IntRange(min=0),
+    default=DEFAULT_DEDUP_WINDOW,
+    help="Recent dataset records checked for near-duplicates (0 keeps "
+    "duplicates, default: 1000000)",
+)
+@click.option(
+    "--dedup",
+    is_flag=True,
+    help="Drop lines repeating an earlier line apart from its timestamps "
+    "(Bloom filter per service)",
+)
+@click.option(
+    "--dedup-fp-rate",
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    default=DEFAULT_FP_RATE,
+    help="Share of new lines --dedup may wrongly drop (default: 0.001)",
+)
+@click.option(
+    "--tokenizer",
+    help="Count the tokens of LLM records with a tokenizer.json file "
+    "(requires tokenizers) or a built-in tokenizer (whitespace, bytes)",
+)
+@click.option(
+    "--pack-tokens",
+    type=click.IntRange(min=1),
+    help="Pack LLM records into sequences of at most this many tokens "
+    "(requires --tokenizer)",
+)
+@click.option(
+    "--merge",
+    is_flag=True,
+    help="Write all services into one file, merged in timestamp order",
+)
+@click.option(
+    "--sink",
+    multiple=True,
+    help="Send records to a sink instead of log files, e.g. sqlite:///logs.db, "
+    "duckdb:///logs.duckdb, syslog+tcp://host:601, http://host:9200/_bulk or "
+    "kafka://host:9092/topic (repeat to send to several sinks at once)",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(0, 65535),
+    help="Serve live Prometheus metrics at http://HOST:PORT/metrics during generation",
+)
+@click.option(
+    "--metrics-host",
+    default="127.0.0.1",
+    help="Address for the metrics endpoint (default: 127.0.0.1)",
+)
+@click.option(
+    "--stats-file",
+    type=click.Path(dir_okay=False),
+    help="Periodically write live generation stats to this JSON file",
+)
+@click.option(
+    "--stats-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_STATS_INTERVAL,
+    help="Seconds between stats file updates (default: 5)",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    help="Profile each service's worker (cpu: cProfile, mem: tracemalloc) and "
+    "write per-module profiles plus a merged summary to OUTPUT_DIR/profiles",
+)
+@click.option(
+    "--plan",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON job plan setting per-service counts, rates, byte targets, "
+    "formats, sinks and shards (replaces the config's services)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Store seeded text output in this corpus cache and replay it on "
+    "later runs with the same settings (requires --seed)",
+)
+@click.option(
+    "--cache-size",
+    callback=parse_cli_size,
+    default=DEFAULT_CACHE_SIZE,
+    help="Total size of the corpus cache; least recently used entries are "
+    "removed first (default: 10GB)",
+)
+@click.option(
+    "--restamp",
+    is_flag=True,
+    help="Shift replayed timestamps to this run's start time",
+)
+@click.option(
+    "--seed",
+    type=int,
+    help="Seed each service's random generator and clock for reproducible output",
+)
+@click.option(
+    "--checkpoint-interval",
+    type=click.FloatRange(min=0),
+    help="Record a resumable checkpoint in OUTPUT_DIR/checkpoint.json at most "
+    "every N seconds",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted checkpointed run in OUTPUT_DIR from its last "
+    "checkpoint",
+)
 def cli(
     generate_config: Optional[str],
     count: int,
+    duration: Optional[float],
+    target_bytes: Tuple[str, ...],
+    checksum: str,
     threads: int,
     config: str,
     output_dir: str,
     json_output: bool,
     llm_format: bool,
+    log_format: str,
+    output_format: str,
+    row_group_size: int,
+    dataset: Optional[str],
+    shard_records: int,
+    splits: Dict[str, float],
+    dedup_window: int,
+    dedup: bool,
+    dedup_fp_rate: float,
+    tokenizer: Optional[str],
+    pack_tokens: Optional[int],
+    merge: bool,
+    sink: Tuple[str, ...],
+    metrics_port: Optional[int],
+    metrics_host: str,
+    stats_file: Optional[str],
+    stats_interval: float,
+    profile: Optional[str],
+    plan: Optional[str],
+    cache_dir: Optional[str],
+    cache_size: int,
+    restamp: bool,
+    seed: Optional[int],
+    checkpoint_interval: Optional[float],
+    resume: bool,
 ) -> None:
     """Multi-threaded log generator for testing and development.
 
@@ -810,11 +1641,44 @@ def cli(
             result = process_services(
                 SimpleNamespace(
                     config=config,
-                    count=count,
+                    count=(
+                        None
+                        if (duration is not None or target_bytes)
+                        and click.get_current_context().get_parameter_source("count")
+                        == click.core.ParameterSource.DEFAULT
+                        else count
+                    ),
+                    duration=duration,
+                    target_bytes=target_bytes,
+                    checksum=checksum,
                     threads=threads,
                     output_dir=output_dir,
                     json=json_output,
-                    llm_format=llm_format,
+                    llm_format=llm_format or bool(dataset),
+                    format=log_format,
+                    output_format=output_format,
+                    row_group_size=row_group_size,
+                    dataset=dataset,
+                    shard_records=shard_records,
+                    splits=splits,
+                    dedup_window=dedup_window,
+                    dedup_fp_rate=dedup_fp_rate if dedup else None,
+                    tokenizer=tokenizer,
+                    pack_tokens=pack_tokens,
+                    merge=merge,
+                    sink=sink,
+                    metrics_port=metrics_port,
+                    metrics_host=metrics_host,
+                    stats_file=stats_file,
+                    stats_interval=stats_interval,
+                    profile=profile,
+                    plan=plan,
+                    cache_dir=cache_dir,
+                    cache_size=cache_size,
+                    restamp=restamp,
+                    seed=seed,
+                    checkpoint_interval=checkpoint_interval,
+                    resume=resume,
                 )
             )
 
@@ -890,8 +1754,17 @@ def process_services(args):
         if not args.json:
             print(f"Debug: Loaded config: {config_data}")
 
+        # A plan sets each service's workload; without one, every service in
+        # the config gets the command line settings
+        plan_path = getattr(args, "plan", None)
+        if plan_path:
+            service_plans = load_plan(plan_path)
+        else:
+            service_plans = {name: {} for name in config_data.get("services", [])}
+        services = list(service_plans)
+
         # Check for active services
-        if not config_data.get("services"):
+        if not services:
             raise ValueError("No active services in configuration")
 
         # Create output directory
@@ -913,47 +1786,717 @@ def process_services(args):
         logs_generated = 0
         start_time = time.time()
 
-        for module in config_data["services"]:
-            if module not in modules:
-                raise ModuleNotFoundError(f"Module {module} not found")
+        default_format = getattr(args, "format", "default") or "default"
+        service_formats = config_data.get("formats", {})
+        service_templates = config_data.get("templates", {})
+        output_format = getattr(args, "output_format", "text") or "text"
+
+        # Seeded runs are reproducible; checkpointed runs are also resumable
+        count = args.count
+        duration = getattr(args, "duration", None)
+        seed = getattr(args, "seed", None)
+        manifest = None
+        checkpoint_interval = getattr(args, "checkpoint_interval", None)
+        if getattr(args, "resume", False):
+            manifest = CheckpointManifest.load(
+                os.path.join(args.output_dir, MANIFEST_NAME)
+            )
+            seed, count = manifest.seed, manifest.count
+            if count is None and duration is None:
+                raise ValueError("Resuming an open-ended run requires --duration")
+        elif checkpoint_interval is not None:
+            if seed is None:
+                seed = secrets.randbits(32)
+            manifest = CheckpointManifest(
+                os.path.join(args.output_dir, MANIFEST_NAME),
+                seed,
+                count,
+                datetime.now().replace(microsecond=0).isoformat(),
+            )
+            manifest.save()
+        if manifest is not None and (
+            getattr(args, "sink", None) or output_format != "text"
+        ):
+            raise ValueError("Checkpoints are only supported for text log files")
+        if manifest is not None and any(
+            entry.get("sink") or entry.get("shards", 1) > 1
+            for entry in service_plans.values()
+        ):
+            raise ValueError("Checkpoints are not supported with plan sinks or shards")
+        clock_start = datetime.fromisoformat(manifest.start) if manifest else None
+        if seed is not None and clock_start is None:
+            clock_start = datetime.now().replace(microsecond=0)
+
+        # Seeded text output is stored in, and replayed from, the corpus cache
+        cache = None
+        cache_stats = {"replayed": [], "stored": []}
+        if getattr(args, "cache_dir", None):
+            if seed is None:
+                raise ValueError("--cache-dir requires --seed")
+            cache = CorpusCache(
+                args.cache_dir,
+                getattr(args, "cache_size", None) or parse_size(DEFAULT_CACHE_SIZE),
+            )
 
-            output_file = os.path.join(
-                args.output_dir, f"{module}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Text files are hashed while writing and listed in manifest.json
+        checksum = getattr(args, "checksum", None)
+        if checksum == "none":
+            checksum = None
+        digests = {}
+
+        # Byte targets per service, split from a total by the config weights
+        targets = build_targets(
+            getattr(args, "target_bytes", None) or (),
+            services,
+            config_data.get("weights", {}),
+        )
+        # Plan byte targets replace the command line's for their services
+        plan_targets = {
+            name: entry["target_bytes"]
+            for name, entry in service_plans.items()
+            if "target_bytes" in entry
+        }
+        if plan_targets:
+            targets = {**(targets or {}), **plan_targets}
+        dataset_dir = getattr(args, "dataset", None)
+        text_only = (
+            bool(getattr(args, "sink", None))
+            or output_format != "text"
+            or bool(dataset_dir)
+        )
+        if targets is not None and (
+            text_only or any(service_plans[name].get("sink") for name in targets)
+        ):
+            raise ValueError("--target-bytes is only supported for text log files")
+        if any(
+            entry.get("shards", 1) > 1 and (text_only or entry.get("sink"))
+            for entry in service_plans.values()
+        ):
+            raise ValueError("Shards are only supported for text log files")
+
+        # Merged output interleaves every service in one timestamp-ordered file
+        merge = getattr(args, "merge", False)
+        if merge and (
+            text_only
+            or args.llm_format
+            or manifest is not None
+            or any(
+                entry.get("sink") or entry.get("rate") or entry.get("shards", 1) > 1
+                for entry in service_plans.values()
+            )
+        ):
+            raise ValueError(
+                "--merge only supports text log files, without sinks, rates, "
+                "shards, checkpoints or --llm-format"
+            )
+        if dataset_dir and (
+            getattr(args, "sink", None)
+            or output_format != "text"
+            or manifest is not None
+            or any(entry.get("sink") for entry in service_plans.values())
+        ):
+            raise ValueError(
+                "--dataset cannot be combined with sinks, --output-format or "
+                "checkpoints"
             )
-            output_file += ".jsonl" if args.llm_format else ".log"
-            files.append(output_file)
-            if not args.json:
-                print(f"Debug: Output file is {output_file}")
 
-            # Create parent directory for output file
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            if not args.json:
-                print(
-                    f"Debug: Parent directory exists: {os.path.exists(os.path.dirname(output_file))}"
+        # Record sinks take neither LLM lines nor deduplicated lines
+        sink_uris = getattr(args, "sink", None) or ()
+        if isinstance(sink_uris, str):
+            sink_uris = (sink_uris,)
+        plan_sinks = [
+            entry["sink"] for entry in service_plans.values() if entry.get("sink")
+        ]
+        record_sinks = any(takes_records(uri) for uri in (*sink_uris, *plan_sinks))
+        if args.llm_format and (output_format != "text" or record_sinks):
+            raise ValueError(
+                "--llm-format only supports text log files and line sinks, not "
+                "--output-format or record sinks (sqlite, duckdb)"
+            )
+
+        # --dedup drops repeated lines with one Bloom filter per job
+        dedup_fp_rate = getattr(args, "dedup_fp_rate", None)
+        dedup_filters = {}
+        if dedup_fp_rate is not None and (
+            output_format != "text"
+            or merge
+            or manifest is not None
+            or record_sinks
+            or plan_sinks
+        ):
+            raise ValueError(
+                "--dedup only supports text log files and line sinks, without "
+                "record sinks (sqlite, duckdb), plan sinks, --merge or checkpoints"
+            )
+
+        # Profiled jobs run one at a time, so a deadline for the whole run
+        # would leave nothing to the jobs after the first
+        if getattr(args, "profile", None) and duration:
+            raise ValueError("--profile cannot be combined with --duration")
+
+        # LLM records can be counted with a tokenizer and packed into
+        # fixed-length sequences, one packer per job
+        tokenizer = None
+        packers = {}
+        pack_tokens = getattr(args, "pack_tokens", None)
+        # Output lines of packed jobs, whose lines are sequences of records
+        packed_lines = {}
+        if getattr(args, "tokenizer", None):
+            if not args.llm_format:
+                raise ValueError("--tokenizer requires --llm-format or --dataset")
+            if manifest is not None or getattr(args, "sink", None):
+                raise ValueError(
+                    "--tokenizer is not supported with sinks or checkpoints"
+                )
+            tokenizer = load_tokenizer(args.tokenizer)
+        if pack_tokens is not None and (
+            tokenizer is None or dataset_dir or targets is not None
+        ):
+            raise ValueError(
+                "--pack-tokens requires --tokenizer and cannot be combined with "
+                "--dataset or --target-bytes"
+            )
+
+        # Sinks given with --sink receive every service's output through
+        # one asynchronous fan-out
+        shared_sink = None
+        if sink_uris:
+            sinks = []
+            try:
+                for uri in sink_uris:
+                    sinks.append(open_sink(uri))
+            except Exception:
+                for sink in sinks:
+                    sink.close()
+                raise
+            shared_sink = FanoutSink(sinks)
+            files.extend(shared_sink.paths)
+
+        # --dataset collects every service's LLM records in one dataset
+        dataset_sink = None
+        if dataset_dir:
+            dataset_sink = DatasetSink(
+                dataset_dir,
+                getattr(args, "shard_records", DEFAULT_SHARD_RECORDS),
+                getattr(args, "splits", None),
+                getattr(args, "dedup_window", DEFAULT_DEDUP_WINDOW),
+                info={
+                    "generated": datetime.now().replace(microsecond=0).isoformat(),
+                    "version": f"lg3k {__version__}",
+                    "services": ", ".join(services),
+                    "seed": seed,
+                },
+            )
+
+        reporter = None
+        metrics_server = None
+        # Sizes reported by per-module sinks that track their own bytes
+        sink_sizes = {}
+        # Jobs loaded into record sinks, whose output size is unknown
+        unsized = set()
+        stats_writer = None
+
+        # Optional per-module profiling of the workers
+        profiler = None
+        profile_mode = getattr(args, "profile", None)
+        if profile_mode:
+            profiler = RunProfiler(
+                profile_mode,
+                os.path.join(args.output_dir, "profiles"),
+                time.strftime("%Y%m%d_%H%M%S"),
+            )
+
+        # Shards of a service share its generator, so seeded shards take
+        # turns at it to keep their output reproducible
+        service_locks = {module: threading.Lock() for module in services}
+
+        def run_job(name, module, generator_func, output_file, renderer, job, progress):
+            """Generate one job (a service or one of its shards) on a worker."""
+            checkpoint = None
+            rng_turns = None
+            if seed is not None and "index" in job:
+                rng_turns = RngTurns(
+                    module,
+                    shard_seed(seed, module, job["index"]),
+                    service_locks[module],
+                )
+                start = shard_start(clock_start, job["first_line"])
+                set_clock(SyntheticClock(start, rng_turns.rng))
+            elif seed is not None:
+                set_clock(SyntheticClock(clock_start, seed_rng(module, seed)))
+            if manifest is not None:
+                checkpoint = manifest.module(
+                    module,
+                    output_file,
+                    (
+                        DEFAULT_CHECKPOINT_INTERVAL
+                        if checkpoint_interval is None
+                        else checkpoint_interval
+                    ),
+                )
+                checkpoint.restore()
+            sink = shared_sink if dataset_sink is None else dataset_sink
+            if job["sink"]:
+                sink = open_sink(job["sink"])
+                if getattr(sink, "path", None) and sink.path not in files:
+                    files.append(sink.path)
+                fields = get_module_hook(generator_func, "RECORD_FIELDS")
+                if fields and hasattr(sink, "declare"):
+                    sink.declare(name, fields)
+            elif shared_sink is None and output_format in COLUMNAR_FORMATS:
+                sink = ColumnarSink(
+                    output_file,
+                    output_format,
+                    getattr(args, "row_group_size", DEFAULT_ROW_GROUP_SIZE),
+                    get_module_hook(generator_func, "RECORD_FIELDS"),
+                )
+            if sink is not None and sink.records and not hasattr(sink, "raw_bytes"):
+                unsized.add(name)
+            digest = None
+            if checksum is not None and output_format == "text" and sink is None:
+                digest = digests[name] = FileDigest(output_file, checksum)
+
+            # Runs limited by time or rate do not have reproducible output
+            key = None
+            if (
+                cache is not None
+                and output_format == "text"
+                and sink is None
+                and checkpoint is None
+                and duration is None
+                and job["rate"] is None
+            ):
+                key = cache_key(
+                    {
+                        "service": module,
+                        "settings": config_data.get(module, {}),
+                        "seed": seed,
+                        "shard": job.get("index"),
+                        "count": job["count"],
+                        "target_bytes": job["target_bytes"],
+                        "format": job["format"],
+                        "template": job["template"],
+                        "llm_format": args.llm_format,
+                        "dedup": dedup_fp_rate,
+                        "tokenizer": tokenizer and tokenizer.name,
+                        "pack_tokens": pack_tokens,
+                        "version": module_version(generator_func),
+                    }
+                )
+                meta = cache.lookup(key)
+                if meta is not None:
+                    shift = None
+                    if getattr(args, "restamp", False):
+                        shift = clock_start - datetime.fromisoformat(meta["start"])
+                    cache_stats["replayed"].append(name)
+                    set_clock(None)
+                    if "records" in meta:
+                        packed_lines[name] = meta["lines"]
+                    return replay_cached_logs(
+                        name,
+                        cache,
+                        key,
+                        meta,
+                        output_file,
+                        shift,
+                        digest,
+                        progress,
+                        args.json,
+                    )
+
+            dedup = None
+            if dedup_fp_rate is not None:
+                expected = job["count"]
+                if expected is None and job["target_bytes"] is not None:
+                    expected = job["target_bytes"] // ESTIMATED_LINE_BYTES
+                dedup = dedup_filters[name] = BloomFilter(
+                    expected or DEFAULT_DEDUP_CAPACITY, dedup_fp_rate
                 )
 
-            logs = generate_module_logs(
-                module,
-                modules[module],
-                args.count,
+            packer = None
+            if tokenizer is not None:
+                packer = packers[name] = TokenPacker(
+                    tokenizer, pack_tokens, "\n" if sink is None else ""
+                )
+
+            call_args = (
+                name,
+                generator_func,
+                job["count"],
                 output_file,
                 args.llm_format,
                 args.json,
             )
-            logs_generated += logs
+            call_kwargs = {
+                "renderer": renderer,
+                "sink": sink,
+                "progress": progress,
+                "checkpoint": checkpoint,
+                "deadline": deadline,
+                "target_bytes": job["target_bytes"],
+                "digest": digest,
+                "rate": job["rate"],
+                "dedup": dedup,
+                "packer": packer,
+                "rng_turns": rng_turns,
+                "whole_lines": args.llm_format or job["format"] in JSON_FORMATS,
+            }
+            try:
+                if profiler is not None:
+                    logs = profiler.call(
+                        name, generate_module_logs, *call_args, **call_kwargs
+                    )
+                else:
+                    logs = generate_module_logs(*call_args, **call_kwargs)
+                line_counts = {"lines": logs}
+                if packer is not None and packer.pack_tokens is not None:
+                    line_counts = {"lines": packer.sequences, "records": logs}
+                    packed_lines[name] = packer.sequences
+                if key is not None and not exit_event.is_set():
+                    earliest = latest = None
+                    if digest is not None:
+                        earliest, latest = digest.min_timestamp, digest.max_timestamp
+                    cache.store(
+                        key,
+                        output_file,
+                        {
+                            "service": module,
+                            **line_counts,
+                            "start": clock_start.isoformat(),
+                            "min_timestamp": earliest and earliest.isoformat(),
+                            "max_timestamp": latest and latest.isoformat(),
+                        },
+                    )
+                    cache_stats["stored"].append(name)
+                return logs
+            finally:
+                if seed is not None:
+                    set_clock(None)
+                if sink is not None and sink not in (shared_sink, dataset_sink):
+                    sink.close()
+                    if hasattr(sink, "raw_bytes"):
+                        sink_sizes[name] = (sink.bytes_written, sink.raw_bytes)
+
+        def run_merged(output_file, jobs, progress):
+            """Generate every service on this thread, merged by timestamp."""
+            streams = {}
+            for name, module, generator_func, _, renderer, job in jobs:
+                clock = None
+                if seed is not None:
+                    clock = SyntheticClock(clock_start, seed_rng(module, seed))
+                streams[name] = service_lines(
+                    generator_func, renderer, job["count"], job["target_bytes"], clock
+                )
+            digest = None
+            if checksum is not None:
+                digest = digests["merged"] = FileDigest(output_file, checksum)
+            call_args = (streams, output_file, args.json, progress, deadline, digest)
+            try:
+                if profiler is not None:
+                    return profiler.call("merged", generate_merged_logs, *call_args)
+                return generate_merged_logs(*call_args)
+            finally:
+                set_clock(None)
+
+        try:
+            jobs = []
+            for module in services:
+                if module not in modules:
+                    raise ModuleNotFoundError(f"Module {module} not found")
+                configure_module(modules[module], config_data.get(module, {}))
+                entry = service_plans[module]
+
+                # Pick the generator and renderer for this service's format;
+                # a plan format also replaces a configured template
+                fmt = entry.get("format", service_formats.get(module, default_format))
+                template = entry.get("template")
+                if template is None and "format" not in entry:
+                    template = service_templates.get(module)
+                service_sink = entry.get("sink")
+                generator_func, renderer = modules[module], None
+                # Records also carry the timestamps for the output manifest
+                uses_records = (
+                    merge
+                    or shared_sink is not None
+                    or service_sink is not None
+                    or output_format in COLUMNAR_FORMATS
+                    or (checksum is not None and not args.llm_format)
+                )
+                if args.llm_format:
+                    # LLM lines go to text files and line sinks alike
+                    generator_func, renderer = build_llm_renderer(
+                        module, modules[module]
+                    )
+                elif uses_records or template or fmt != "default":
+                    generator_func, renderer = build_renderer(
+                        module, modules[module], fmt, template
+                    )
+                if shared_sink is not None and service_sink is None:
+                    shared_sink.register(
+                        module,
+                        renderer,
+                        get_module_hook(modules[module], "RECORD_FIELDS"),
+                    )
+
+                # The service's limits, split evenly across its shards
+                shards = entry.get("shards", 1)
+                service_count = entry.get(
+                    "count", None if "target_bytes" in entry else count
+                )
+                target = targets.get(module) if targets is not None else None
+                # Services without a byte target or time budget need a line count
+                if service_count is None and target is None and duration is None:
+                    service_count = DEFAULT_COUNT
+                counts = [None] * shards
+                if service_count is not None:
+                    counts = split_evenly(service_count, shards)
+                sizes = [None] * shards
+                if target is not None:
+                    sizes = split_evenly(target, shards)
+                rate = entry.get("rate")
+                first_line = 0
+
+                for index in range(shards):
+                    name = module if shards == 1 else f"{module}_part{index:05d}"
+                    output_file = None
+                    if (
+                        shared_sink is None
+                        and dataset_sink is None
+                        and service_sink is None
+                        and not merge
+                    ):
+                        # Resumed services continue their original files
+                        if manifest is not None and module in manifest.modules:
+                            output_file = os.path.join(
+                                args.output_dir, manifest.modules[module]["file"]
+                            )
+                        else:
+                            output_file = build_output_file(
+                                args, module, output_format, fmt, template
+                            )
+                        if shards > 1:
+                            root, extension = os.path.splitext(output_file)
+                            output_file = f"{root}_part{index:05d}{extension}"
+                        files.append(output_file)
+                        if not args.json:
+                            print(f"Debug: Output file is {output_file}")
+
+                        # Create parent directory for output file
+                        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                        if not args.json:
+                            print(
+                                f"Debug: Parent directory exists: {os.path.exists(os.path.dirname(output_file))}"
+                            )
+                    job = {
+                        "count": counts[index],
+                        "target_bytes": sizes[index],
+                        "rate": rate / shards if rate else None,
+                        "sink": service_sink,
+                        "format": fmt,
+                        "template": template,
+                    }
+                    job["cost"] = estimate_seconds(
+                        job["count"], job["target_bytes"], job["rate"]
+                    )
+                    if shards > 1:
+                        # Each shard's clock starts where the previous one ends
+                        job["index"] = index
+                        job["first_line"] = first_line
+                        if counts[index] is not None:
+                            first_line += counts[index]
+                        elif sizes[index] is not None:
+                            first_line += sizes[index] // ESTIMATED_LINE_BYTES
+                    jobs.append(
+                        (name, module, generator_func, output_file, renderer, job)
+                    )
+
+            # Workers publish counters; one reporter thread redraws
+            if merge:
+                merged_file = build_output_file(
+                    args, "merged", output_format, default_format, None
+                )
+                files.append(merged_file)
+                board = ProgressBoard(
+                    {"merged": sum(job[5]["count"] or 0 for job in jobs)}
+                )
+            else:
+                board = ProgressBoard({job[0]: job[5]["count"] or 0 for job in jobs})
+            for module in board.names:
+                if module not in module_order:
+                    module_order.append(module)
             if not args.json:
-                print(f"Debug: Generated {logs} logs for {module}")
+                reporter = ProgressReporter(board, render_progress, DEFAULT_REFRESH)
+                reporter.start()
+
+            # Optional live metrics for headless runs
+            queue_depths = None
+            if shared_sink is not None:
+                queue_depths = lambda: shared_sink.queue_depths  # noqa: E731
+            if getattr(args, "metrics_port", None) is not None:
+                metrics_server = MetricsServer(
+                    board,
+                    getattr(args, "metrics_host", None) or "127.0.0.1",
+                    args.metrics_port,
+                    queue_depths,
+                ).start()
+                if not args.json:
+                    print(
+                        f"Debug: Serving metrics on port {metrics_server.port} at /metrics"
+                    )
+            if getattr(args, "stats_file", None):
+                stats_writer = StatsFileWriter(
+                    board,
+                    args.stats_file,
+                    getattr(args, "stats_interval", DEFAULT_STATS_INTERVAL),
+                    queue_depths,
+                ).start()
+
+            # --duration is a budget for the whole run
+            deadline = time.monotonic() + duration if duration else None
+
+            if merge:
+                counts = run_merged(merged_file, jobs, board.slot("merged"))
+                for name, logs in counts.items():
+                    logs_generated += logs
+                    if not args.json:
+                        print(f"Debug: Generated {logs} logs for {name}")
+                jobs = []
+
+            # Generate jobs in parallel, longest first so that short jobs fill
+            # the gaps (LPT scheduling); results are reported in order
+            workers = max(1, min(getattr(args, "threads", 1) or 1, len(jobs)))
+            if deadline is not None and any(
+                job[5]["count"] is None and job[5]["target_bytes"] is None
+                for job in jobs
+            ):
+                # Open-ended jobs hold their worker until the deadline, so
+                # every job needs its own or queued ones would never start
+                workers = max(workers, len(jobs))
+            by_name = {job[0]: job for job in jobs}
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="lg3k-worker"
+            ) as pool:
+                futures = {
+                    name: pool.submit(run_job, *by_name[name], board.slot(name))
+                    for name in lpt_order({job[0]: job[5]["cost"] for job in jobs})
+                }
+                for job in jobs:
+                    name = job[0]
+                    logs = futures[name].result()
+                    logs_generated += logs
+                    if not args.json:
+                        print(f"Debug: Generated {logs} logs for {name}")
+                        if name in packers:
+                            tokens = packers[name].summary()
+                            print(
+                                f"Debug: {tokens['tokens']} tokens for {name} "
+                                f"(mean {tokens['mean_tokens']:.1f} per record)"
+                            )
+                        if name in dedup_filters:
+                            dedup = dedup_filters[name]
+                            print(
+                                f"Debug: Dropped {dedup.duplicates} duplicate logs "
+                                f"for {name} ({dedup.ratio:.1%})"
+                            )
 
-            if not args.json and HAS_RICH and console is not None:
-                console.print(f"[green]Generated {logs} logs for {module}[/green]")
+                    if not args.json and HAS_RICH and console is not None:
+                        console.print(
+                            f"[green]Generated {logs} logs for {name}[/green]"
+                        )
+        finally:
+            if reporter is not None:
+                reporter.stop()
+            if metrics_server is not None:
+                metrics_server.stop()
+            if stats_writer is not None:
+                stats_writer.stop()
+            if shared_sink is not None:
+                shared_sink.close()
+            if dataset_sink is not None:
+                dataset_sink.close()
+                files.extend([*dataset_sink.paths, dataset_sink.card_path])
+                if not args.json:
+                    print(f"Debug: Dataset card written to {dataset_sink.card_path}")
+
+        manifest_entries = None
+        if digests:
+            manifest_entries = [
+                digests[name].summary()
+                for name in [*(job[0] for job in jobs), "merged"]
+                if name in digests
+            ]
+            manifest_path = write_manifest(args.output_dir, manifest_entries)
+            if not args.json:
+                print(f"Debug: Output manifest written to {manifest_path}")
+
+        profile = None
+        if profiler is not None:
+            profile = {
+                "mode": profiler.mode,
+                "summary": profiler.write_summary(),
+                "files": list(profiler.files.values()),
+            }
+            if not args.json:
+                print(f"Debug: Profile summary written to {profile['summary']}")
 
         if args.json:
-            return {
+            # Sizes and timings come from the workers' counters, not file scans
+            time_taken = time.time() - start_time
+            module_stats = {
+                name: summarize_module(
+                    counters,
+                    *sink_sizes.get(name, (None, None)),
+                    sized=name not in unsized,
+                )
+                for name, counters in board.stats().items()
+            }
+            for name, dedup in dedup_filters.items():
+                module_stats[name]["duplicates"] = dedup.duplicates
+                module_stats[name]["dedup_ratio"] = dedup.ratio
+            for name, lines in packed_lines.items():
+                module_stats[name]["records"] = module_stats[name]["lines"]
+                module_stats[name]["lines"] = lines
+            result = {
                 "success": True,
                 "logs_generated": logs_generated,
-                "time_taken": time.time() - start_time,
+                "time_taken": time_taken,
                 "files": files,
+                "stats": {
+                    "total_files": len(files),
+                    "avg_logs_per_file": logs_generated / len(files) if files else 0,
+                    "total_size_bytes": sum(
+                        stats.get("bytes", 0) for stats in module_stats.values()
+                    ),
+                    "lines_per_second": (
+                        logs_generated / time_taken if time_taken > 0 else 0.0
+                    ),
+                    "modules": module_stats,
+                },
             }
+            if manifest_entries is not None:
+                result["manifest"] = {"path": manifest_path, "files": manifest_entries}
+            if profile is not None:
+                result["profile"] = profile
+            if cache is not None:
+                result["cache"] = {"path": cache.directory, **cache_stats}
+            if dataset_sink is not None:
+                result["dataset"] = dataset_sink.summary()
+            if tokenizer is not None:
+                result["tokens"] = summarize_tokens(packers)
+            if dedup_fp_rate is not None:
+                duplicates = sum(dedup.duplicates for dedup in dedup_filters.values())
+                checked = duplicates + sum(
+                    dedup.items for dedup in dedup_filters.values()
+                )
+                result["dedup"] = {
+                    "fp_rate": dedup_fp_rate,
+                    "duplicates": duplicates,
+                    "ratio": duplicates / checked if checked else 0.0,
+                    "modules": {
+                        name: dedup.summary() for name, dedup in dedup_filters.items()
+                    },
+                }
+            return result
         elif HAS_RICH and console is not None:
             console.print(
                 f"[green]Successfully generated {logs_generated} logs across {len(files)} files[/green]"
@@ -977,6 +2520,16 @@ def process_services(args):
             return 1
 
 
+# Subcommands handled by other modules instead of the generator CLI
+SUBCOMMANDS = {"coordinator": "cluster", "worker": "cluster", "replay": "replay"}
+
+
 def main():
     """CLI entry point."""
-    cli()
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        # Imported here because the subcommand modules build on this one
+        name = SUBCOMMANDS[sys.argv[1]]
+        module = importlib.import_module(f".{name}", package="lg3k")
+        getattr(module, f"{name}_cli")()
+    else:
+        cli()
@@ -1,32 +1,85 @@
 """API log generator module for LG3K.
 
 This module generates realistic API request logs with various endpoints,
-methods, and response codes.
+methods, and response codes. Endpoints and users are drawn from
+Zipf-distributed vocabularies to mimic real request popularity.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
+from ..utils.vocab import get_api_endpoints, get_user_ids
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("api")
+
+# Vocabulary sizes and skew (override with the "api" config section)
+ENDPOINT_COUNT = 20_000
+USER_COUNT = 100_000
+ZIPF_EXPONENT = 1.1
+
+
+def configure(settings: Dict) -> None:
+    """Apply the "api" section of the configuration.
+
+    Args:
+        settings: Mapping that may contain "endpoint_count", "users"
+            and "zipf_exponent"
+    """
+    global ENDPOINT_COUNT, USER_COUNT, ZIPF_EXPONENT
+    ENDPOINT_COUNT = int(settings.get("endpoint_count", ENDPOINT_COUNT))
+    USER_COUNT = int(settings.get("users", USER_COUNT))
+    ZIPF_EXPONENT = float(settings.get("zipf_exponent", ZIPF_EXPONENT))
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "method": str,
+    "endpoint": str,
+    "status": int,
+    "user": str,
+}
 
-def generate_log():
-    """Generate a single API log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured API log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        method, endpoint, status and user fields
     """
-    timestamp = get_timestamp()
-    endpoints = ["/api/v1/users", "/api/v1/posts", "/api/v1/comments", "/api/v1/auth"]
+    timestamp = get_datetime()
     methods = ["GET", "POST", "PUT", "DELETE"]
     status_codes = [200, 201, 400, 401, 403, 404, 500]
 
-    endpoint = random.choice(endpoints)
-    method = random.choice(methods)
-    status = random.choice(status_codes)
+    endpoint = get_api_endpoints(ENDPOINT_COUNT, ZIPF_EXPONENT).sample(rng)
+    user = get_user_ids(USER_COUNT, ZIPF_EXPONENT).sample(rng)
+    method = rng.choice(methods)
+    status = rng.choice(status_codes)
+
+    return {
+        "timestamp": timestamp,
+        "level": "INFO" if status < 400 else "ERROR",
+        "component": "API",
+        "message": f"API Request - {method} {endpoint} - Status: {status} - User: {user}",
+        "method": method,
+        "endpoint": endpoint,
+        "status": status,
+        "user": user,
+    }
 
-    # Format message to stay within line length limit
-    msg = f"API Request - {method} {endpoint} - Status: {status}"
-    level = "INFO" if status < 400 else "ERROR"
 
-    # Return formatted string instead of dictionary
-    return f"[{timestamp}] [{level}] [API] {msg}"
+def generate_log():
+    """Generate a single API log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
@@ -4,29 +4,59 @@ This module generates realistic database operation logs including queries,
 transactions, and performance metrics.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("database")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "operation": str,
+    "table": str,
+    "duration": float,
+}
 
-def generate_log():
-    """Generate a single database log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured database log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        operation, table and duration fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     operations = ["SELECT", "INSERT", "UPDATE", "DELETE", "TRANSACTION"]
     tables = ["users", "posts", "comments", "settings", "logs"]
 
-    operation = random.choice(operations)
-    table = random.choice(tables)
-    duration = round(random.uniform(0.001, 2.000), 3)
+    operation = rng.choice(operations)
+    table = rng.choice(tables)
+    duration = round(rng.uniform(0.001, 2.000), 3)
+
+    return {
+        "timestamp": timestamp,
+        "level": "INFO",
+        "component": "Database",
+        "message": f"DB {operation} on {table} - Duration: {duration}s",
+        "operation": operation,
+        "table": table,
+        "duration": duration,
+    }
 
-    # Create log components
-    level = "INFO"
-    component = "Database"
-    message = f"DB {operation} on {table} - Duration: {duration}s"
 
-    # Return formatted string instead of dictionary
-    return f"[{timestamp}] [{level}] [{component}] {message}"
+def generate_log():
+    """Generate a single database log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
@@ -4,32 +4,70 @@ This module generates realistic firewall logs including connection attempts,
 blocked IPs, and security events.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("firewall")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "action": str,
+    "protocol": str,
+    "src_ip": str,
+    "src_port": int,
+    "dst_ip": str,
+    "port": int,
+}
 
-def generate_log():
-    """Generate a single firewall log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured firewall log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        action, protocol, src_ip, src_port, dst_ip and port fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     actions = ["ALLOW", "BLOCK", "DROP"]
     protocols = ["TCP", "UDP", "ICMP"]
     ports = [22, 80, 443, 3306, 5432]
 
-    action = random.choice(actions)
-    protocol = random.choice(protocols)
-    port = random.choice(ports)
+    action = rng.choice(actions)
+    protocol = rng.choice(protocols)
+    port = rng.choice(ports)
     ip = (
-        f"{random.randint(1, 255)}.{random.randint(0, 255)}."
-        f"{random.randint(0, 255)}.{random.randint(0, 255)}"
+        f"{rng.randint(1, 255)}.{rng.randint(0, 255)}."
+        f"{rng.randint(0, 255)}.{rng.randint(0, 255)}"
     )
 
-    level = "INFO" if action == "ALLOW" else "WARNING"
-    message = f"{action} {protocol} from {ip} on port {port}"
+    return {
+        "timestamp": timestamp,
+        "level": "INFO" if action == "ALLOW" else "WARNING",
+        "component": "Firewall",
+        "message": f"{action} {protocol} from {ip} on port {port}",
+        "action": action,
+        "protocol": protocol,
+        "src_ip": ip,
+        "src_port": rng.randint(1024, 65535),
+        "dst_ip": f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        "port": port,
+    }
+
 
-    # Return formatted string instead of dictionary
-    return f"[{timestamp}] [{level}] [Firewall] {message}"
+def generate_log():
+    """Generate a single firewall log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
@@ -4,34 +4,63 @@ This module generates realistic NAS logs including file operations,
 storage metrics, and access events.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("nas")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "operation": str,
+    "file_type": str,
+    "share": str,
+    "size_mb": float,
+}
 
-def generate_log():
-    """Generate a single NAS log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured NAS log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        operation, file_type, share and size_mb fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     operations = ["READ", "WRITE", "DELETE", "MOVE", "COPY"]
     file_types = ["document", "image", "video", "backup", "archive"]
     shares = ["public", "private", "backup", "media"]
 
-    operation = random.choice(operations)
-    file_type = random.choice(file_types)
-    share = random.choice(shares)
-    size = round(random.uniform(0.1, 1000.0), 2)
+    operation = rng.choice(operations)
+    file_type = rng.choice(file_types)
+    share = rng.choice(shares)
+    size = round(rng.uniform(0.1, 1000.0), 2)
 
-    # Create log dictionary first
-    log_entry = {
+    return {
         "timestamp": timestamp,
         "level": "INFO",
         "component": "NAS",
         "message": f"{operation} {file_type} ({size}MB) on {share} share",
+        "operation": operation,
+        "file_type": file_type,
+        "share": share,
+        "size_mb": size,
     }
 
-    # Format and return as string
-    return f"[{log_entry['timestamp']}] [{log_entry['level']}] [{log_entry['component']}] {log_entry['message']}"
+
+def generate_log():
+    """Generate a single NAS log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
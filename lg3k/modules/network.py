@@ -4,28 +4,63 @@ This module generates realistic network logs including connectivity events,
 bandwidth usage, and network device status.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("network")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "device": str,
+    "event": str,
+    "metric": str,
+    "value": float,
+}
 
-def generate_log():
-    """Generate a single network log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured network log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        device, event, metric and value fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     devices = ["Router", "Switch", "WAP", "Gateway"]
     events = ["UP", "DOWN", "DEGRADED", "CONGESTED"]
     metrics = ["latency", "bandwidth", "packet_loss", "jitter"]
 
-    device = random.choice(devices)
-    event = random.choice(events)
-    metric = random.choice(metrics)
-    value = round(random.uniform(0, 100), 2)
+    device = rng.choice(devices)
+    event = rng.choice(events)
+    metric = rng.choice(metrics)
+    value = round(rng.uniform(0, 100), 2)
+
+    return {
+        "timestamp": timestamp,
+        "level": "INFO" if event == "UP" else "WARNING",
+        "component": "Network",
+        "message": f"{device} status {event} - {metric}: {value}%",
+        "device": device,
+        "event": event,
+        "metric": metric,
+        "value": value,
+    }
 
-    level = "INFO" if event == "UP" else "WARNING"
-    message = f"{device} status {event} - {metric}: {value}%"
 
-    return f"[{timestamp}] [{level}] [Network] {message}"
+def generate_log():
+    """Generate a single network log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
@@ -4,28 +4,63 @@ This module generates realistic OS logs including system events,
 resource usage, and service status changes.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("os")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "resource": str,
+    "service": str,
+    "event": str,
+    "usage": float,
+}
 
-def generate_log():
-    """Generate a single OS log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured OS log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        resource, service, event and usage fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     resources = ["CPU", "Memory", "Disk", "Swap"]
     services = ["sshd", "httpd", "mysqld", "nginx"]
     events = ["started", "stopped", "restarted", "failed"]
 
-    resource = random.choice(resources)
-    service = random.choice(services)
-    event = random.choice(events)
-    usage = round(random.uniform(0, 100), 1)
+    resource = rng.choice(resources)
+    service = rng.choice(services)
+    event = rng.choice(events)
+    usage = round(rng.uniform(0, 100), 1)
+
+    return {
+        "timestamp": timestamp,
+        "level": "ERROR" if event == "failed" else "INFO",
+        "component": "OS",
+        "message": f"Service {service} {event} - {resource} usage: {usage}%",
+        "resource": resource,
+        "service": service,
+        "event": event,
+        "usage": usage,
+    }
 
-    level = "ERROR" if event == "failed" else "INFO"
-    message = f"Service {service} {event} - {resource} usage: {usage}%"
 
-    return f"[{timestamp}] [{level}] [OS] {message}"
+def generate_log():
+    """Generate a single OS log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
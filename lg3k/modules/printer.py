@@ -4,31 +4,66 @@ This module generates realistic printer logs including print jobs,
 supply levels, and printer status events.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("printer")
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "job_type": str,
+    "status": str,
+    "pages": int,
+    "supply": str,
+    "supply_level": int,
+}
 
-def generate_log():
-    """Generate a single printer log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured printer log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and
+        job_type, status, pages, supply and supply_level fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     job_types = ["document", "photo", "label", "report"]
     statuses = ["completed", "pending", "error", "cancelled"]
     supplies = ["black", "cyan", "magenta", "yellow"]
 
-    job = random.choice(job_types)
-    status = random.choice(statuses)
-    supply = random.choice(supplies)
-    pages = random.randint(1, 50)
-    level = random.randint(0, 100)
+    job = rng.choice(job_types)
+    status = rng.choice(statuses)
+    supply = rng.choice(supplies)
+    pages = rng.randint(1, 50)
+    level = rng.randint(0, 100)
+
+    return {
+        "timestamp": timestamp,
+        "level": "ERROR" if status == "error" else "INFO",
+        "component": "Printer",
+        "message": f"Print job ({job}, {pages} pages) {status} - {supply} at {level}%",
+        "job_type": job,
+        "status": status,
+        "pages": pages,
+        "supply": supply,
+        "supply_level": level,
+    }
 
-    # Create log components
-    level_str = "ERROR" if status == "error" else "INFO"
-    message = f"Print job ({job}, {pages} pages) {status} - {supply} at {level}%"
 
-    # Return formatted string instead of dictionary
-    return f"[{timestamp}] [{level_str}] [Printer] {message}"
+def generate_log():
+    """Generate a single printer log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
@@ -1,8 +1,14 @@
 """Smart home device log generation module."""
 
 import json
-import random
 from datetime import datetime
+from typing import Dict
+
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
+
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("smarthome")
 
 # Locations for devices
 LOCATIONS = [
@@ -87,197 +93,312 @@ CAMERA_EVENTS = {
 }
 
 
+# Detail values that indicate a degraded device
+WARNING_VALUES = {"jammed", "tamper", "error"}
+
+
+def render_log(record: Dict) -> str:
+    """Render a record in the module's native "SmartHome: {json}" format."""
+    return f"SmartHome: {record['message']}"
+
+
+def generate_record() -> Dict:
+    """Generate a single structured smart home log record.
+
+    Returns:
+        dict: Record with timestamp, level, component and message (the
+        native JSON payload) followed by the flattened device details
+    """
+    timestamp = get_datetime()
+    category = rng.choice(["home", "esp", "wireless", "camera"])
+    details = CATEGORY_BUILDERS[category](timestamp)
+
+    level = "INFO"
+    if (
+        details.get("state") in WARNING_VALUES
+        or details.get("event_details") in WARNING_VALUES
+    ):
+        level = "WARNING"
+
+    record = {
+        "timestamp": timestamp,
+        "level": level,
+        "component": "SmartHome",
+        "message": json.dumps(details),
+    }
+    for key, value in details.items():
+        if key not in record:
+            record[key] = value
+    return record
+
+
 def generate_log():
     """Generate a random smart home device log entry."""
-    timestamp = datetime.now()
-    category = random.choice(["home", "esp", "wireless", "camera"])
-
-    if category == "home":
-        return generate_home_device_log(timestamp)
-    elif category == "esp":
-        return generate_esp_log(timestamp)
-    elif category == "wireless":
-        return generate_wireless_log(timestamp)
-    else:  # camera
-        return generate_camera_log(timestamp)
+    return render_log(generate_record())
 
 
 def generate_home_device_log(timestamp):
     """Generate a log entry for a smart home device."""
-    device_type = random.choice(list(HOME_DEVICES.keys()))
+    return f"SmartHome: {json.dumps(build_home_device_details(timestamp))}"
+
+
+def build_home_device_details(timestamp):
+    """Build the detail fields of a log entry for a smart home device."""
+    device_type = rng.choice(list(HOME_DEVICES.keys()))
     device_info = HOME_DEVICES[device_type]
-    state = random.choice(device_info["states"])
-    location = random.choice(LOCATIONS)
+    state = rng.choice(device_info["states"])
+    location = rng.choice(LOCATIONS)
 
     msg = {
         "timestamp": timestamp.isoformat(),
         "type": device_type,
         "location": location,
         "state": state,
-        "device_id": f"{device_type}_{random.randint(1, 100)}",
+        "device_id": f"{device_type}_{rng.randint(1, 100)}",
     }
 
     # Add device-specific data
     if device_type == "thermostat":
         msg.update(
             {
-                "temperature": round(random.uniform(18.0, 25.0), 1),
-                "humidity": random.randint(30, 70),
+                "temperature": round(rng.uniform(18.0, 25.0), 1),
+                "humidity": rng.randint(30, 70),
             }
         )
     elif device_type == "light" and state == "dimmed":
-        msg["brightness"] = random.randint(10, 90)
+        msg["brightness"] = rng.randint(10, 90)
     elif device_type in ["motion_sensor", "door_lock"]:
-        msg["battery_level"] = random.randint(10, 100)
+        msg["battery_level"] = rng.randint(10, 100)
 
-    return f"SmartHome: {json.dumps(msg)}"
+    return msg
 
 
 def generate_esp_log(timestamp):
     """Generate a log entry for an ESP device."""
-    device_type = random.choice(list(ESP_DEVICES.keys()))
+    return f"SmartHome: {json.dumps(build_esp_details(timestamp))}"
+
+
+def build_esp_details(timestamp):
+    """Build the detail fields of a log entry for an ESP device."""
+    device_type = rng.choice(list(ESP_DEVICES.keys()))
     device_info = ESP_DEVICES[device_type]
-    operation = random.choice(device_info["operations"])
-    core = random.choice(device_info["cores"])
+    operation = rng.choice(device_info["operations"])
+    core = rng.choice(device_info["cores"])
 
     msg = {
         "timestamp": timestamp.isoformat(),
         "type": device_type,
         "operation": operation,
         "core": core,
-        "device_id": f"{device_type}_{random.randint(1, 100)}",
-        "cpu_freq": random.randint(*device_info["freq_range"]),
-        "temperature": round(random.uniform(*device_info["temp_range"]), 1),
-        "voltage": round(random.uniform(*device_info["voltage_range"]), 2),
-        "free_heap": random.randint(20000, 200000),
-        "wifi_rssi": random.randint(-90, -30),
+        "device_id": f"{device_type}_{rng.randint(1, 100)}",
+        "cpu_freq": rng.randint(*device_info["freq_range"]),
+        "temperature": round(rng.uniform(*device_info["temp_range"]), 1),
+        "voltage": round(rng.uniform(*device_info["voltage_range"]), 2),
+        "free_heap": rng.randint(20000, 200000),
+        "wifi_rssi": rng.randint(-90, -30),
     }
 
     # Add operation-specific data
     if operation == "Deep sleep":
-        msg["sleep_duration"] = random.randint(1, 3600)
+        msg["sleep_duration"] = rng.randint(1, 3600)
     elif operation == "ADC reading":
-        msg["adc_value"] = random.randint(0, 4095)
+        msg["adc_value"] = rng.randint(0, 4095)
     elif operation == "MQTT publish":
         msg.update(
-            {"topic": f"sensor/{device_type.lower()}/data", "qos": random.randint(0, 2)}
+            {"topic": f"sensor/{device_type.lower()}/data", "qos": rng.randint(0, 2)}
         )
     elif operation == "OTA update":
-        msg["firmware_version"] = f"{random.randint(1, 5)}.{random.randint(0, 9)}"
+        msg["firmware_version"] = f"{rng.randint(1, 5)}.{rng.randint(0, 9)}"
 
-    return f"SmartHome: {json.dumps(msg)}"
+    return msg
 
 
 def generate_wireless_log(timestamp):
     """Generate a log entry for a wireless device."""
-    protocol = random.choice(list(WIRELESS_DEVICES.keys()))
-    device_type = random.choice(list(WIRELESS_DEVICES[protocol].keys()))
+    return f"SmartHome: {json.dumps(build_wireless_details(timestamp))}"
+
+
+def build_wireless_details(timestamp):
+    """Build the detail fields of a log entry for a wireless device."""
+    protocol = rng.choice(list(WIRELESS_DEVICES.keys()))
+    device_type = rng.choice(list(WIRELESS_DEVICES[protocol].keys()))
     device_info = WIRELESS_DEVICES[protocol][device_type]
-    event = random.choice(device_info["events"])
+    event = rng.choice(device_info["events"])
 
     msg = {
         "timestamp": timestamp.isoformat(),
         "protocol": protocol,
         "type": device_type,
         "event": event,
-        "device_id": f"{protocol}_{device_type}_{random.randint(1, 100)}",
+        "device_id": f"{protocol}_{device_type}_{rng.randint(1, 100)}",
     }
 
     # Add protocol-specific data
     if protocol == "zigbee":
-        msg["pan_id"] = f"{random.randint(0, 65535):04x}"
+        msg["pan_id"] = f"{rng.randint(0, 65535):04x}"
         if device_type == "coordinator":
-            msg["channel"] = random.randint(11, 26)
+            msg["channel"] = rng.randint(11, 26)
             if event == "device_join":
-                msg["new_device"] = f"device_{random.randint(1, 100)}"
+                msg["new_device"] = f"device_{rng.randint(1, 100)}"
         elif device_type == "end_device":
             msg.update(
                 {
-                    "cluster": f"0x{random.randint(0, 65535):04x}",
-                    "battery": random.randint(0, 100),
+                    "cluster": f"0x{rng.randint(0, 65535):04x}",
+                    "battery": rng.randint(0, 100),
                 }
             )
         elif device_type == "router":
-            msg["children"] = random.randint(0, 20)
+            msg["children"] = rng.randint(0, 20)
     else:  # zwave
-        msg["home_id"] = f"{random.randint(0, 0xFFFFFFFF):08x}"
+        msg["home_id"] = f"{rng.randint(0, 0xFFFFFFFF):08x}"
         if device_type == "controller":
-            msg["channel"] = random.randint(1, 50)
+            msg["channel"] = rng.randint(1, 50)
             if event == "inclusion":
-                msg["new_node_id"] = random.randint(1, 232)
+                msg["new_node_id"] = rng.randint(1, 232)
         elif device_type == "slave":
             msg.update(
                 {
-                    "command_class": f"0x{random.randint(0, 255):02x}",
-                    "battery": random.randint(0, 100),
+                    "command_class": f"0x{rng.randint(0, 255):02x}",
+                    "battery": rng.randint(0, 100),
                 }
             )
         elif device_type == "routing_slave":
-            msg["routes"] = random.randint(1, 10)
+            msg["routes"] = rng.randint(1, 10)
 
-    return f"SmartHome: {json.dumps(msg)}"
+    return msg
 
 
 def generate_camera_log(timestamp):
     """Generate a log entry for a security camera."""
-    camera_type = random.choice(list(CAMERAS.keys()))
-    event_type = random.choice(list(CAMERA_EVENTS.keys()))
-    event_details = random.choice(CAMERA_EVENTS[event_type])
-    location = random.choice(LOCATIONS)
+    return f"SmartHome: {json.dumps(build_camera_details(timestamp))}"
+
+
+def build_camera_details(timestamp):
+    """Build the detail fields of a log entry for a security camera."""
+    camera_type = rng.choice(list(CAMERAS.keys()))
+    event_type = rng.choice(list(CAMERA_EVENTS.keys()))
+    event_details = rng.choice(CAMERA_EVENTS[event_type])
+    location = rng.choice(LOCATIONS)
 
     msg = {
         "timestamp": timestamp.isoformat(),
         "type": camera_type,
-        "camera_id": f"{camera_type}_{random.randint(1, 100)}",
+        "camera_id": f"{camera_type}_{rng.randint(1, 100)}",
         "location": location,
         "event": event_type,
         "event_details": event_details,
-        "resolution": random.choice(["720p", "1080p", "2K", "4K"]),
-        "fps": random.randint(15, 60),
+        "resolution": rng.choice(["720p", "1080p", "2K", "4K"]),
+        "fps": rng.randint(15, 60),
     }
 
     # Add camera-specific data
     if camera_type == "ip_camera":
         msg.update(
             {
-                "protocol": random.choice(CAMERAS["ip_camera"]),
-                "codec": random.choice(["H.264", "H.265"]),
-                "bitrate": f"{random.randint(1, 8)}Mbps",
+                "protocol": rng.choice(CAMERAS["ip_camera"]),
+                "codec": rng.choice(["H.264", "H.265"]),
+                "bitrate": f"{rng.randint(1, 8)}Mbps",
             }
         )
     elif camera_type == "doorbell":
-        msg["battery_level"] = random.randint(10, 100)
+        msg["battery_level"] = rng.randint(10, 100)
         if event_type == "motion_detected":
-            msg["detection_zone"] = random.choice(["entry", "street", "porch"])
+            msg["detection_zone"] = rng.choice(["entry", "street", "porch"])
     elif camera_type == "ptz_camera":
         if event_type != "system":
-            movement = random.choice(["pan", "tilt", "zoom", "preset"])
+            movement = rng.choice(["pan", "tilt", "zoom", "preset"])
             msg["movement"] = movement
             if movement == "preset":
-                msg["preset_number"] = random.randint(1, 10)
+                msg["preset_number"] = rng.randint(1, 10)
             else:
                 msg["position"] = (
-                    random.randint(-180, 180)
-                    if movement != "zoom"
-                    else random.randint(1, 20)
+                    rng.randint(-180, 180) if movement != "zoom" else rng.randint(1, 20)
                 )
 
     # Add event-specific data
     if event_type == "motion_detected":
         msg.update(
             {
-                "confidence": random.randint(50, 100),
-                "detection_area": random.choice(["left", "center", "right"]),
+                "confidence": rng.randint(50, 100),
+                "detection_area": rng.choice(["left", "center", "right"]),
             }
         )
     elif event_type == "recording":
         msg.update(
             {
-                "duration": random.randint(10, 300),
-                "file_size": f"{random.randint(1, 100)}MB",
+                "duration": rng.randint(10, 300),
+                "file_size": f"{rng.randint(1, 100)}MB",
             }
         )
     elif event_type == "system" and event_details == "error":
-        msg["error"] = random.choice(["network_timeout", "storage_full", "auth_failed"])
+        msg["error"] = rng.choice(["network_timeout", "storage_full", "auth_failed"])
 
-    return f"SmartHome: {json.dumps(msg)}"
+    return msg
+
+
+# Fields of the records and their types (device categories add their own)
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    # Home devices
+    "type": str,
+    "location": str,
+    "state": str,
+    "device_id": str,
+    "brightness": int,
+    "battery_level": int,
+    "temperature": float,
+    "humidity": int,
+    # ESP devices
+    "operation": str,
+    "core": int,
+    "cpu_freq": int,
+    "voltage": float,
+    "free_heap": int,
+    "wifi_rssi": int,
+    "adc_value": int,
+    "sleep_duration": int,
+    "topic": str,
+    "qos": int,
+    "firmware_version": str,
+    # Wireless devices
+    "protocol": str,
+    "event": str,
+    "pan_id": str,
+    "channel": int,
+    "children": int,
+    "cluster": str,
+    "battery": int,
+    "home_id": str,
+    "command_class": str,
+    "new_device": str,
+    "routes": int,
+    "new_node_id": int,
+    # Cameras
+    "camera_id": str,
+    "event_details": str,
+    "resolution": str,
+    "fps": int,
+    "codec": str,
+    "bitrate": str,
+    "duration": int,
+    "file_size": str,
+    "confidence": int,
+    "detection_area": str,
+    "detection_zone": str,
+    "movement": str,
+    "preset_number": int,
+    "position": int,
+    "error": str,
+}
+
+
+# Detail builders per device category
+CATEGORY_BUILDERS = {
+    "home": build_home_device_details,
+    "esp": build_esp_details,
+    "wireless": build_wireless_details,
+    "camera": build_camera_details,
+}
@@ -1,34 +1,101 @@
 """Web server log generator module for LG3K.
 
 This module generates realistic web server logs including HTTP requests,
-response codes, and performance metrics.
+response codes, and performance metrics. Paths, users and user agents are
+drawn from large Zipf-distributed vocabularies so the output has realistic
+cardinality and hot keys.
 """
 
-import random
+from datetime import datetime
+from typing import Dict
 
-from ..utils.timestamp import get_timestamp
+from ..utils.formats import render_default
+from ..utils.rng import get_rng
+from ..utils.timestamp import get_datetime
+from ..utils.vocab import get_url_paths, get_user_agents, get_user_ids
 
+# Random source for this service (seeded per run with --seed)
+rng = get_rng("web_server")
+
+# Vocabulary sizes and skew (override with the "web_server" config section)
+PATH_COUNT = 50_000
+USER_COUNT = 100_000
+USER_AGENT_COUNT = 500
+ZIPF_EXPONENT = 1.1
+
+
+def configure(settings: Dict) -> None:
+    """Apply the "web_server" section of the configuration.
+
+    Args:
+        settings: Mapping that may contain "paths", "users", "user_agents"
+            and "zipf_exponent"
+    """
+    global PATH_COUNT, USER_COUNT, USER_AGENT_COUNT, ZIPF_EXPONENT
+    PATH_COUNT = int(settings.get("paths", PATH_COUNT))
+    USER_COUNT = int(settings.get("users", USER_COUNT))
+    USER_AGENT_COUNT = int(settings.get("user_agents", USER_AGENT_COUNT))
+    ZIPF_EXPONENT = float(settings.get("zipf_exponent", ZIPF_EXPONENT))
+
+
+# Fields of the records and their types
+RECORD_FIELDS = {
+    "timestamp": datetime,
+    "level": str,
+    "component": str,
+    "message": str,
+    "ip": str,
+    "method": str,
+    "path": str,
+    "status": int,
+    "bytes": int,
+    "duration": float,
+    "user": str,
+    "user_agent": str,
+}
 
-def generate_log():
-    """Generate a single web server log entry.
+
+def generate_record() -> Dict:
+    """Generate a single structured web server log record.
 
     Returns:
-        str: A formatted log string in the format "[timestamp] [level] [component] message"
+        dict: Record with timestamp, level, component, message and ip,
+        method, path, status, bytes, duration, user and user_agent fields
     """
-    timestamp = get_timestamp()
+    timestamp = get_datetime()
     methods = ["GET", "POST", "PUT", "DELETE"]
-    paths = ["/", "/about", "/contact", "/api/v1", "/docs"]
     codes = [200, 201, 301, 304, 400, 401, 403, 404, 500]
 
-    method = random.choice(methods)
-    path = random.choice(paths)
-    code = random.choice(codes)
+    method = rng.choice(methods)
+    path = get_url_paths(PATH_COUNT, ZIPF_EXPONENT).sample(rng)
+    user = get_user_ids(USER_COUNT, ZIPF_EXPONENT).sample(rng)
+    agent = get_user_agents(USER_AGENT_COUNT).sample(rng)
+    code = rng.choice(codes)
     ip = (
-        f"{random.randint(1, 255)}.{random.randint(0, 255)}."
-        f"{random.randint(0, 255)}.{random.randint(0, 255)}"
+        f"{rng.randint(1, 255)}.{rng.randint(0, 255)}."
+        f"{rng.randint(0, 255)}.{rng.randint(0, 255)}"
     )
 
-    level = "INFO" if code < 400 else "ERROR"
-    message = f"{ip} - {method} {path} - {code}"
+    return {
+        "timestamp": timestamp,
+        "level": "INFO" if code < 400 else "ERROR",
+        "component": "WebServer",
+        "message": f'{ip} - {method} {path} - {code} - {user} - "{agent}"',
+        "ip": ip,
+        "method": method,
+        "path": path,
+        "status": code,
+        "bytes": 0 if code == 304 else rng.randint(200, 50_000),
+        "duration": round(rng.uniform(0.001, 1.5), 3),
+        "user": user,
+        "user_agent": agent,
+    }
+
 
-    return f"[{timestamp}] [{level}] [WebServer] {message}"
+def generate_log():
+    """Generate a single web server log entry.
+
+    Returns:
+        str: A formatted log string in the format "[timestamp] [level] [component] message"
+    """
+    return render_default(generate_record())
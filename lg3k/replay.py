@@ -0,0 +1,304 @@
+"""Replay of existing log files as live traffic.
+
+``lg3k replay FILES`` streams log files (lg3k output, or real logs in the
+built-in formats) to stdout, a file or line sinks, without generating
+anything. Files are memory-mapped and read in chunks of whole lines. Only
+each line's timestamp is rewritten, into a new buffer, so large cached
+corpora can serve as live traffic.
+
+Lines are emitted as fast as possible, at a fixed ``--rate``, or at the
+spacing of their original timestamps (``--original-timing``, sped up by
+``--speed``). Timestamps are shifted so that each file starts at the
+moment its replay starts; ``--no-restamp`` keeps them as they are.
+"""
+
+import json
+import mmap
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import click
+
+from .sinks import open_sink
+from .sinks.fanout import FanoutSink
+from .utils.restamp import DETECT_LINES, Restamper, TimestampLayout, detect_layout
+
+# Bytes of whole lines read from a mapped file at a time
+READ_CHUNK_SIZE = 1 << 20
+
+# Batches per second emitted at a fixed rate
+RATE_BATCHES_PER_SECOND = 10
+
+# Most lines emitted at once when following the original timing
+MAX_TIMED_BATCH = 1000
+
+
+def iter_chunks(data, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Split a buffer into chunks that end at line boundaries.
+
+    Args:
+        data: Buffer (e.g. a memory-mapped file)
+        chunk_size: Preferred chunk size; longer lines get a chunk of
+            their own
+
+    Yields:
+        Chunks of whole lines (the last one may lack a newline)
+    """
+    pos, size = 0, len(data)
+    while pos < size:
+        if pos + chunk_size >= size:
+            end = size
+        else:
+            end = data.rfind(b"\n", pos, pos + chunk_size) + 1
+            if end <= pos:
+                end = data.find(b"\n", pos + chunk_size) + 1 or size
+        yield data[pos:end]
+        pos = end
+
+
+def split_lines(chunk: bytes) -> List[bytes]:
+    """Split a chunk into lines that keep their newlines."""
+    lines = chunk.split(b"\n")
+    last = lines.pop()
+    lines = [line + b"\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+def line_time(layout: TimestampLayout, line: bytes) -> Optional[datetime]:
+    """Parse the first timestamp of a line (None if it has none)."""
+    match = layout.search(line)
+    return layout.parse(match.group(1).decode("ascii")) if match else None
+
+
+def replay_file(
+    path: str,
+    emit: Callable[[bytes], None],
+    rate: Optional[float] = None,
+    speed: Optional[float] = None,
+    restamp: bool = True,
+) -> Tuple[int, int]:
+    """Replay one log file.
+
+    Args:
+        path: Log file
+        emit: Function receiving batches of whole lines
+        rate: Lines per second (None for no limit)
+        speed: Follow the original spacing of the timestamps, sped up by
+            this factor (None to ignore the timestamps)
+        restamp: Shift timestamps so the file starts at the current time
+
+    Returns:
+        Tuple of (lines, bytes) emitted
+
+    Raises:
+        ValueError: If speed is given and the file has no timestamps
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            head = data[:READ_CHUNK_SIZE]
+            layout = detect_layout(head)
+            first = None
+            if layout is not None:
+                for line in head.split(b"\n", DETECT_LINES)[:DETECT_LINES]:
+                    first = line_time(layout, line)
+                    if first is not None:
+                        break
+            if speed is not None and first is None:
+                raise ValueError(f"No timestamps found in {path}")
+
+            started = time.monotonic()
+            restamper = None
+            if restamp and first is not None:
+                shift = datetime.now().replace(microsecond=0) - first
+                restamper = Restamper(shift, layout)
+                first += shift
+            lines = written = 0
+
+            def send(batch: bytes, count: int) -> None:
+                nonlocal lines, written
+                emit(batch)
+                lines += count
+                written += len(batch)
+
+            def wait(due: float) -> None:
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            for chunk in iter_chunks(data):
+                if restamper is not None:
+                    chunk = restamper.apply(chunk)
+                if rate is None and speed is None:
+                    send(chunk, chunk.count(b"\n"))
+                elif rate is not None:
+                    batch_size = max(1, int(rate / RATE_BATCHES_PER_SECOND))
+                    chunk_lines = split_lines(chunk)
+                    for start in range(0, len(chunk_lines), batch_size):
+                        batch = chunk_lines[start : start + batch_size]
+                        send(b"".join(batch), len(batch))
+                        wait(started + lines / rate)
+                else:
+                    # Lines without a timestamp go out with the line before
+                    batch, due = [], started
+                    for line in split_lines(chunk):
+                        stamp = line_time(layout, line)
+                        if stamp is not None:
+                            line_due = started + (stamp - first).total_seconds() / speed
+                            if batch and (
+                                line_due > due or len(batch) >= MAX_TIMED_BATCH
+                            ):
+                                send(b"".join(batch), len(batch))
+                                batch = []
+                            if not batch:
+                                due = line_due
+                                wait(due)
+                        batch.append(line)
+                    if batch:
+                        send(b"".join(batch), len(batch))
+    return lines, written
+
+
+def service_name(path: str, services) -> str:
+    """Guess the service of a file from its name (e.g. api_20240101.log)."""
+    stem = os.path.basename(path).split(".")[0]
+    for name in sorted(services, key=len, reverse=True):
+        if stem == name or stem.startswith(f"{name}_"):
+            return name
+    return stem
+
+
+@click.group()
+def replay_cli() -> None:
+    """Replay log files as live traffic."""
+
+
+@replay_cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Lines per second (default: as fast as possible)",
+)
+@click.option(
+    "--original-timing",
+    is_flag=True,
+    help="Emit lines at the spacing of their timestamps",
+)
+@click.option(
+    "--speed",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    help="Speed-up factor for --original-timing (default: 1)",
+)
+@click.option(
+    "--restamp/--no-restamp",
+    default=True,
+    help="Shift timestamps so each file starts now (default: on)",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default="-",
+    help="File to write lines to (default: stdout)",
+)
+@click.option(
+    "--sink",
+    multiple=True,
+    help="Send lines to a line sink instead, e.g. syslog+udp://host:514 "
+    "(repeatable)",
+)
+@click.option(
+    "--json-output",
+    is_flag=True,
+    help="Print the summary as JSON (on stderr when lines go to stdout)",
+)
+def replay(
+    files: Tuple[str, ...],
+    rate: Optional[float],
+    original_timing: bool,
+    speed: float,
+    restamp: bool,
+    output: str,
+    sink: Tuple[str, ...],
+    json_output: bool,
+) -> None:
+    """Stream log files to stdout, a file or sinks."""
+    from .main import load_modules
+
+    if rate is not None and original_timing:
+        raise click.UsageError("--rate and --original-timing cannot be combined")
+
+    fanout = None
+    if sink:
+        fanout = FanoutSink([open_sink(uri) for uri in sink])
+        if fanout.records:
+            fanout.close()
+            raise click.UsageError("Replay needs sinks that take log lines")
+        services = list(load_modules())
+        stream = None
+    elif output == "-":
+        stream = sys.stdout.buffer
+    else:
+        stream = open(output, "wb")
+
+    started = time.time()
+    total_lines = total_bytes = 0
+    try:
+        for path in files:
+            if fanout is not None:
+                service = service_name(path, services)
+
+                def emit(batch: bytes) -> None:
+                    lines = batch.decode("utf-8", "replace").split("\n")
+                    if not lines[-1]:
+                        lines.pop()
+                    fanout.write_batch(service, lines)
+
+            else:
+                emit = stream.write
+            try:
+                lines, written = replay_file(
+                    path,
+                    emit,
+                    rate,
+                    speed if original_timing else None,
+                    restamp,
+                )
+            except ValueError as e:
+                raise click.ClickException(str(e)) from e
+            total_lines += lines
+            total_bytes += written
+    finally:
+        if fanout is not None:
+            fanout.close()
+        elif stream is not None and stream is not sys.stdout.buffer:
+            stream.close()
+        elif stream is not None:
+            stream.flush()
+
+    result = {
+        "success": True,
+        "files": list(files),
+        "lines": total_lines,
+        "bytes": total_bytes,
+        "time_taken": time.time() - started,
+    }
+    to_stderr = fanout is None and output == "-"
+    if json_output:
+        click.echo(json.dumps(result), err=to_stderr)
+    else:
+        click.echo(
+            f"Replayed {total_lines} lines ({total_bytes} bytes) from "
+            f"{len(files)} files",
+            err=to_stderr,
+        )
@@ -0,0 +1,66 @@
+"""Output sinks for generated logs.
+
+A sink receives generated data in batches instead of lines being written
+to a per-module text file. Sinks are plain classes providing:
+
+- ``records``: True if the sink takes structured records, False if it
+  takes rendered log lines
+- ``batch_size``: preferred number of items per batch
+- ``write_batch(service, items)``: write a batch for a service
+- ``close()``: flush buffered data and release resources
+
+Network sinks (syslog, HTTP, Kafka) take rendered lines and build on
+``BatchingSink`` from ``lg3k.sinks.base``.
+"""
+
+import importlib
+from urllib.parse import urlsplit
+
+# Sink modules per URI scheme
+SINK_SCHEMES = {
+    "sqlite": "sql",
+    "duckdb": "sql",
+    "syslog": "syslog",
+    "syslog+udp": "syslog",
+    "syslog+tcp": "syslog",
+    "http": "http",
+    "https": "http",
+    "kafka": "kafka",
+}
+
+# Schemes of sinks that take structured records rather than log lines
+RECORD_SCHEMES = {"sqlite", "duckdb"}
+
+
+def open_sink(uri: str, **options):
+    """Open a sink from a URI such as ``sqlite:///logs.db``.
+
+    Args:
+        uri: Sink URI; the scheme selects the sink module
+        **options: Extra keyword arguments for the sink
+
+    Returns:
+        The sink instance
+
+    Raises:
+        ValueError: If the URI scheme is not supported
+    """
+    scheme = urlsplit(uri).scheme.lower()
+    if scheme not in SINK_SCHEMES:
+        raise ValueError(
+            f"Unsupported sink '{uri}'. Supported schemes: {', '.join(SINK_SCHEMES)}"
+        )
+    module = importlib.import_module(f".{SINK_SCHEMES[scheme]}", package=__name__)
+    return module.create_sink(uri, **options)
+
+
+def takes_records(uri: str) -> bool:
+    """Check whether the sink of a URI takes structured records.
+
+    Args:
+        uri: Sink URI
+
+    Returns:
+        True for record sinks (databases), False for line sinks
+    """
+    return urlsplit(uri).scheme.lower() in RECORD_SCHEMES
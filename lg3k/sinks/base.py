@@ -0,0 +1,218 @@
+"""Shared building blocks for network sinks.
+
+``BatchingSink`` buffers rendered lines and flushes them when a batch
+reaches a line count or byte size, or when the linger time expires.
+Flushes run outside the buffer lock on pooled connections, so several
+generator threads can send concurrently, and failed sends are retried with
+exponential backoff on a fresh connection.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Default batching and retry settings
+DEFAULT_BATCH_LINES = 500
+DEFAULT_BATCH_BYTES = 1 << 20
+DEFAULT_LINGER = 0.5
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.2
+DEFAULT_POOL_SIZE = 4
+
+
+def parse_options(uri: str) -> dict:
+    """Parse the query string of a sink URI into single-valued options."""
+    return {key: values[-1] for key, values in parse_qs(urlsplit(uri).query).items()}
+
+
+# Batching options accepted in sink URIs and their types
+BATCHING_OPTIONS = {
+    "batch_size": int,
+    "batch_bytes": int,
+    "linger": float,
+    "retries": int,
+    "backoff": float,
+}
+
+
+def batching_options(query: dict) -> dict:
+    """Extract typed batching options from parsed URI options.
+
+    Raises:
+        ValueError: If an option value has the wrong type
+    """
+    options = {}
+    for name, convert in BATCHING_OPTIONS.items():
+        if name in query:
+            try:
+                options[name] = convert(query[name])
+            except ValueError:
+                raise ValueError(f"Invalid sink option {name}={query[name]!r}")
+    return options
+
+
+class ConnectionPool:
+    """A small pool of reusable connections."""
+
+    def __init__(self, factory: Callable, size: int = DEFAULT_POOL_SIZE):
+        """Initialize the pool.
+
+        Args:
+            factory: Callable creating a new connection
+            size: Maximum number of idle connections kept
+        """
+        self.factory = factory
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is discarded if the block raises."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self.factory()
+        try:
+            yield conn
+        except BaseException:
+            self._close(conn)
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn) -> None:
+        """Close a connection, ignoring errors."""
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class BatchingSink:
+    """Base class for sinks that send rendered lines in batches.
+
+    Subclasses implement ``_send(batch)``, where ``batch`` is a list of
+    ``(service, line)`` tuples, and raise ``OSError`` for retryable
+    failures.
+    """
+
+    records = False
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_LINES,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        linger: float = DEFAULT_LINGER,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        """Initialize batching.
+
+        Args:
+            batch_size: Flush after this many lines
+            batch_bytes: Flush after this many bytes
+            linger: Flush buffered lines at least this often (seconds, 0 to
+                only flush on size)
+            retries: Retries per batch after the first attempt
+            backoff: Initial retry delay in seconds, doubled per retry
+        """
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.linger = linger
+        self.retries = retries
+        self.backoff = backoff
+        self.sent = 0
+        self._buffer: List[Tuple[str, str]] = []
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        if linger > 0:
+            self._flusher = threading.Thread(target=self._linger_loop, daemon=True)
+            self._flusher.start()
+
+    def _linger_loop(self) -> None:
+        """Flush idle buffers once they are older than the linger time."""
+        while not self._closed.wait(self.linger):
+            if time.monotonic() - self._last_flush >= self.linger:
+                self.flush()
+
+    def _take(self) -> List[Tuple[str, str]]:
+        """Take the buffered lines (call with the lock held)."""
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._last_flush = time.monotonic()
+        return batch
+
+    def write_batch(self, service: str, items: List[str]) -> None:
+        """Buffer lines and flush full batches.
+
+        Args:
+            service: Service the lines belong to
+            items: Rendered log lines
+        """
+        batches = []
+        with self._lock:
+            for line in items:
+                self._buffer.append((service, line))
+                self._buffer_bytes += len(line) + 1
+                if (
+                    len(self._buffer) >= self.batch_size
+                    or self._buffer_bytes >= self.batch_bytes
+                ):
+                    batches.append(self._take())
+            if self._buffer and time.monotonic() - self._last_flush >= self.linger > 0:
+                batches.append(self._take())
+        for batch in batches:
+            self._send_with_retry(batch)
+
+    def flush(self) -> None:
+        """Send all buffered lines."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._send_with_retry(batch)
+
+    def _send_with_retry(self, batch: List[Tuple[str, str]]) -> None:
+        """Send a batch, retrying with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                self._send(batch)
+                self.sent += len(batch)
+                return
+            except OSError:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * (2**attempt))
+
+    def _send(self, batch: List[Tuple[str, str]]) -> None:
+        """Send a batch of (service, line) tuples."""
+        raise NotImplementedError
+
+    def _close_connections(self) -> None:
+        """Release network resources."""
+
+    def close(self) -> None:
+        """Flush remaining lines, stop the linger thread and disconnect."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            self.flush()
+        finally:
+            self._close_connections()
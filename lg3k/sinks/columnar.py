@@ -0,0 +1,165 @@
+"""Columnar (Apache Arrow / Parquet) output sink.
+
+Records are written directly as Arrow record batches or Parquet row groups,
+skipping text rendering entirely. Requires the optional ``pyarrow`` package.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    pq = None
+    HAS_PYARROW = False
+
+# Supported columnar formats and their file extensions
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Default number of rows per Parquet row group / Arrow record batch
+DEFAULT_ROW_GROUP_SIZE = 65_536
+
+
+# Arrow type names of the Python types declared in a module's RECORD_FIELDS
+ARROW_TYPES = {
+    str: "string",
+    int: "int64",
+    float: "float64",
+    bool: "bool_",
+    datetime: "timestamp",
+}
+
+
+def arrow_schema(fields: Dict[str, type]):
+    """Build the Arrow schema of a module's declared record fields.
+
+    Args:
+        fields: Field names and Python types (a module's RECORD_FIELDS)
+
+    Returns:
+        Arrow schema with one nullable column per field
+
+    Raises:
+        ValueError: If a field has a type without an Arrow equivalent
+    """
+    columns = []
+    for name, kind in fields.items():
+        if kind not in ARROW_TYPES:
+            raise ValueError(f"Field '{name}' has unsupported type {kind.__name__}")
+        if kind is datetime:
+            columns.append(pa.field(name, pa.timestamp("us")))
+        else:
+            columns.append(pa.field(name, getattr(pa, ARROW_TYPES[kind])()))
+    return pa.schema(columns)
+
+
+class ColumnarSink:
+    """Write records of one service to a Parquet or Arrow IPC file.
+
+    The schema comes from the fields the module declares (RECORD_FIELDS),
+    so every column exists from the first row group on and rows missing a
+    column get nulls. Without declared fields, the schema is inferred from
+    the first row group, and later records with other fields or types are
+    rejected rather than silently dropped.
+    """
+
+    records = True
+
+    def __init__(
+        self,
+        path: str,
+        fmt: str = "parquet",
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        fields: Optional[Dict[str, type]] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            path: Output file path
+            fmt: "parquet" or "arrow"
+            row_group_size: Rows per row group (Parquet) or record batch (Arrow)
+            fields: Field names and types of the records (inferred from the
+                first row group if not given)
+
+        Raises:
+            ImportError: If pyarrow is not installed
+            ValueError: If the format is unknown or the row group size invalid
+        """
+        if not HAS_PYARROW:
+            raise ImportError(
+                f"pyarrow is required for {fmt} output (pip install 'lg3k[arrow]')"
+            )
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format '{fmt}'")
+        if row_group_size < 1:
+            raise ValueError("Row group size must be at least 1")
+        self.path = str(path)
+        self.fmt = fmt
+        self.batch_size = row_group_size
+        self.schema = arrow_schema(fields) if fields else None
+        # In-memory Arrow size of the records and bytes in the finished file
+        self.raw_bytes = 0
+        self.bytes_written = 0
+        self._file = None
+        self._writer = None
+
+    def _to_table(self, rows: List[Dict]):
+        """Convert a batch of records to an Arrow table.
+
+        Raises:
+            ValueError: If the records have fields or types outside the schema
+        """
+        if self.schema is None:
+            names = list(dict.fromkeys(key for row in rows for key in row))
+            table = pa.table({name: [row.get(name) for row in rows] for name in names})
+            self.schema = table.schema
+            return table
+        names = self.schema.names
+        unknown = {key for row in rows for key in row}.difference(names)
+        if unknown:
+            raise ValueError(
+                f"Records have fields outside the {self.fmt} schema: "
+                f"{', '.join(sorted(unknown))}"
+            )
+        try:
+            return pa.table(
+                {name: [row.get(name) for row in rows] for name in names},
+                schema=self.schema,
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Records do not match the {self.fmt} schema: {e}")
+
+    def write_batch(self, service: str, items: List[Dict]) -> None:
+        """Write a batch of records as one row group.
+
+        Args:
+            service: Service name (unused; one file per service)
+            items: Records to write
+        """
+        if not items:
+            return
+        table = self._to_table(items)
+        self.raw_bytes += table.nbytes
+        if self._writer is None:
+            self._file = pa.OSFile(self.path, "wb")
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._file, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self._file, self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(table, row_group_size=self.batch_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.batch_size)
+
+    def close(self) -> None:
+        """Finish the file footer and close the writer."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self.bytes_written = self._file.tell()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,192 @@
+"""LLM dataset sink.
+
+Writes LLM-format JSON lines of every service into one dataset directory:
+JSONL shards of a fixed number of records per split
+(``train-00000.jsonl``, ``validation-00000.jsonl``, ...), and a dataset card
+(``README.md``) with the record counts. Splits and near-duplicate removal
+are described in ``lg3k.utils.dataset``.
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ..utils.dataset import (
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_SHARD_RECORDS,
+    DEFAULT_SPLITS,
+    SPLIT_NAMES,
+    RecentKeys,
+    content_key,
+    parse_splits,
+    split_for,
+)
+
+# Lines per batch handed to the sink
+DEFAULT_BATCH_SIZE = 1000
+
+# File name of the dataset card
+CARD_NAME = "README.md"
+
+# Start of the input field in LLM JSON lines, which follows the instruction
+INPUT_KEY = '"input": '
+
+
+class DatasetSink:
+    """Write JSON lines as split, deduplicated JSONL shards."""
+
+    records = False
+
+    def __init__(
+        self,
+        directory: str,
+        shard_records: int = DEFAULT_SHARD_RECORDS,
+        splits: Optional[Dict[str, float]] = None,
+        dedup_window: int = DEFAULT_DEDUP_WINDOW,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        info: Optional[Dict] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            directory: Dataset directory
+            shard_records: Records per shard
+            splits: Fraction of records per split (default 80/10/10)
+            dedup_window: Recent distinct records remembered for duplicate
+                removal (0 to keep duplicates)
+            batch_size: Preferred lines per batch
+            info: Extra facts for the dataset card (e.g. version and seed)
+
+        Raises:
+            ValueError: If shard_records is not positive
+        """
+        if shard_records < 1:
+            raise ValueError("Shards must hold at least one record")
+        self.directory = str(directory)
+        self.shard_records = shard_records
+        self.splits = splits or parse_splits(DEFAULT_SPLITS)
+        self.dedup_window = dedup_window
+        self.batch_size = batch_size
+        self.info = dict(info or {})
+        self.card_path = os.path.join(self.directory, CARD_NAME)
+        self.paths: List[str] = []
+        # Records and shards per split; records and duplicates per service
+        self.counts = dict.fromkeys(SPLIT_NAMES, 0)
+        self.shards = dict.fromkeys(SPLIT_NAMES, 0)
+        self.services: Dict[str, Dict[str, int]] = {}
+        self.bytes_written = 0
+        self._window = RecentKeys(dedup_window) if dedup_window else None
+        self._files = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _shard(self, split: str):
+        """Get the open shard of a split, starting a new one when full."""
+        f = self._files.get(split)
+        if f is not None and self.counts[split] % self.shard_records:
+            return f
+        if f is not None:
+            f.close()
+        path = os.path.join(self.directory, f"{split}-{self.shards[split]:05d}.jsonl")
+        f = self._files[split] = open(path, "w", encoding="utf-8", newline="\n")
+        self.shards[split] += 1
+        self.paths.append(path)
+        return f
+
+    def write_batch(self, service: str, items: List[str]) -> None:
+        """Write a batch of JSON lines.
+
+        Args:
+            service: Service the lines come from
+            items: LLM-format JSON lines, without newlines
+        """
+        # Keys are computed before taking the lock shared by all workers.
+        # They skip the instruction, so a log line asked about in different
+        # ways stays in one split and counts as a duplicate.
+        keyed = [(content_key(item.partition(INPUT_KEY)[2]), item) for item in items]
+        with self._lock:
+            stats = self.services.setdefault(service, {"records": 0, "duplicates": 0})
+            for key, item in keyed:
+                if self._window is not None and self._window.seen(key):
+                    stats["duplicates"] += 1
+                    continue
+                split = split_for(key, self.splits)
+                self.bytes_written += self._shard(split).write(item + "\n")
+                self.counts[split] += 1
+                stats["records"] += 1
+
+    def summary(self) -> Dict:
+        """Summarize the dataset for the card and JSON output."""
+        return {
+            "path": self.directory,
+            "card": self.card_path,
+            "splits": {
+                name: {"records": self.counts[name], "shards": self.shards[name]}
+                for name in SPLIT_NAMES
+            },
+            "services": self.services,
+            "duplicates": sum(stats["duplicates"] for stats in self.services.values()),
+            "dedup_window": self.dedup_window,
+        }
+
+    def write_card(self) -> None:
+        """Write the dataset card with the split and service counts."""
+        summary = self.summary()
+        splits = [name for name in SPLIT_NAMES if self.counts[name]]
+        lines = [
+            "---",
+            "task_categories:",
+            "- text-generation",
+            "configs:",
+            "- config_name: default",
+            "  data_files:",
+            *(f"  - split: {name}\n    path: {name}-*.jsonl" for name in splits),
+            "---",
+            "",
+            "# LG3K synthetic log dataset",
+            "",
+            "Instruction-tuning records (`instruction`, `input`, `output`) "
+            "generated from synthetic logs.",
+            "",
+            f"- Generated: {self.info.get('generated', datetime.now().isoformat())}",
+            *(
+                f"- {key.capitalize()}: {value}"
+                for key, value in self.info.items()
+                if key != "generated" and value is not None
+            ),
+            f"- Records per shard: {self.shard_records}",
+            "",
+            "| Split | Records | Shards |",
+            "| --- | ---: | ---: |",
+            *(
+                f"| {name} | {stats['records']} | {stats['shards']} |"
+                for name, stats in summary["splits"].items()
+            ),
+            "",
+            "| Service | Records | Duplicates removed |",
+            "| --- | ---: | ---: |",
+            *(
+                f"| {name} | {stats['records']} | {stats['duplicates']} |"
+                for name, stats in sorted(self.services.items())
+            ),
+            "",
+        ]
+        if self.dedup_window:
+            lines.append(
+                "Records equal to one of the last "
+                f"{self.dedup_window} kept records apart from their numbers "
+                "(timestamps, IDs, measurements) were removed."
+            )
+        else:
+            lines.append("Duplicate records were kept.")
+        with open(self.card_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def close(self) -> None:
+        """Close the open shards and write the dataset card."""
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+            self.write_card()
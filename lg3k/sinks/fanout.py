@@ -0,0 +1,181 @@
+"""Asynchronous fan-out of batches to several sinks.
+
+Generator threads hand batches to ``FanoutSink.write_batch``, which puts
+them on one bounded asyncio queue per sink. An event loop running in a
+background thread drains all queues concurrently. Each sink's blocking
+``write_batch`` runs on its own worker thread, so a slow collector only
+holds up its own queue. When a queue is full, ``write_batch`` blocks the
+calling generator until there is room (backpressure).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..utils.formats import render_default
+
+# Batches buffered per sink before generators are held back
+DEFAULT_QUEUE_SIZE = 8
+
+
+class FanoutSink:
+    """Send every batch to several sinks concurrently."""
+
+    def __init__(self, sinks: Sequence, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """Initialize the fan-out and start its event loop.
+
+        Args:
+            sinks: Sinks receiving every batch
+            queue_size: Batches buffered per sink
+
+        Raises:
+            ValueError: If no sinks are given or queue_size is not positive
+        """
+        if not sinks:
+            raise ValueError("At least one sink is required")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.sinks = list(sinks)
+        # Record sinks need records; line sinks get lines rendered once here
+        self.records = any(sink.records for sink in self.sinks)
+        self._needs_lines = not all(sink.records for sink in self.sinks)
+        self.batch_size = min(getattr(sink, "batch_size", 1000) for sink in self.sinks)
+        self.queue_size = queue_size
+        self._renderers: Dict[str, Callable] = {}
+        self._error = None
+        self._closed = False
+        self._executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="lg3k-sink")
+            for _ in self.sinks
+        ]
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="lg3k-fanout", daemon=True
+        )
+        self._thread.start()
+        self._queues, self._tasks = self._call(self._start())
+
+    @property
+    def paths(self) -> List[str]:
+        """Paths of the sinks that write local files."""
+        return [sink.path for sink in self.sinks if getattr(sink, "path", None)]
+
+    @property
+    def queue_depths(self) -> List[int]:
+        """Number of batches waiting per sink."""
+        return [queue.qsize() for queue in self._queues]
+
+    def register(
+        self,
+        service: str,
+        renderer: Callable,
+        fields: Optional[Dict[str, type]] = None,
+    ) -> None:
+        """Set up a service's output.
+
+        Args:
+            service: Service name
+            renderer: Function turning the service's records into lines
+            fields: The module's declared record fields, passed on to
+                sinks that create tables from them
+        """
+        self._renderers[service] = renderer
+        if fields:
+            for sink in self.sinks:
+                if hasattr(sink, "declare"):
+                    sink.declare(service, fields)
+
+    def _call(self, coroutine):
+        """Run a coroutine on the event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _start(self):
+        """Create the queues and drain tasks on the event loop."""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.sinks]
+        tasks = [
+            asyncio.ensure_future(self._drain(sink, queue, executor))
+            for sink, queue, executor in zip(self.sinks, queues, self._executors)
+        ]
+        return queues, tasks
+
+    async def _drain(self, sink, queue: asyncio.Queue, executor) -> None:
+        """Write queued batches to a sink until the end marker arrives."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            # After a failure keep draining so generators are never stuck
+            if self._error is not None:
+                continue
+            service, records, lines = item
+            try:
+                await loop.run_in_executor(
+                    executor,
+                    sink.write_batch,
+                    service,
+                    records if sink.records else lines,
+                )
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+
+    async def _put(self, item) -> None:
+        """Queue an item for every sink, waiting while queues are full."""
+        for queue in self._queues:
+            await queue.put(item)
+
+    def write_batch(self, service: str, items: List) -> None:
+        """Queue a batch for all sinks.
+
+        Args:
+            service: Service the batch belongs to
+            items: Records if any sink takes records, otherwise lines
+
+        Raises:
+            Exception: The first error raised by a sink
+        """
+        if self._error is not None:
+            raise self._error
+        lines = items
+        if self.records and self._needs_lines:
+            render = self._renderers.get(service, render_default)
+            lines = [render(record) for record in items]
+        self._call(self._put((service, items, lines)))
+
+    async def _finish(self) -> None:
+        """Drain the queues and close every sink concurrently."""
+        await self._put(None)
+        await asyncio.gather(*self._tasks)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, sink.close)
+                for sink, executor in zip(self.sinks, self._executors)
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception) and self._error is None:
+                self._error = result
+
+    def close(self) -> None:
+        """Flush all queues, close the sinks and stop the event loop.
+
+        Raises:
+            Exception: The first error raised by a sink
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._call(self._finish())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            for executor in self._executors:
+                executor.shutdown()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,173 @@
+"""Kafka producer sink.
+
+Publishes rendered lines to Kafka with the optional ``kafka-python``
+package. The producer keeps a pooled connection per broker, batches
+records per partition by size and linger time, pipelines several in-flight
+requests per connection and retries failed sends with backoff. The
+service name is used as the message key.
+
+URIs::
+
+    kafka://broker1:9092,broker2:9092/lg3k-{service}?acks=1&compression=gzip
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+from .base import (
+    DEFAULT_BACKOFF,
+    DEFAULT_BATCH_BYTES,
+    DEFAULT_LINGER,
+    DEFAULT_RETRIES,
+    batching_options,
+    parse_options,
+)
+
+try:
+    from kafka import KafkaProducer
+
+    HAS_KAFKA = True
+except ImportError:
+    KafkaProducer = None
+    HAS_KAFKA = False
+
+DEFAULT_PORT = 9092
+DEFAULT_TOPIC = "lg3k-{service}"
+COMPRESSION_TYPES = ("gzip", "snappy", "lz4", "zstd")
+
+
+def parse_kafka_uri(uri: str) -> Tuple[List[str], str, Dict[str, str]]:
+    """Split a Kafka sink URI into brokers, topic and options.
+
+    Args:
+        uri: ``kafka://host[:port][,host[:port]...][/topic][?options]``
+
+    Returns:
+        Tuple of (bootstrap servers, topic template, options)
+
+    Raises:
+        ValueError: If no broker is given
+    """
+    _, _, rest = uri.partition("://")
+    location = rest.split("?", 1)[0]
+    netloc, _, topic = location.partition("/")
+    brokers = [
+        broker if ":" in broker else f"{broker}:{DEFAULT_PORT}"
+        for broker in netloc.split(",")
+        if broker
+    ]
+    if not brokers:
+        raise ValueError(f"No broker in sink URI '{uri}'")
+    return brokers, topic or DEFAULT_TOPIC, parse_options(uri)
+
+
+class KafkaSink:
+    """Publish rendered log lines to Kafka topics."""
+
+    records = False
+    batch_size = 1000
+
+    def __init__(
+        self,
+        brokers: List[str],
+        topic: str = DEFAULT_TOPIC,
+        acks: str = "1",
+        compression: str = None,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        linger: float = DEFAULT_LINGER,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        batch_size: int = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            brokers: Bootstrap servers as "host:port" strings
+            topic: Topic name; ``{service}`` is replaced by the service name
+            acks: Required acknowledgements: "0", "1" or "all"
+            compression: Compression codec, one of COMPRESSION_TYPES
+            batch_bytes: Producer batch size per partition in bytes
+            linger: Producer linger time in seconds
+            retries: Retries per failed request
+            backoff: Delay between retries in seconds
+            batch_size: Lines handed to the sink per call
+
+        Raises:
+            ImportError: If kafka-python is not installed
+            ValueError: If an option is invalid
+        """
+        if not HAS_KAFKA:
+            raise ImportError("kafka-python is required for kafka:// sinks")
+        if compression is not None and compression not in COMPRESSION_TYPES:
+            raise ValueError(
+                f"Unsupported Kafka compression '{compression}'. "
+                f"Available codecs: {', '.join(COMPRESSION_TYPES)}"
+            )
+        if batch_size:
+            self.batch_size = batch_size
+        self.topic = topic
+        self._topics = {}
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._producer = KafkaProducer(
+            bootstrap_servers=brokers,
+            acks=acks if acks == "all" else int(acks),
+            compression_type=compression,
+            batch_size=batch_bytes,
+            linger_ms=int(linger * 1000),
+            retries=retries,
+            retry_backoff_ms=int(backoff * 1000),
+            max_in_flight_requests_per_connection=5,
+        )
+
+    def _on_error(self, error: Exception) -> None:
+        """Remember the first failed delivery."""
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def write_batch(self, service: str, items: List[str]) -> None:
+        """Queue lines for delivery.
+
+        Args:
+            service: Service the lines belong to
+            items: Rendered log lines
+        """
+        topic = self._topics.get(service)
+        if topic is None:
+            topic = self._topics[service] = self.topic.format(service=service)
+        key = service.encode("utf-8")
+        send = self._producer.send
+        for line in items:
+            send(topic, value=line.encode("utf-8"), key=key).add_errback(self._on_error)
+
+    def close(self) -> None:
+        """Wait for outstanding deliveries and close the producer.
+
+        Raises:
+            RuntimeError: If any message could not be delivered
+        """
+        try:
+            self._producer.flush()
+        finally:
+            self._producer.close()
+        if self._error is not None:
+            raise RuntimeError(f"Kafka delivery failed: {self._error}")
+
+
+def create_sink(uri: str, **options):
+    """Create a Kafka sink from a URI.
+
+    Args:
+        uri: ``kafka://brokers/topic?acks=...&compression=...``
+        **options: Extra keyword arguments for the sink
+
+    Returns:
+        The sink instance
+    """
+    brokers, topic, query = parse_kafka_uri(uri)
+    options = {**batching_options(query), **options}
+    for name in ("acks", "compression"):
+        if name in query:
+            options.setdefault(name, query[name])
+    return KafkaSink(brokers, topic, **options)
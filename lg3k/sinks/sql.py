@@ -0,0 +1,252 @@
+"""SQLite and DuckDB bulk-load sinks.
+
+Each service gets its own table, created from the module's declared
+record fields (see ``declare``) and extended with any other keys its
+records have. Records are inserted with batched ``executemany`` calls on a single
+prepared statement per table, inside large transactions. SQLite databases
+use WAL journaling. DuckDB support requires the optional ``duckdb`` package.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+try:
+    import duckdb
+
+    HAS_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAS_DUCKDB = False
+
+# Rows per executemany call
+DEFAULT_BATCH_SIZE = 10_000
+
+# Rows per transaction before committing
+DEFAULT_COMMIT_EVERY = 500_000
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def parse_path(uri: str) -> str:
+    """Extract the database path from a ``scheme:///path`` URI.
+
+    Follows the SQLAlchemy convention: ``sqlite:///logs.db`` is relative,
+    ``sqlite:////tmp/logs.db`` is absolute.
+
+    Args:
+        uri: Sink URI
+
+    Returns:
+        Database file path
+
+    Raises:
+        ValueError: If the URI has no path
+    """
+    _, _, rest = uri.partition("://")
+    path = rest.split("?", 1)[0]
+    if path.startswith("/"):
+        path = path[1:]
+    if not path:
+        raise ValueError(f"No database path in sink URI '{uri}'")
+    return path
+
+
+class SQLiteSink:
+    """Bulk-load records into a SQLite database, one table per service."""
+
+    records = True
+    # Column types per Python value type
+    TYPE_NAMES = {bool: "INTEGER", int: "INTEGER", float: "REAL", datetime: "TEXT"}
+    DEFAULT_TYPE = "TEXT"
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        commit_every: int = DEFAULT_COMMIT_EVERY,
+    ):
+        """Initialize the sink.
+
+        Args:
+            path: Database file path
+            batch_size: Rows per executemany call
+            commit_every: Rows per transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._fields: Dict[str, Dict[str, type]] = {}
+        self._pending = 0
+        self._in_transaction = False
+        self._conn = self._connect()
+
+    def _connect(self):
+        """Open the connection and tune it for bulk loading."""
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _begin(self) -> None:
+        """Start a transaction if none is open."""
+        if not self._in_transaction:
+            self._conn.execute("BEGIN")
+            self._in_transaction = True
+
+    def _commit(self) -> None:
+        """Commit the open transaction, if any."""
+        if self._in_transaction:
+            self._conn.execute("COMMIT")
+            self._in_transaction = False
+            self._pending = 0
+
+    def _convert(self, value):
+        """Convert a record value to a bindable parameter."""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def declare(self, service: str, fields: Dict[str, type]) -> None:
+        """Declare the record fields of a service's table.
+
+        Args:
+            service: Service name
+            fields: Field names and Python types (a module's RECORD_FIELDS)
+        """
+        with self._lock:
+            self._fields[service] = dict(fields)
+
+    def _column_type(self, service: str, rows: List[Dict], column: str) -> str:
+        """Pick a column type from the declared fields or a batch's values."""
+        kind = self._fields.get(service, {}).get(column)
+        if kind is not None:
+            return self.TYPE_NAMES.get(kind, self.DEFAULT_TYPE)
+        for row in rows:
+            value = row.get(column)
+            if value is not None:
+                return self.TYPE_NAMES.get(type(value), self.DEFAULT_TYPE)
+        return self.DEFAULT_TYPE
+
+    def _prepare_table(self, service: str, rows: List[Dict]):
+        """Create or extend the service table and return its insert plan."""
+        keys = list(
+            dict.fromkeys(
+                [*self._fields.get(service, ()), *(key for row in rows for key in row)]
+            )
+        )
+        name = quote_identifier(service)
+        table = self._tables.get(service)
+        if table is None:
+            columns = ", ".join(
+                f"{quote_identifier(key)} {self._column_type(service, rows, key)}"
+                for key in keys
+            )
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns})")
+            # The table may predate this run, so read its actual columns
+            cursor = self._conn.execute(f"SELECT * FROM {name} LIMIT 0")
+            table = {"columns": [column[0] for column in cursor.description]}
+        existing = set(table["columns"])
+        new_keys = [key for key in keys if key not in existing]
+        for key in new_keys:
+            self._conn.execute(
+                f"ALTER TABLE {name} ADD COLUMN "
+                f"{quote_identifier(key)} {self._column_type(service, rows, key)}"
+            )
+        if new_keys or "sql" not in table:
+            columns = table["columns"] + new_keys
+            placeholders = ", ".join("?" for _ in columns)
+            table = {
+                "columns": columns,
+                "sql": (
+                    f"INSERT INTO {name} "
+                    f"({', '.join(quote_identifier(c) for c in columns)}) "
+                    f"VALUES ({placeholders})"
+                ),
+            }
+            self._tables[service] = table
+        return table
+
+    def write_batch(self, service: str, items: List[Dict]) -> None:
+        """Insert a batch of records into the service's table.
+
+        Args:
+            service: Service name, used as the table name
+            items: Records to insert
+        """
+        if not items:
+            return
+        convert = self._convert
+        with self._lock:
+            table = self._prepare_table(service, items)
+            columns = table["columns"]
+            rows = [tuple(convert(row.get(c)) for c in columns) for row in items]
+            self._begin()
+            self._conn.executemany(table["sql"], rows)
+            self._pending += len(rows)
+            if self._pending >= self.commit_every:
+                self._commit()
+
+    def close(self) -> None:
+        """Commit pending rows and close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._commit()
+                self._conn.close()
+                self._conn = None
+
+
+class DuckDBSink(SQLiteSink):
+    """Bulk-load records into a DuckDB database, one table per service."""
+
+    TYPE_NAMES = {
+        bool: "BOOLEAN",
+        int: "BIGINT",
+        float: "DOUBLE",
+        datetime: "TIMESTAMP",
+    }
+    DEFAULT_TYPE = "VARCHAR"
+
+    def _connect(self):
+        """Open the DuckDB database."""
+        if not HAS_DUCKDB:
+            raise ImportError("duckdb is required for duckdb:// sinks")
+        return duckdb.connect(self.path)
+
+    def _begin(self) -> None:
+        """Start a transaction if none is open."""
+        if not self._in_transaction:
+            self._conn.execute("BEGIN TRANSACTION")
+            self._in_transaction = True
+
+    def _convert(self, value):
+        """Convert a record value to a bindable parameter (datetimes are native)."""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+
+def create_sink(uri: str, **options):
+    """Create a SQLite or DuckDB sink from a URI.
+
+    Args:
+        uri: ``sqlite:///path.db`` or ``duckdb:///path.duckdb``
+        **options: Extra keyword arguments for the sink
+
+    Returns:
+        The sink instance
+    """
+    path = parse_path(uri)
+    if urlsplit(uri).scheme.lower() == "duckdb":
+        return DuckDBSink(path, **options)
+    return SQLiteSink(path, **options)
@@ -0,0 +1,448 @@
+"""Rule tables explaining log records.
+
+The analysis in LLM-format output comes from rules declared per module.
+Each rule looks at one field of a record:
+
+- ``present``: the explanation applies whenever the field is present
+- ``values``: explanations per field value
+- ``ranges``: (lower bound, explanation) pairs in increasing order; the
+  explanation of the highest bound not above the value applies (None for
+  no explanation)
+
+A rule may also name a field that must be present (``requires``).
+Explanations are format strings over the record's fields and are skipped
+when the record lacks one of them.
+
+Rules are compiled once per module into dispatch tables: dicts for
+``values`` and sorted bounds searched with bisect for ``ranges``. Records
+are then explained without walking condition chains.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, List, Mapping, Optional
+
+# Rules applied to every module's records
+COMMON_RULES = [
+    {
+        "field": "level",
+        "values": {
+            "CRITICAL": "This is a critical level event that requires immediate "
+            "attention.",
+            "ERROR": "This is a error level event that requires immediate attention.",
+            "WARNING": "This is a warning that may require investigation.",
+        },
+    },
+]
+
+ANALYSIS_RULES: Dict[str, List[Dict]] = {
+    "api": [
+        {
+            "field": "status",
+            "ranges": [
+                (200, "API request completed successfully."),
+                (300, "API request resulted in a redirection."),
+                (400, "Client-side error detected in API request."),
+                (500, "Server-side error detected in API response."),
+            ],
+        },
+        {
+            "field": "status",
+            "values": {
+                401: "The request was not authenticated; check the client's "
+                "credentials or token expiry.",
+                403: "{user} is not allowed to access {endpoint}.",
+                404: "{endpoint} was not found; check for stale links or wrong "
+                "IDs in the client.",
+                500: "Check the API service logs around this time for an "
+                "unhandled exception.",
+            },
+        },
+        {
+            "field": "method",
+            "values": {
+                "POST": "The {method} request creates data.",
+                "PUT": "The {method} request replaces data.",
+                "DELETE": "The {method} request removes data.",
+            },
+            "requires": "endpoint",
+        },
+    ],
+    "database": [
+        {"field": "query", "present": "Database query execution logged."},
+        {
+            "field": "duration",
+            "ranges": [(1000, "Query execution time is unusually high.")],
+            "requires": "query",
+        },
+        {
+            "field": "operation",
+            "values": {
+                "SELECT": "Rows were read from the {table} table.",
+                "INSERT": "Rows were added to the {table} table.",
+                "UPDATE": "Rows in the {table} table were modified.",
+                "DELETE": "Rows were removed from the {table} table.",
+                "TRANSACTION": "A transaction ran on the {table} table.",
+            },
+        },
+        {
+            "field": "duration",
+            "ranges": [
+                (
+                    1.0,
+                    "The operation took {duration}s; check indexes and lock "
+                    "contention on {table}.",
+                ),
+            ],
+            "requires": "operation",
+        },
+    ],
+    "firewall": [
+        {
+            "field": "action",
+            "values": {
+                "ALLOW": "{protocol} traffic from {src_ip} to port {port} was "
+                "allowed by policy.",
+                "BLOCK": "{protocol} traffic from {src_ip} to port {port} was "
+                "blocked; repeated blocks from one source can indicate a scan.",
+                "DROP": "{protocol} packets from {src_ip} to port {port} were "
+                "silently dropped.",
+            },
+        },
+        {
+            "field": "port",
+            "values": {
+                22: "Port 22 is SSH; unexpected attempts may be brute-force logins.",
+                80: "Port 80 is plain HTTP.",
+                443: "Port 443 is HTTPS.",
+                3306: "Port 3306 is MySQL, which should not be exposed.",
+                5432: "Port 5432 is PostgreSQL, which should not be exposed.",
+            },
+        },
+    ],
+    "nas": [
+        {
+            "field": "operation",
+            "values": {
+                "READ": "The {file_type} file was read from the {share} share.",
+                "WRITE": "The {file_type} file was written to the {share} share.",
+                "DELETE": "The {file_type} file was deleted from the {share} share; "
+                "confirm the deletion was intended.",
+                "MOVE": "The {file_type} file was moved on the {share} share.",
+                "COPY": "The {file_type} file was copied on the {share} share.",
+            },
+        },
+        {
+            "field": "size_mb",
+            "ranges": [(500, "Transfers of {size_mb}MB can saturate the link.")],
+        },
+        {
+            "field": "share",
+            "values": {"public": "Files on the public share are visible to all."},
+        },
+    ],
+    "network": [
+        {
+            "field": "event",
+            "values": {
+                "UP": "The {device} is up and passing traffic.",
+                "DOWN": "The {device} is down; its clients lose connectivity.",
+                "DEGRADED": "The {device} is degraded ({metric} at {value}%).",
+                "CONGESTED": "The {device} is congested; consider traffic "
+                "shaping or more capacity.",
+            },
+        },
+        {
+            "field": "value",
+            "ranges": [(90, "A {metric} reading of {value}% is near its limit.")],
+            "requires": "metric",
+        },
+    ],
+    "os": [
+        {
+            "field": "event",
+            "values": {
+                "started": "Service {service} started.",
+                "stopped": "Service {service} stopped.",
+                "restarted": "Service {service} restarted; frequent restarts "
+                "suggest a crash loop.",
+                "failed": "Service {service} failed; check its logs and restart it.",
+            },
+        },
+        {
+            "field": "usage",
+            "ranges": [
+                (75, "{resource} usage is high at {usage}%."),
+                (90, "{resource} usage is critical at {usage}%."),
+            ],
+        },
+    ],
+    "printer": [
+        {
+            "field": "status",
+            "values": {
+                "completed": "The {job_type} job printed {pages} pages.",
+                "pending": "The {job_type} job is waiting in the queue.",
+                "error": "The {job_type} job failed; check the printer for jams "
+                "or connection problems.",
+                "cancelled": "The {job_type} job was cancelled.",
+            },
+        },
+        {
+            "field": "supply_level",
+            "ranges": [
+                (0, "The {supply} supply is empty; replace it."),
+                (1, "The {supply} supply is low at {supply_level}%."),
+                (16, None),
+            ],
+        },
+    ],
+    "smarthome": [
+        {
+            "field": "state",
+            "values": {
+                "heating": "The thermostat in {location} is heating.",
+                "cooling": "The thermostat in {location} is cooling.",
+                "idle": "The thermostat in {location} is idle.",
+                "fan_only": "The thermostat in {location} runs only its fan.",
+                "on": "The light in {location} was switched on.",
+                "off": "The light in {location} was switched off.",
+                "dimmed": "The light in {location} was dimmed.",
+                "motion_detected": "Motion was detected in {location}.",
+                "clear": "No motion is detected in {location}.",
+                "tamper": "The {type} in {location} reports tampering.",
+                "locked": "The door lock in {location} is locked.",
+                "unlocked": "The door lock in {location} is unlocked.",
+                "jammed": "The {type} in {location} is jammed; check it.",
+            },
+        },
+        {
+            "field": "event_details",
+            "values": {
+                "person": "The camera in {location} detected a person.",
+                "vehicle": "The camera in {location} detected a vehicle.",
+                "animal": "The camera in {location} detected an animal.",
+                "package": "The camera in {location} detected a package.",
+                "continuous": "The camera in {location} is recording continuously.",
+                "motion": "The camera in {location} is recording on motion.",
+                "scheduled": "The camera in {location} is recording on schedule.",
+                "startup": "The camera in {location} started up.",
+                "shutdown": "The camera in {location} shut down.",
+                "error": "The {type} camera in {location} reports a system error.",
+            },
+        },
+        {
+            "field": "event",
+            "values": {
+                "device_join": "A device joined the {protocol} network.",
+                "device_leave": "A device left the {protocol} network.",
+                "child_join": "A child device joined {protocol} router {device_id}.",
+                "child_leave": "A child device left {protocol} router {device_id}.",
+                "inclusion": "The {protocol} controller added a node to the network.",
+                "exclusion": "The {protocol} controller removed a node from the "
+                "network.",
+                "network_scan": "The {protocol} coordinator scanned for networks.",
+                "channel_change": "The {protocol} network changed its channel.",
+                "heal": "The {protocol} controller is healing the network routes.",
+                "network_update": "The {protocol} controller updated the network.",
+                "route_update": "{device_id} updated its {protocol} routes.",
+                "neighbor_table": "{device_id} refreshed its {protocol} neighbor "
+                "table.",
+                "data_send": "{device_id} sent data over {protocol}.",
+                "command": "{device_id} received a {protocol} command.",
+                "report": "{device_id} sent a {protocol} report.",
+                "forward": "{device_id} forwarded a {protocol} frame.",
+                "ack": "{device_id} acknowledged a {protocol} frame.",
+                "sleep": "{device_id} went to sleep to save battery.",
+                "wake": "{device_id} woke up.",
+                "battery_report": "{device_id} reported its battery level.",
+            },
+            "requires": "protocol",
+        },
+        {
+            "field": "battery_level",
+            "ranges": [
+                (0, "{device_id} battery is low at {battery_level}%."),
+                (20, None),
+            ],
+        },
+        {
+            "field": "battery",
+            "ranges": [(0, "{device_id} battery is low at {battery}%."), (20, None)],
+        },
+        {
+            "field": "wifi_rssi",
+            "ranges": [
+                (-100, "{device_id} has a weak Wi-Fi signal ({wifi_rssi} dBm)."),
+                (-75, None),
+            ],
+        },
+        {
+            "field": "free_heap",
+            "ranges": [
+                (0, "{device_id} is low on memory ({free_heap} bytes free)."),
+                (40_000, None),
+            ],
+        },
+        {
+            "field": "operation",
+            "values": {
+                "Deep sleep": "{device_id} enters deep sleep for " "{sleep_duration}s.",
+                "ADC reading": "{device_id} read {adc_value} from its ADC.",
+                "MQTT publish": "{device_id} published to the {topic} MQTT topic.",
+                "OTA update": "{device_id} is updating its firmware to "
+                "{firmware_version}.",
+            },
+        },
+    ],
+    "web_server": [
+        {"field": "method", "present": "Web server processed a {method} request."},
+        {"field": "path", "present": "Accessed path: {path}.", "requires": "method"},
+        {
+            "field": "status",
+            "ranges": [
+                (200, None),
+                (400, "The request failed with client error {status}."),
+                (500, "The server failed to handle the request ({status})."),
+            ],
+        },
+        {
+            "field": "status",
+            "values": {
+                301: "The resource moved permanently; links to it should be "
+                "updated.",
+                304: "The client's cached copy is still valid.",
+            },
+        },
+        {
+            "field": "duration",
+            "ranges": [(1.0, "The response took {duration}s, which is slow.")],
+            "requires": "status",
+        },
+    ],
+}
+
+# Notes on the "type" field of generic records, per service
+TYPE_NOTES = {
+    "api": {"graphql": "This is a GraphQL API log", "rest": "This is a REST API log"},
+}
+
+
+def compile_template(template: Optional[str]) -> Optional[Callable]:
+    """Compile an explanation into a function of the record.
+
+    Args:
+        template: Format string over record fields (None for no explanation)
+
+    Returns:
+        Function returning the explanation, or None if the record lacks a
+        field it uses; None if there is no template
+    """
+    if template is None:
+        return None
+    fields = [name for _, name, _, _ in Formatter().parse(template) if name]
+    if not fields:
+        return lambda record: template
+    return lambda record: (
+        template.format_map(record) if all(name in record for name in fields) else None
+    )
+
+
+def compile_rule(rule: Dict) -> Callable[[Mapping], Optional[str]]:
+    """Compile one rule into a function explaining a record.
+
+    Args:
+        rule: Rule with "field", one of "present", "values" or "ranges", and
+            optionally "requires"
+
+    Returns:
+        Function returning the rule's explanation of a record, or None
+
+    Raises:
+        ValueError: If the rule has no known kind or unsorted ranges
+    """
+    field = rule["field"]
+    requires = rule.get("requires")
+    if "present" in rule:
+        render = compile_template(rule["present"])
+
+        def explain(record):
+            return render(record)
+
+    elif "values" in rule:
+        table = {
+            value: compile_template(template)
+            for value, template in rule["values"].items()
+        }
+
+        def explain(record):
+            try:
+                render = table.get(record[field])
+            except TypeError:
+                return None
+            return render(record) if render is not None else None
+
+    elif "ranges" in rule:
+        bounds = [bound for bound, _ in rule["ranges"]]
+        if bounds != sorted(bounds):
+            raise ValueError(f"Ranges of rule for '{field}' are not sorted")
+        renders = [compile_template(template) for _, template in rule["ranges"]]
+
+        def explain(record):
+            value = record[field]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            index = bisect_right(bounds, value) - 1
+            if index < 0 or renders[index] is None:
+                return None
+            return renders[index](record)
+
+    else:
+        raise ValueError(f"Rule for '{field}' has no present, values or ranges")
+
+    def apply(record):
+        if field not in record or (requires is not None and requires not in record):
+            return None
+        return explain(record)
+
+    return apply
+
+
+@lru_cache(maxsize=None)
+def get_analyzer(module_name: str) -> Callable[[Mapping], List[str]]:
+    """Get the compiled analyzer of a module (common rules for others).
+
+    Args:
+        module_name: Module name
+
+    Returns:
+        Function returning the explanations of a record
+    """
+    rules = [
+        compile_rule(rule)
+        for rule in COMMON_RULES + ANALYSIS_RULES.get(module_name, [])
+    ]
+
+    def analyze(record: Mapping) -> List[str]:
+        explanations = []
+        for rule in rules:
+            text = rule(record)
+            if text is not None:
+                explanations.append(text)
+        return explanations
+
+    return analyze
+
+
+def analyze(module_name: str, record: Mapping) -> List[str]:
+    """Explain a record with the rules of its module.
+
+    Args:
+        module_name: Module name
+        record: Log record
+
+    Returns:
+        Explanations, severity first
+    """
+    return get_analyzer(module_name)(record)
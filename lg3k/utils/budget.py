@@ -0,0 +1,140 @@
+"""Byte budgets for size-targeted generation.
+
+``--target-bytes`` sizes a run by volume instead of line count. A total
+budget is split across services in proportion to their configured
+weights, and each service's writer counts the bytes of every line and
+stops exactly at its share. The last line is cut short to fit, except in
+JSON lines output, where a cut record would not parse: those writers stop
+before the line that would overflow, just under their share.
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+# Bytes per size unit (decimal and binary)
+SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1000,
+    "kb": 1000,
+    "m": 1000**2,
+    "mb": 1000**2,
+    "g": 1000**3,
+    "gb": 1000**3,
+    "t": 1000**4,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$")
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as "50GB", "512MiB" or "1000".
+
+    Args:
+        value: Size string; bare numbers are bytes
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValueError: If the size is malformed or not positive
+    """
+    match = SIZE_PATTERN.match(value.lower())
+    if not match or match.group(2) not in SIZE_UNITS:
+        raise ValueError(f"Invalid size '{value}' (use e.g. 500MB, 50GB, 1GiB)")
+    size = int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+    if size <= 0:
+        raise ValueError(f"Size must be positive: '{value}'")
+    return size
+
+
+def allocate_bytes(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Split a byte budget across services by weight.
+
+    Shares are rounded with the largest remainder method, so they add up
+    to exactly ``total``.
+
+    Args:
+        total: Bytes to allocate
+        weights: Weight per service, in service order
+
+    Returns:
+        Bytes per service
+
+    Raises:
+        ValueError: If a weight is negative or all weights are zero
+    """
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Service weights must not be negative")
+    weight_sum = sum(weights.values())
+    if weight_sum <= 0:
+        raise ValueError("At least one service needs a positive weight")
+    exact = {name: total * weight / weight_sum for name, weight in weights.items()}
+    shares = {name: int(value) for name, value in exact.items()}
+    by_remainder = sorted(exact, key=lambda name: shares[name] - exact[name])
+    for name in by_remainder[: total - sum(shares.values())]:
+        shares[name] += 1
+    return shares
+
+
+def build_targets(
+    values: Iterable[str], services: Iterable[str], weights: Dict[str, float]
+) -> Optional[Dict[str, int]]:
+    """Resolve --target-bytes values into a byte target per service.
+
+    Args:
+        values: "SIZE" for a total split by weight, or "service=SIZE"
+        services: Services in the run
+        weights: Configured weight per service (default 1)
+
+    Returns:
+        Bytes per service, or None if no targets were given
+
+    Raises:
+        ValueError: If a value is malformed or names an unknown service
+    """
+    services = list(services)
+    total = None
+    targets: Dict[str, int] = {}
+    for value in values:
+        name, sep, size = value.rpartition("=")
+        if not sep:
+            total = parse_size(size)
+        elif name not in services:
+            raise ValueError(f"--target-bytes names unknown service '{name}'")
+        else:
+            targets[name] = parse_size(size)
+    if total is None and not targets:
+        return None
+    if total is not None:
+        rest = [name for name in services if name not in targets]
+        remaining = total - sum(targets.values())
+        if rest:
+            targets.update(
+                allocate_bytes(
+                    max(remaining, 0),
+                    {name: float(weights.get(name, 1)) for name in rest},
+                )
+            )
+    return targets
+
+
+def fit_line(line: str, size: int) -> str:
+    """Cut a newline-terminated line to exactly ``size`` UTF-8 bytes.
+
+    Args:
+        line: Line ending in a newline
+        size: Bytes the result must take (at least 1)
+
+    Returns:
+        Line of ``size`` bytes that still ends in a newline
+    """
+    body = line.encode("utf-8")[: size - 1].decode("utf-8", "ignore")
+    # A multi-byte character cut in half is padded with spaces
+    padding = size - 1 - len(body.encode("utf-8"))
+    return body + " " * padding + "\n"
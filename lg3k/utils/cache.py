@@ -0,0 +1,209 @@
+"""Corpus cache for replaying seeded output.
+
+A seeded run's output depends only on its settings, so a service's text
+file can be stored and replayed instead of generated again. Entries are
+keyed by a hash of everything the output depends on: the service's
+config section, seed, limits, format, and the module source and lg3k
+version. The file is stored gzip-compressed next to a small JSON file
+with its line count and timestamps.
+
+The cache is kept under a total size. Replaying an entry marks it as
+recently used, and the least recently used entries are removed first.
+Replays can shift timestamps to the replaying run's start time (see
+``lg3k.utils.restamp``).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from .restamp import Restamper
+
+# Default cache size limit
+DEFAULT_CACHE_SIZE = "10GB"
+
+# Compression level of cached files (fast, since entries are written once
+# per new setting and read many times)
+COMPRESS_LEVEL = 1
+
+# Bytes replayed at a time
+REPLAY_CHUNK_SIZE = 1 << 20
+
+
+def module_version(generator_func: Callable) -> str:
+    """Identify the code a module's output depends on.
+
+    Args:
+        generator_func: Any function of the module
+
+    Returns:
+        lg3k version plus a hash of the module's source file
+    """
+    from .. import __version__
+
+    module = sys.modules.get(getattr(generator_func, "__module__", ""))
+    digest = hashlib.sha256()
+    path = getattr(module, "__file__", None)
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return f"{__version__}+{digest.hexdigest()[:16]}"
+
+
+def cache_key(settings: Dict) -> str:
+    """Hash the settings a cached output depends on.
+
+    Args:
+        settings: JSON-serializable settings
+
+    Returns:
+        Hex key
+    """
+    text = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CorpusCache:
+    """Size-limited store of compressed output files."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the entries
+            max_bytes: Total size of compressed entries to keep
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: str):
+        """Get the data and metadata paths of an entry."""
+        base = os.path.join(self.directory, key)
+        return f"{base}.gz", f"{base}.json"
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Find an entry and mark it as recently used.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            The entry's metadata, or None if it is not cached
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(data_path)
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def store(self, key: str, source: str, meta: Dict) -> None:
+        """Compress a finished output file into the cache.
+
+        Args:
+            key: Entry key
+            source: Output file to store
+            meta: Metadata returned by lookup() on later runs
+        """
+        data_path, meta_path = self._paths(key)
+        # Other runs may share the cache, so temporary files are per process
+        suffix = f".{os.getpid()}.tmp"
+        with open(source, "rb") as src, open(data_path + suffix, "wb") as raw:
+            # No file name or time in the header, so entries are reproducible
+            with gzip.GzipFile("", "wb", COMPRESS_LEVEL, raw, mtime=0) as dst:
+                shutil.copyfileobj(src, dst, REPLAY_CHUNK_SIZE)
+        os.replace(data_path + suffix, data_path)
+        with open(meta_path + suffix, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+        self.evict(keep=key)
+
+    def replay(
+        self,
+        key: str,
+        output: str,
+        shift=None,
+        write: Optional[Callable[[bytes], None]] = None,
+    ) -> int:
+        """Write a cached entry to an output file.
+
+        Args:
+            key: Entry key
+            output: File to write
+            shift: Optional timedelta to move timestamps by
+            write: Optional callback receiving every written chunk
+
+        Returns:
+            Bytes written
+        """
+        data_path, _ = self._paths(key)
+        restamper = Restamper(shift) if shift else None
+        written = 0
+        pending = b""
+        with gzip.open(data_path, "rb") as src, open(output, "wb") as dst:
+            while True:
+                chunk = data = src.read(REPLAY_CHUNK_SIZE)
+                if restamper is not None:
+                    # Only whole lines are re-stamped; the rest waits for the
+                    # next chunk
+                    data = pending + chunk
+                    cut = data.rfind(b"\n") + 1 if chunk else len(data)
+                    data, pending = restamper.apply(data[:cut]), data[cut:]
+                if data:
+                    dst.write(data)
+                    written += len(data)
+                    if write is not None:
+                        write(data)
+                if not chunk:
+                    break
+        return written
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the cache fits its size.
+
+        Args:
+            keep: Key of an entry never to remove (the one just stored)
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".gz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-3]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+
+def entry_range(meta: Dict, shift=None) -> tuple:
+    """Get an entry's (earliest, latest) timestamps, shifted if requested."""
+    values = []
+    for field in ("min_timestamp", "max_timestamp"):
+        value = meta.get(field)
+        if value is not None:
+            value = datetime.fromisoformat(value)
+            if shift:
+                value += shift
+        values.append(value)
+    return tuple(values)
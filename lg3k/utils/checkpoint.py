@@ -0,0 +1,181 @@
+"""Checkpoint manifests for resumable runs.
+
+A checkpointed run seeds each service's generator and gives its worker
+thread a synthetic clock (see ``rng`` and ``timestamp``), so a service's
+output depends only on the run seed. After writing a batch, the worker
+periodically records the lines written, the file's byte offset and the
+generator and clock state in a sidecar manifest. The manifest is
+replaced atomically. ``--resume`` truncates each file to its last
+checkpoint, restores the state and continues, producing the same bytes
+as an uninterrupted run.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .rng import get_rng, get_state, set_state
+from .timestamp import SyntheticClock, get_clock, set_clock
+
+# Manifest file name inside the output directory
+MANIFEST_NAME = "checkpoint.json"
+
+# Seconds between checkpoints when enabled without an interval
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+
+# Manifest layout version
+MANIFEST_VERSION = 1
+
+
+class CheckpointManifest:
+    """Run settings and per-service checkpoints, saved as JSON."""
+
+    def __init__(
+        self,
+        path: str,
+        seed: int,
+        count: int,
+        start: str,
+        modules: Optional[Dict[str, Dict]] = None,
+    ):
+        """Initialize the manifest.
+
+        Args:
+            path: Manifest file path
+            seed: Run seed
+            count: Lines per service
+            start: ISO timestamp the synthetic clocks start at
+            modules: Checkpoints per service
+        """
+        self.path = path
+        self.seed = seed
+        self.count = count
+        self.start = start
+        self.modules = modules or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "CheckpointManifest":
+        """Load a manifest written by an earlier run.
+
+        Raises:
+            FileNotFoundError: If there is no manifest to resume from
+            ValueError: If the manifest is not a supported checkpoint
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No checkpoint to resume from: {path}")
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported checkpoint manifest: {path}")
+        return cls(path, data["seed"], data["count"], data["start"], data["modules"])
+
+    def update(self, name: str, state: Dict) -> None:
+        """Record a service's checkpoint and save the manifest."""
+        with self._lock:
+            self.modules[name] = state
+            self.save()
+
+    def save(self) -> None:
+        """Write the manifest, replacing the file atomically."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "seed": self.seed,
+                    "count": self.count,
+                    "start": self.start,
+                    "modules": self.modules,
+                },
+                f,
+            )
+        os.replace(temp_path, self.path)
+
+    def module(
+        self, name: str, output_file: str, interval: float
+    ) -> "ModuleCheckpoint":
+        """Get a service's checkpoint handle."""
+        return ModuleCheckpoint(
+            self, name, output_file, self.modules.get(name, {}), interval
+        )
+
+
+class ModuleCheckpoint:
+    """A service's view of the manifest, used on its worker thread."""
+
+    def __init__(
+        self,
+        manifest: CheckpointManifest,
+        name: str,
+        output_file: str,
+        state: Dict,
+        interval: float,
+    ):
+        """Initialize the handle.
+
+        Args:
+            manifest: Manifest to record checkpoints in
+            name: Service name
+            output_file: File the service writes to
+            state: Last recorded checkpoint (empty for a new service)
+            interval: Minimum seconds between checkpoints
+        """
+        self.manifest = manifest
+        self.name = name
+        self.file = output_file
+        self.lines = state.get("lines", 0)
+        self.offset = state.get("offset", 0)
+        self.time_range = tuple(
+            datetime.fromisoformat(state[key]) if state.get(key) else None
+            for key in ("min_timestamp", "max_timestamp")
+        )
+        self._state = state
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def restore(self) -> None:
+        """Restore the service's generator state and clock on this thread.
+
+        The generator must already be seeded; a service without a
+        checkpoint starts from the seeded state and the run's start time.
+        """
+        if "rng_state" in self._state:
+            set_state(self.name, self._state["rng_state"])
+        start = self._state.get("clock", self.manifest.start)
+        set_clock(SyntheticClock(datetime.fromisoformat(start), get_rng(self.name)))
+
+    def save(
+        self,
+        lines: int,
+        offset: int,
+        time_range: Tuple[Optional[datetime], Optional[datetime]] = (None, None),
+        force: bool = False,
+    ) -> None:
+        """Record the current position if the interval has passed.
+
+        Args:
+            lines: Lines written to the file
+            offset: File size after those lines
+            time_range: Earliest and latest record timestamp written so far
+            force: Save regardless of the interval
+        """
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        self.manifest.update(
+            self.name,
+            {
+                "file": os.path.basename(self.file),
+                "lines": lines,
+                "offset": offset,
+                "rng_state": get_state(self.name),
+                "clock": get_clock().now.isoformat(),
+                "min_timestamp": time_range[0] and time_range[0].isoformat(),
+                "max_timestamp": time_range[1] and time_range[1].isoformat(),
+            },
+        )
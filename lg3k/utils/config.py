@@ -40,16 +40,29 @@ def get_default_config() -> Dict:
             "printer",  # Printer activity logs
             "web_server",  # Web server access logs
         ],
+        # Per-service log formats, e.g. {"web_server": "apache", "os": "syslog"}
+        "formats": {},
+        # Per-service line templates (override formats), fields come from records
+        "templates": {},
         # Module-specific settings
         "api": {
             "endpoints": ["/api/v1/users", "/api/v1/posts", "/api/v1/auth"],
             "methods": ["GET", "POST", "PUT", "DELETE"],
             "status_codes": [200, 201, 400, 401, 403, 404, 500],
+            "endpoint_count": 20000,  # Distinct Zipf-distributed endpoints
+            "users": 100000,
+            "zipf_exponent": 1.1,
         },
         "database": {
             "operations": ["SELECT", "INSERT", "UPDATE", "DELETE"],
             "tables": ["users", "posts", "comments", "sessions"],
         },
+        "web_server": {
+            "paths": 50000,  # Distinct Zipf-distributed URL paths
+            "users": 100000,
+            "user_agents": 500,
+            "zipf_exponent": 1.1,
+        },
         "network": {"ports": [80, 443, 22, 3306], "protocols": ["TCP", "UDP"]},
     }
 
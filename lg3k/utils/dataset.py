@@ -0,0 +1,127 @@
+"""Splitting and near-duplicate detection for LLM datasets.
+
+``--dataset`` writes LLM-format records as train/validation/test JSONL
+shards (see ``lg3k.sinks.dataset``). Both the split and the duplicate check
+use a 64-bit key of a record's normalized content: numbers are masked, so
+records that differ only in timestamps, IDs or measurements share a key.
+
+- Splits are chosen from the key, so a record lands in the same split in
+  every run and near-duplicates never leak between splits.
+- Duplicates are found with a window of recently seen keys. The window
+  holds a fixed number of keys, so memory does not grow with the run.
+"""
+
+import hashlib
+import re
+from collections import deque
+from typing import Dict
+
+# Split names, in the order of --splits
+SPLIT_NAMES = ("train", "validation", "test")
+
+# Default split percentages
+DEFAULT_SPLITS = "80,10,10"
+
+# Default records per JSONL shard
+DEFAULT_SHARD_RECORDS = 100_000
+
+# Default number of recent keys remembered for duplicate removal
+DEFAULT_DEDUP_WINDOW = 1_000_000
+
+# Numbers (including those in timestamps, IPs and durations)
+_NUMBERS = re.compile(r"\d+(?:[.:/-]\d+)*")
+
+
+def parse_splits(text: str) -> Dict[str, float]:
+    """Parse split percentages such as ``80,10,10``.
+
+    Args:
+        text: Comma-separated train, validation and test weights
+
+    Returns:
+        Fraction of records per split name
+
+    Raises:
+        ValueError: If there are not three non-negative weights or they are
+            all zero
+    """
+    try:
+        weights = [float(part) for part in text.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid splits '{text}'") from None
+    if len(weights) != len(SPLIT_NAMES) or min(weights) < 0 or not sum(weights):
+        raise ValueError(
+            f"Invalid splits '{text}': expected three weights such as "
+            f"{DEFAULT_SPLITS}"
+        )
+    total = sum(weights)
+    return {name: weight / total for name, weight in zip(SPLIT_NAMES, weights)}
+
+
+def content_key(text: str) -> int:
+    """Compute the near-duplicate key of a record.
+
+    Args:
+        text: Serialized record
+
+    Returns:
+        64-bit key of the record with its numbers masked
+    """
+    normalized = _NUMBERS.sub("0", text).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(normalized, digest_size=8).digest(), "big")
+
+
+def split_for(key: int, splits: Dict[str, float]) -> str:
+    """Choose the split of a record from its key.
+
+    Args:
+        key: Key from content_key()
+        splits: Fraction of records per split name
+
+    Returns:
+        Split name
+    """
+    point = key / 2**64
+    name = None
+    for name, fraction in splits.items():
+        if point < fraction:
+            return name
+        point -= fraction
+    # Rounding can leave the last point just past the total
+    return name
+
+
+class RecentKeys:
+    """Remember the most recent distinct keys, up to a fixed number."""
+
+    def __init__(self, capacity: int):
+        """Initialize the window.
+
+        Args:
+            capacity: Number of keys remembered (at least 1)
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError("The dedup window must hold at least one key")
+        self.capacity = capacity
+        self._keys = set()
+        self._order = deque()
+
+    def seen(self, key: int) -> bool:
+        """Check a key and remember it.
+
+        Args:
+            key: Key to check
+
+        Returns:
+            True if the key is in the window, False if it was added
+        """
+        if key in self._keys:
+            return True
+        if len(self._order) >= self.capacity:
+            self._keys.discard(self._order.popleft())
+        self._keys.add(key)
+        self._order.append(key)
+        return False
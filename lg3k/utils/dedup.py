@@ -0,0 +1,113 @@
+"""Streaming removal of duplicate log lines.
+
+Modules with small vocabularies repeat the same line many times with only
+the timestamp changed. ``--dedup`` drops such lines while generating: each
+line's timestamps are removed and the rest is checked against a Bloom
+filter of the lines kept so far.
+
+The filter is sized from the expected number of lines and the accepted
+false-positive rate (the chance that a new line is taken for a duplicate
+and dropped), so its memory is fixed before generation starts. Beyond the
+expected number of lines the false-positive rate rises.
+"""
+
+import hashlib
+import math
+import re
+
+from .restamp import LAYOUTS
+
+# Default share of new lines wrongly dropped as duplicates
+DEFAULT_FP_RATE = 0.001
+
+# Expected lines for services without a line count or byte target
+DEFAULT_DEDUP_CAPACITY = 10_000_000
+
+# Duplicates in a row after which a service is taken to have no new lines
+MAX_DUPLICATE_RUN = 100_000
+
+# Timestamps in any of the built-in layouts
+_TIMESTAMPS = re.compile(
+    "|".join(f"(?:{layout.pattern.decode('ascii')})" for layout in LAYOUTS.values())
+)
+
+
+def strip_timestamps(line: str) -> str:
+    """Remove the timestamps from a line."""
+    return _TIMESTAMPS.sub("", line)
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set of lines."""
+
+    def __init__(self, capacity: int, fp_rate: float = DEFAULT_FP_RATE):
+        """Initialize the filter.
+
+        Args:
+            capacity: Expected number of distinct lines
+            fp_rate: False-positive rate at that number of lines
+
+        Raises:
+            ValueError: If capacity is not positive or fp_rate is not
+                between 0 and 1
+        """
+        if capacity < 1:
+            raise ValueError("Bloom filter capacity must be at least 1")
+        if not 0 < fp_rate < 1:
+            raise ValueError("False-positive rate must be between 0 and 1")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        # Optimal number of bits and hash functions for the capacity
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.items = 0
+        self.duplicates = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the bit array."""
+        return len(self._bits)
+
+    @property
+    def ratio(self) -> float:
+        """Share of checked lines that were duplicates."""
+        checked = self.items + self.duplicates
+        return self.duplicates / checked if checked else 0.0
+
+    def add(self, text: str) -> bool:
+        """Add a line, reporting whether it was (probably) added before.
+
+        Args:
+            text: Line to add
+
+        Returns:
+            True if the line is probably a duplicate, False if it is new
+        """
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit hashes
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        bits, size = self._bits, self.size
+        present = True
+        for i in range(self.hashes):
+            position = (first + i * step) % size
+            mask = 1 << (position & 7)
+            byte = bits[position >> 3]
+            if not byte & mask:
+                present = False
+                bits[position >> 3] = byte | mask
+        if present:
+            self.duplicates += 1
+        else:
+            self.items += 1
+        return present
+
+    def summary(self) -> dict:
+        """Summarize the filter's counts for the run results."""
+        return {
+            "lines": self.items,
+            "duplicates": self.duplicates,
+            "ratio": self.ratio,
+            "memory_bytes": self.memory_bytes,
+        }
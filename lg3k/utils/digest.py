@@ -0,0 +1,152 @@
+"""Output manifests with checksums computed while writing.
+
+Each text log file gets a ``FileDigest`` that hashes the bytes as the
+writer flushes them, and the file's line count and timestamp range are
+recorded at the same time. ``write_manifest`` stores the results in a
+``manifest.json`` next to the files, so datasets can be verified without
+a separate pass to hash tens of gigabytes.
+
+BLAKE2b is always available. The faster xxHash digests require the
+optional ``xxhash`` package.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import xxhash
+
+    HAS_XXHASH = True
+except ImportError:
+    xxhash = None
+    HAS_XXHASH = False
+
+# Supported checksum algorithms ("none" disables the manifest)
+CHECKSUM_ALGORITHMS = ("blake2b", "sha256", "xxh64", "xxh3_128", "none")
+
+# Default checksum algorithm
+DEFAULT_CHECKSUM = "blake2b"
+
+# Output manifest file name inside the output directory
+OUTPUT_MANIFEST_NAME = "manifest.json"
+
+# Bytes read at a time when hashing an existing file prefix
+READ_CHUNK_SIZE = 1 << 20
+
+
+def new_hash(algorithm: str):
+    """Create a streaming hash object.
+
+    Args:
+        algorithm: One of CHECKSUM_ALGORITHMS except "none"
+
+    Returns:
+        Object with update() and hexdigest()
+
+    Raises:
+        ImportError: If an xxHash digest is requested without xxhash
+        ValueError: If the algorithm is unknown
+    """
+    if algorithm.startswith("xxh"):
+        if not HAS_XXHASH:
+            raise ImportError(
+                f"xxhash is required for {algorithm} checksums "
+                "(pip install 'lg3k[xxhash]')"
+            )
+        if algorithm in ("xxh64", "xxh3_128"):
+            return getattr(xxhash, algorithm)()
+    elif algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=32)
+    elif algorithm == "sha256":
+        return hashlib.sha256()
+    raise ValueError(
+        f"Unknown checksum algorithm '{algorithm}'. "
+        f"Available algorithms: {', '.join(CHECKSUM_ALGORITHMS)}"
+    )
+
+
+class FileDigest:
+    """Checksum, size, line count and timestamp range of one output file."""
+
+    def __init__(self, path: str, algorithm: str = DEFAULT_CHECKSUM):
+        """Initialize the digest.
+
+        Args:
+            path: File being written
+            algorithm: Checksum algorithm
+        """
+        self.path = str(path)
+        self.algorithm = algorithm
+        self._hash = new_hash(algorithm)
+        self.bytes = 0
+        self.lines = 0
+        # Records in the file, when lines hold several (packed sequences)
+        self.records: Optional[int] = None
+        self.min_timestamp: Optional[datetime] = None
+        self.max_timestamp: Optional[datetime] = None
+
+    def update(self, data: bytes) -> None:
+        """Add written bytes to the checksum."""
+        self._hash.update(data)
+        self.bytes += len(data)
+
+    def update_from_file(self, size: int) -> None:
+        """Hash the first ``size`` bytes already in the file (on resume)."""
+        with open(self.path, "rb") as f:
+            while size > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, size))
+                if not chunk:
+                    break
+                self.update(chunk)
+                size -= len(chunk)
+
+    def observe(self, earliest: Optional[datetime], latest: Optional[datetime]) -> None:
+        """Widen the timestamp range to include [earliest, latest]."""
+        if earliest is not None and (
+            self.min_timestamp is None or earliest < self.min_timestamp
+        ):
+            self.min_timestamp = earliest
+        if latest is not None and (
+            self.max_timestamp is None or latest > self.max_timestamp
+        ):
+            self.max_timestamp = latest
+
+    def summary(self) -> Dict:
+        """Get the manifest entry for the file."""
+        entry = {
+            "file": os.path.basename(self.path),
+            "algorithm": self.algorithm,
+            "checksum": self._hash.hexdigest(),
+            "bytes": self.bytes,
+            "lines": self.lines,
+        }
+        if self.records is not None:
+            entry["records"] = self.records
+        entry["min_timestamp"] = (
+            self.min_timestamp.isoformat() if self.min_timestamp else None
+        )
+        entry["max_timestamp"] = (
+            self.max_timestamp.isoformat() if self.max_timestamp else None
+        )
+        return entry
+
+
+def write_manifest(directory: str, entries: List[Dict]) -> str:
+    """Write the output manifest, replacing the file atomically.
+
+    Args:
+        directory: Output directory
+        entries: Entries from FileDigest.summary()
+
+    Returns:
+        Path of the manifest
+    """
+    path = os.path.join(directory, OUTPUT_MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"files": entries}, f, indent=2)
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,272 @@
+"""Log format renderers.
+
+Modules produce structured records (dicts with at least ``timestamp``,
+``level``, ``component`` and ``message``). Renderers turn those records
+into text lines in real-world formats. Each renderer is compiled once per
+service into a closure with its constants (host name, UTC offset, syslog
+priorities, field mappings) pre-bound, so the per-line cost is a single
+string build.
+"""
+
+import json
+import socket
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+# Supported output formats
+FORMATS = ("default", "apache", "nginx", "syslog", "cef", "iptables", "ecs")
+
+# File extensions for formats that are not plain text lines
+FORMAT_EXTENSIONS = {"ecs": ".jsonl"}
+
+# Formats writing one JSON document per line
+JSON_FORMATS = {"ecs"}
+
+# Record fields each format needs beyond the common ones
+REQUIRED_FIELDS = {
+    "apache": ("ip", "method", "path", "status", "bytes"),
+    "nginx": ("ip", "method", "path", "status", "bytes"),
+    "iptables": ("action", "protocol", "src_ip", "src_port", "dst_ip", "port"),
+}
+
+# RFC 5424 severities per log level
+SYSLOG_SEVERITY = {"DEBUG": 7, "INFO": 6, "WARNING": 4, "ERROR": 3, "CRITICAL": 2}
+
+# RFC 5424 facilities per service (default: user-level messages)
+SYSLOG_FACILITY = {
+    "os": 3,  # system daemons
+    "firewall": 4,  # security/authorization
+    "network": 16,  # local0
+    "nas": 17,  # local1
+    "printer": 6,  # line printer subsystem
+}
+
+# CEF severities (0-10) per log level
+CEF_SEVERITY = {"DEBUG": 1, "INFO": 3, "WARNING": 6, "ERROR": 8, "CRITICAL": 10}
+
+# Mapping of record fields to Elastic Common Schema field names
+ECS_FIELDS = {
+    "ip": "source.ip",
+    "src_ip": "source.ip",
+    "src_port": "source.port",
+    "dst_ip": "destination.ip",
+    "port": "destination.port",
+    "method": "http.request.method",
+    "path": "url.original",
+    "endpoint": "url.path",
+    "status": "http.response.status_code",
+    "bytes": "http.response.body.bytes",
+    "user": "user.name",
+    "user_agent": "user_agent.original",
+    "action": "event.action",
+}
+
+# Fields every renderer handles explicitly
+COMMON_FIELDS = ("timestamp", "level", "component", "message")
+
+
+def render_default(record: Dict) -> str:
+    """Render a record in the native "[timestamp] [level] [component] message" format.
+
+    Args:
+        record: Structured log record
+
+    Returns:
+        Formatted log line
+    """
+    return (
+        f"[{record['timestamp'].isoformat()}] [{record['level']}] "
+        f"[{record['component']}] {record['message']}"
+    )
+
+
+def _utc_offset(colon: bool = True) -> str:
+    """Get the local UTC offset, e.g. "+02:00" or "+0200"."""
+    offset = datetime.now().astimezone().strftime("%z") or "+0000"
+    return f"{offset[:3]}:{offset[3:]}" if colon else offset
+
+
+def _cef_escape(value, header: bool = False) -> str:
+    """Escape a value for a CEF header or extension field."""
+    text = str(value).replace("\\", "\\\\")
+    if header:
+        return text.replace("|", "\\|")
+    return text.replace("=", "\\=").replace("\n", " ")
+
+
+def _build_apache(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build an Apache combined log format renderer."""
+    offset = _utc_offset(colon=False)
+
+    def render(record: Dict) -> str:
+        return (
+            f"{record['ip']} - {record.get('user') or '-'} "
+            f"[{record['timestamp'].strftime('%d/%b/%Y:%H:%M:%S')} {offset}] "
+            f'"{record["method"]} {record["path"]} HTTP/1.1" '
+            f"{record['status']} {record['bytes']} \"-\" "
+            f"\"{record.get('user_agent') or '-'}\""
+        )
+
+    return render
+
+
+def _build_nginx(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build an nginx "main" log format renderer (combined + X-Forwarded-For)."""
+    combined = _build_apache(service, hostname)
+
+    def render(record: Dict) -> str:
+        return combined(record) + ' "-"'
+
+    return render
+
+
+def _build_syslog(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build an RFC 5424 syslog renderer."""
+    offset = _utc_offset()
+    facility = SYSLOG_FACILITY.get(service, 1)
+    # Pre-render "<PRI>VERSION " per level
+    headers = {
+        level: f"<{facility * 8 + severity}>1 "
+        for level, severity in SYSLOG_SEVERITY.items()
+    }
+    default_header = headers["INFO"]
+    app_name = f"lg3k-{service}"
+
+    def render(record: Dict) -> str:
+        return (
+            f"{headers.get(record['level'], default_header)}"
+            f"{record['timestamp'].isoformat()}{offset} {hostname} {app_name} - "
+            f"{record['component']} - {record['message']}"
+        )
+
+    return render
+
+
+def _build_cef(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build an ArcSight Common Event Format renderer."""
+    from .. import __version__
+
+    prefix = f"CEF:0|LG3K|lg3k-{_cef_escape(service, True)}|{__version__}|"
+
+    def render(record: Dict) -> str:
+        if "action" in record and "src_ip" in record:
+            signature = f"{record['component']}:{record['action']}"
+            name = f"{record['action']} {record['protocol']}"
+            extension = (
+                f"src={record['src_ip']} spt={record.get('src_port', 0)} "
+                f"dst={record.get('dst_ip', '')} dpt={record.get('port', 0)} "
+                f"proto={record['protocol']} act={record['action']} "
+            )
+        else:
+            signature = record["component"]
+            name = record["message"]
+            extension = ""
+        return (
+            f"{prefix}{_cef_escape(signature, True)}|{_cef_escape(name, True)}|"
+            f"{CEF_SEVERITY.get(record['level'], 3)}|"
+            f"rt={record['timestamp'].strftime('%b %d %Y %H:%M:%S')} "
+            f"dvchost={hostname} {extension}msg={_cef_escape(record['message'])}"
+        )
+
+    return render
+
+
+def _build_iptables(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build a netfilter/iptables kernel log renderer."""
+
+    def render(record: Dict) -> str:
+        timestamp = record["timestamp"]
+        protocol = record["protocol"]
+        if protocol == "ICMP":
+            ports = "TYPE=8 CODE=0"
+        else:
+            ports = f"SPT={record['src_port']} DPT={record['port']}"
+        return (
+            f"{timestamp.strftime('%b')} {timestamp.day:2d} "
+            f"{timestamp.strftime('%H:%M:%S')} {hostname} kernel: "
+            f"[LG3K-{record['action']}] IN=eth0 OUT= SRC={record['src_ip']} "
+            f"DST={record['dst_ip']} LEN=60 PROTO={protocol} {ports}"
+        )
+
+    return render
+
+
+def _build_ecs(service: str, hostname: str) -> Callable[[Dict], str]:
+    """Build an Elastic Common Schema JSON renderer."""
+    offset = _utc_offset()
+    names = dict(ECS_FIELDS)
+    static = {
+        "service.name": service,
+        "event.dataset": f"lg3k.{service}",
+        "host.hostname": hostname,
+    }
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+    def render(record: Dict) -> str:
+        document = {
+            "@timestamp": record["timestamp"].isoformat() + offset,
+            "log.level": record["level"].lower(),
+            "message": record["message"],
+        }
+        document.update(static)
+        for key, value in record.items():
+            if key in COMMON_FIELDS:
+                continue
+            name = names.get(key)
+            if name is None:
+                name = names[key] = f"lg3k.{service}.{key}"
+            document[name] = value
+        return dumps(document)
+
+    return render
+
+
+# Renderer builders per format
+RENDERER_BUILDERS = {
+    "default": lambda service, hostname: render_default,
+    "apache": _build_apache,
+    "nginx": _build_nginx,
+    "syslog": _build_syslog,
+    "cef": _build_cef,
+    "iptables": _build_iptables,
+    "ecs": _build_ecs,
+}
+
+
+def compile_renderer(
+    fmt: str,
+    service: str,
+    fields: Optional[Iterable[str]] = None,
+    hostname: Optional[str] = None,
+) -> Callable[[Dict], str]:
+    """Compile a render function for a format and service.
+
+    Args:
+        fmt: Format name (see FORMATS)
+        service: Service (module) name the records come from
+        fields: Field names the service's records provide, used to check
+            that the format is applicable
+        hostname: Host name to embed (default: this machine's host name)
+
+    Returns:
+        Function turning a record into a log line
+
+    Raises:
+        ValueError: If the format is unknown or the records lack fields
+            the format needs
+    """
+    if fmt not in RENDERER_BUILDERS:
+        raise ValueError(
+            f"Unknown log format '{fmt}'. Available formats: {', '.join(FORMATS)}"
+        )
+    if fields is not None:
+        available = set(fields)
+        missing = [
+            name for name in REQUIRED_FIELDS.get(fmt, ()) if name not in available
+        ]
+        if missing:
+            raise ValueError(
+                f"Format '{fmt}' is not supported for {service} logs "
+                f"(missing fields: {', '.join(missing)})"
+            )
+    return RENDERER_BUILDERS[fmt](service, hostname or socket.gethostname())
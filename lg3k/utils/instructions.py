@@ -0,0 +1,246 @@
+"""Weighted instruction templates for LLM-format records.
+
+The ``instruction`` of an LLM record is drawn from a pool of tasks, each
+with a weight and several paraphrases:
+
+- ``explain``: explain what the log line means
+- ``root_cause``: find the likely cause and a fix
+- ``triage``: judge the severity and whether to act
+- ``summarize``: summarize the event in one sentence
+- ``extract``: extract the module's key fields
+
+Templates are format strings over the module's subject (such as
+"firewall") and key fields. Records at ERROR or CRITICAL level use their
+own task weights, favouring root cause analysis and triage, and are the
+only ones asked the paraphrases that presume a failure
+(``severe_templates``).
+
+Each module's pools are rendered once into interned strings with a
+cumulative weight table, so drawing an instruction is one ``random()``
+call plus a binary search.
+"""
+
+import random
+import sys
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Tuple
+
+# Paraphrases per task (severe_templates only for SEVERE_LEVELS), and the
+# task weights of ordinary records
+INSTRUCTION_TASKS: Dict[str, Dict] = {
+    "explain": {
+        "weight": 4,
+        "templates": [
+            "Analyze this log message and explain its meaning",
+            "Explain what this {subject} log entry means",
+            "Describe the event recorded in this {subject} log line",
+            "What does this {subject} log line tell an operator?",
+        ],
+    },
+    "root_cause": {
+        "weight": 2,
+        "templates": [
+            "Identify the most likely cause of this {subject} event",
+            "What led to this {subject} log entry?",
+        ],
+        "severe_templates": [
+            "Analyze this error log and suggest potential solutions",
+            "Identify the most likely root cause of this {subject} error",
+            "What could have caused this {subject} failure, and how would you "
+            "fix it?",
+        ],
+    },
+    "triage": {
+        "weight": 2,
+        "templates": [
+            "Analyze this log entry and identify any anomalies or patterns",
+            "Assess the severity of this {subject} event and say whether it "
+            "needs action",
+            "Triage this {subject} log line: is it routine, a warning sign or "
+            "an incident?",
+        ],
+    },
+    "summarize": {
+        "weight": 1,
+        "templates": [
+            "Summarize this {subject} log entry in one sentence",
+            "Give a short summary of this {subject} event",
+        ],
+    },
+    "extract": {
+        "weight": 1,
+        "templates": [
+            "Extract the {fields} from this {subject} log line",
+            "List the {fields} recorded in this log entry",
+        ],
+    },
+}
+
+# Task weights of records at one of SEVERE_LEVELS
+SEVERE_WEIGHTS = {
+    "explain": 2,
+    "root_cause": 4,
+    "triage": 3,
+    "summarize": 1,
+    "extract": 1,
+}
+SEVERE_LEVELS = {"ERROR", "CRITICAL"}
+
+# Subject and key fields of each module, for the templates
+MODULE_SUBJECTS: Dict[str, Tuple[str, str]] = {
+    "api": ("API", "method, endpoint, status code and user"),
+    "database": ("database", "operation, table and duration"),
+    "firewall": ("firewall", "action, protocol, source address and port"),
+    "nas": ("NAS", "operation, share, file type and size"),
+    "network": ("network", "device, event, metric and value"),
+    "os": ("system", "service, event, resource and usage"),
+    "printer": ("printer", "job type, status, pages and supply level"),
+    "smarthome": ("smart home", "device, location and state"),
+    "web_server": ("web server", "method, path, status code and client IP"),
+}
+
+# Subject and fields of modules without an entry in MODULE_SUBJECTS
+DEFAULT_SUBJECT = ("service", "timestamp, level and message")
+
+# Extra templates of some modules, per task
+MODULE_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "firewall": {
+        "triage": ["Decide whether this firewall event is part of an attack or scan"],
+    },
+    "nas": {
+        "triage": ["Check this NAS event for signs of data loss or misuse"],
+    },
+    "smarthome": {
+        "triage": ["Decide whether this smart home event needs the owner's attention"],
+    },
+    "web_server": {
+        "triage": [
+            "Check this web server request for slowness, unusual status codes "
+            "or suspicious clients"
+        ],
+    },
+}
+
+# Extra templates of some modules for records at one of SEVERE_LEVELS
+MODULE_SEVERE_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "api": {
+        "root_cause": [
+            "Why might this API call have failed, and what should the client do?"
+        ],
+    },
+    "database": {
+        "root_cause": [
+            "Suggest why this database operation was slow or failed, and how "
+            "to tune it"
+        ],
+    },
+    "network": {
+        "root_cause": ["Diagnose the connectivity problem behind this network event"],
+    },
+    "os": {
+        "root_cause": [
+            "Explain why this service or resource alert occurred and how to "
+            "resolve it"
+        ],
+    },
+    "printer": {
+        "root_cause": ["Suggest how to fix the printer problem in this log entry"],
+    },
+}
+
+
+class InstructionPool:
+    """Interned instruction strings sampled by weight."""
+
+    def __init__(self, weighted: List[Tuple[str, float]]):
+        """Initialize the pool.
+
+        Args:
+            weighted: (instruction, weight) pairs
+
+        Raises:
+            ValueError: If the pool is empty or a weight is not positive
+        """
+        if not weighted:
+            raise ValueError("Instruction pools must not be empty")
+        if min(weight for _, weight in weighted) <= 0:
+            raise ValueError("Instruction weights must be positive")
+        self.instructions = [sys.intern(text) for text, _ in weighted]
+        cdf = array("d")
+        total = 0.0
+        for _, weight in weighted:
+            total += weight
+            cdf.append(total)
+        self._cdf = cdf
+        self._total = total
+
+    def __len__(self) -> int:
+        """Return the number of instructions."""
+        return len(self.instructions)
+
+    def sample(self, rng: random.Random = random) -> str:
+        """Draw an instruction according to its weight."""
+        index = bisect_right(self._cdf, rng.random() * self._total)
+        return self.instructions[min(index, len(self.instructions) - 1)]
+
+
+def build_pool(
+    module_name: str, weights: Mapping[str, float], severe: bool = False
+) -> InstructionPool:
+    """Render a module's templates into a pool.
+
+    A task's weight is shared evenly by its templates.
+
+    Args:
+        module_name: Module name
+        weights: Weight per task
+        severe: Whether the pool is for records at one of SEVERE_LEVELS
+            (adds the severe templates)
+
+    Returns:
+        The module's instruction pool
+    """
+    subject, fields = MODULE_SUBJECTS.get(module_name, DEFAULT_SUBJECT)
+    extra = MODULE_TEMPLATES.get(module_name, {})
+    severe_extra = MODULE_SEVERE_TEMPLATES.get(module_name, {}) if severe else {}
+    weighted = []
+    for task, spec in INSTRUCTION_TASKS.items():
+        templates = spec["templates"] + extra.get(task, [])
+        if severe:
+            templates = (
+                templates
+                + spec.get("severe_templates", [])
+                + severe_extra.get(task, [])
+            )
+        weight = weights[task] / len(templates)
+        for template in templates:
+            text = template.format(subject=subject, fields=fields)
+            weighted.append((text, weight))
+    return InstructionPool(weighted)
+
+
+@lru_cache(maxsize=None)
+def get_instruction_sampler(
+    module_name: str,
+) -> Callable[[Mapping, random.Random], str]:
+    """Get the instruction sampler of a module.
+
+    Args:
+        module_name: Module name
+
+    Returns:
+        Function drawing the instruction of a record with a random source
+    """
+    ordinary = build_pool(
+        module_name,
+        {task: spec["weight"] for task, spec in INSTRUCTION_TASKS.items()},
+    )
+    severe = build_pool(module_name, SEVERE_WEIGHTS, severe=True)
+
+    def sample(record: Mapping, rng: random.Random = random) -> str:
+        pool = severe if record.get("level") in SEVERE_LEVELS else ordinary
+        return pool.sample(rng)
+
+    return sample
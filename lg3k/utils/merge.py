@@ -0,0 +1,33 @@
+"""Time-ordered merging of service streams.
+
+``--merge`` writes every service into one file sorted by timestamp.
+Each service's records come out of its generator in timestamp order, so
+a k-way heap merge of the live streams gives a sorted combined stream
+directly. Only one pending line per service is held, so memory depends
+on the number of services, not on the number of lines.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence, Tuple
+
+
+def _tag(index: int, stream: Iterable[Tuple[datetime, str]]):
+    """Add the stream's index to its items (the tie-breaker between streams)."""
+    for timestamp, line in stream:
+        yield timestamp, index, line
+
+
+def merge_streams(
+    streams: Sequence[Iterable[Tuple[datetime, str]]],
+) -> Iterator[Tuple[datetime, int, str]]:
+    """Merge timestamp-ordered streams into one ordered stream.
+
+    Args:
+        streams: Streams of (timestamp, line) pairs, each in timestamp order
+
+    Returns:
+        Iterator of (timestamp, stream index, line); equal timestamps are
+        ordered by stream index
+    """
+    return heapq.merge(*(_tag(index, stream) for index, stream in enumerate(streams)))
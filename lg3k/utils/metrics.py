@@ -0,0 +1,263 @@
+"""Live generation metrics for headless runs.
+
+Metrics are read from the progress board's shared counters, so exposing
+them costs the workers nothing. They can be scraped from a local HTTP
+``/metrics`` endpoint in Prometheus text format, or written periodically
+to a JSON stats file.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from .progress import ProgressBoard
+
+# Seconds between stats file updates
+DEFAULT_STATS_INTERVAL = 5.0
+
+# Prometheus metric names, types and help texts, in exposition order
+PROMETHEUS_METRICS = (
+    ("lg3k_lines_generated_total", "counter", "Log lines generated."),
+    ("lg3k_lines_target", "gauge", "Log lines to generate (0 if open-ended)."),
+    ("lg3k_bytes_written_total", "counter", "Bytes written to files or line sinks."),
+    ("lg3k_lines_per_second", "gauge", "Average generation rate since start."),
+    ("lg3k_worker_cpu_seconds_total", "counter", "CPU time used by the worker."),
+    ("lg3k_writer_flushes_total", "counter", "Batches written."),
+    ("lg3k_writer_flush_seconds_total", "counter", "Time spent writing batches."),
+)
+
+# Module stats field per Prometheus metric
+PROMETHEUS_FIELDS = {
+    "lg3k_lines_generated_total": "lines",
+    "lg3k_lines_target": "target",
+    "lg3k_bytes_written_total": "bytes",
+    "lg3k_lines_per_second": "lines_per_second",
+    "lg3k_worker_cpu_seconds_total": "cpu_seconds",
+    "lg3k_writer_flushes_total": "flushes",
+    "lg3k_writer_flush_seconds_total": "flush_seconds",
+}
+
+
+def collect_metrics(
+    board: ProgressBoard, queue_depths: Optional[Callable[[], List[int]]] = None
+) -> Dict:
+    """Collect current metrics from a progress board.
+
+    Args:
+        board: Board the workers publish to
+        queue_depths: Optional callable returning the pending batches per sink
+
+    Returns:
+        Dict with per-module stats and sink queue depths
+    """
+    now = time.monotonic_ns()
+    modules = {}
+    for name, counters in board.stats().items():
+        started = counters["started_ns"]
+        finished = counters["finished_ns"] or now
+        elapsed = (finished - started) / 1e9 if started else 0.0
+        flushes = counters["flushes"]
+        modules[name] = {
+            "lines": counters["done"],
+            "target": counters["total"],
+            "bytes": counters["bytes"],
+            "lines_per_second": counters["done"] / elapsed if elapsed > 0 else 0.0,
+            "cpu_seconds": counters["cpu_ns"] / 1e9,
+            "flushes": flushes,
+            "flush_seconds": counters["flush_ns"] / 1e9,
+            "avg_flush_ms": counters["flush_ns"] / flushes / 1e6 if flushes else 0.0,
+            "running": bool(started) and not counters["finished_ns"],
+        }
+    return {
+        "timestamp": time.time(),
+        "modules": modules,
+        "sink_queue_depths": list(queue_depths()) if queue_depths else [],
+    }
+
+
+def summarize_module(
+    counters: Dict[str, int],
+    bytes_written: Optional[int] = None,
+    raw_bytes: Optional[int] = None,
+    sized: bool = True,
+) -> Dict:
+    """Summarize a finished module's counters for the JSON result.
+
+    Args:
+        counters: The module's counters from ProgressBoard.stats()
+        bytes_written: Bytes on disk, for sinks that track them themselves
+            (default: the bytes the worker wrote)
+        raw_bytes: Uncompressed size of the output (default: bytes_written)
+        sized: Whether the output size is known; sizes and byte throughput
+            are left out otherwise (e.g. for records loaded into a database)
+
+    Returns:
+        Dict of lines, sizes, compression ratio, timings and throughput
+    """
+    written = counters["bytes"] if bytes_written is None else bytes_written
+    raw = written if raw_bytes is None else raw_bytes
+    started = counters["started_ns"]
+    finished = counters["finished_ns"] or time.monotonic_ns()
+    elapsed = (finished - started) / 1e9 if started else 0.0
+    write_seconds = counters["flush_ns"] / 1e9
+    summary = {
+        "lines": counters["done"],
+        "bytes": written,
+        "raw_bytes": raw,
+        "compression_ratio": round(raw / written, 3) if written else None,
+        "generate_seconds": max(elapsed - write_seconds, 0.0),
+        "write_seconds": write_seconds,
+        "cpu_seconds": counters["cpu_ns"] / 1e9,
+        "lines_per_second": counters["done"] / elapsed if elapsed > 0 else 0.0,
+        "bytes_per_second": written / elapsed if elapsed > 0 else 0.0,
+    }
+    if not sized:
+        for key in ("bytes", "raw_bytes", "compression_ratio", "bytes_per_second"):
+            del summary[key]
+    return summary
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(metrics: Dict) -> str:
+    """Render collected metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics: Metrics from collect_metrics()
+
+    Returns:
+        Exposition text
+    """
+    lines = []
+    for name, kind, help_text in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        field = PROMETHEUS_FIELDS[name]
+        for module, stats in metrics["modules"].items():
+            lines.append(f'{name}{{module="{_escape_label(module)}"}} {stats[field]}')
+    lines.append("# HELP lg3k_sink_queue_depth Batches waiting per sink.")
+    lines.append("# TYPE lg3k_sink_queue_depth gauge")
+    for index, depth in enumerate(metrics["sink_queue_depths"]):
+        lines.append(f'lg3k_sink_queue_depth{{sink="{index}"}} {depth}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``/metrics`` in Prometheus format from a background thread."""
+
+    def __init__(
+        self,
+        board: ProgressBoard,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        queue_depths: Optional[Callable[[], List[int]]] = None,
+    ):
+        """Initialize the server and bind its socket.
+
+        Args:
+            board: Board the workers publish to
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            queue_depths: Optional callable returning the pending batches per sink
+        """
+        collect = lambda: collect_metrics(board, queue_depths)  # noqa: E731
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(collect()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        """Start serving requests."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="lg3k-metrics", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class StatsFileWriter:
+    """Periodically write collected metrics to a JSON file."""
+
+    def __init__(
+        self,
+        board: ProgressBoard,
+        path: str,
+        interval: float = DEFAULT_STATS_INTERVAL,
+        queue_depths: Optional[Callable[[], List[int]]] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            board: Board the workers publish to
+            path: JSON file to write
+            interval: Seconds between updates
+            queue_depths: Optional callable returning the pending batches per sink
+        """
+        self.board = board
+        self.path = path
+        self.interval = interval
+        self.queue_depths = queue_depths
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Write the current metrics, replacing the file atomically."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(collect_metrics(self.board, self.queue_depths), f)
+        os.replace(temp_path, self.path)
+
+    def _run(self) -> None:
+        """Write until stopped."""
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self) -> "StatsFileWriter":
+        """Start the writer thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="lg3k-stats", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread and write the final metrics."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
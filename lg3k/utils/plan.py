@@ -0,0 +1,163 @@
+"""Job plans: declarative per-service workloads.
+
+A plan file describes what each service generates, instead of applying
+the same ``--count`` to every service in the config::
+
+    {
+      "defaults": {"format": "syslog"},
+      "services": {
+        "web_server": {"count": 9000000, "shards": 8},
+        "api": {"target_bytes": "500MB", "format": "ecs"},
+        "printer": {"count": 100000, "rate": 50},
+        "firewall": {"count": 100000, "sink": "sqlite:///firewall.db"}
+      }
+    }
+
+Services are split into jobs (one per shard), and the jobs are started
+longest first, so that a skewed workload does not end with one long job
+running after everything else has finished.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .budget import parse_size
+from .rng import derive_seed
+from .timestamp import DEFAULT_CLOCK_INTERVAL
+
+# Settings a plan can give a service, with their accepted types
+PLAN_FIELDS = {
+    "count": (int,),
+    "rate": (int, float),
+    "target_bytes": (int, str),
+    "format": (str,),
+    "template": (str,),
+    "sink": (str,),
+    "shards": (int,),
+}
+
+# Rough size of a rendered line, for estimating byte-targeted jobs
+ESTIMATED_LINE_BYTES = 150
+
+# Rough lines per second of one worker, for estimating job lengths
+ESTIMATED_LINES_PER_SECOND = 100_000
+
+
+def load_plan(path: str) -> Dict[str, Dict]:
+    """Load and validate a plan file.
+
+    Args:
+        path: Path to the JSON plan
+
+    Returns:
+        Settings per service in plan order, with the plan's defaults
+        applied and byte targets converted to bytes
+
+    Raises:
+        ValueError: If the plan is malformed
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("services"), dict):
+        raise ValueError(f"Plan {path} needs a 'services' object")
+    if not data["services"]:
+        raise ValueError(f"Plan {path} has no services")
+    defaults = data.get("defaults", {})
+    plan = {}
+    for service, settings in data["services"].items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"Plan entry for {service} must be an object")
+        plan[service] = validate_entry(service, {**defaults, **settings})
+    return plan
+
+
+def validate_entry(service: str, entry: Dict) -> Dict:
+    """Check a service's plan settings.
+
+    Args:
+        service: Service name (for error messages)
+        entry: Settings from the plan
+
+    Returns:
+        The settings, with target_bytes in bytes
+
+    Raises:
+        ValueError: If a setting is unknown or invalid
+    """
+    entry = dict(entry)
+    for key, value in entry.items():
+        if key not in PLAN_FIELDS:
+            raise ValueError(
+                f"Unknown plan setting '{key}' for {service}. "
+                f"Available settings: {', '.join(PLAN_FIELDS)}"
+            )
+        if isinstance(value, bool) or not isinstance(value, PLAN_FIELDS[key]):
+            raise ValueError(f"Invalid {key} for {service}: {value!r}")
+    if "target_bytes" in entry and isinstance(entry["target_bytes"], str):
+        entry["target_bytes"] = parse_size(entry["target_bytes"])
+    for key in ("count", "rate", "target_bytes", "shards"):
+        if key in entry and entry[key] <= 0:
+            raise ValueError(f"{key} for {service} must be positive")
+    return entry
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split a count into ``parts`` sizes that differ by at most one."""
+    size, extra = divmod(total, parts)
+    return [size + 1 if index < extra else size for index in range(parts)]
+
+
+def shard_seed(seed: int, service: str, index: int) -> int:
+    """Derive the seed of one shard of a service."""
+    return derive_seed(seed, f"{service}#{index}")
+
+
+def shard_start(start: datetime, first_line: int) -> datetime:
+    """Get the expected timestamp of a service's line number ``first_line``.
+
+    A shard's synthetic clock starts there, so timestamps continue from
+    one shard of a service to the next.
+    """
+    return start + timedelta(seconds=first_line * DEFAULT_CLOCK_INTERVAL)
+
+
+def estimate_seconds(
+    lines: Optional[int],
+    target_bytes: Optional[int] = None,
+    rate: Optional[float] = None,
+) -> float:
+    """Estimate how long a job takes, for ordering jobs.
+
+    Args:
+        lines: Line count (None for no limit)
+        target_bytes: Byte target (None for none)
+        rate: Lines per second the job is limited to
+
+    Returns:
+        Estimated seconds (infinite for jobs limited only by time)
+    """
+    if target_bytes is not None:
+        by_size = -(-target_bytes // ESTIMATED_LINE_BYTES)
+        lines = by_size if lines is None else min(lines, by_size)
+    if lines is None:
+        return float("inf")
+    seconds = lines / ESTIMATED_LINES_PER_SECOND
+    if rate is not None:
+        seconds = max(seconds, lines / rate)
+    return seconds
+
+
+def lpt_order(costs: Dict[str, float]) -> List[str]:
+    """Order jobs longest first (longest-processing-time scheduling).
+
+    A pool that hands the next job to the first idle worker then packs
+    the jobs LPT style: long jobs start early and short ones fill the gaps.
+
+    Args:
+        costs: Estimated seconds per job, in plan order
+
+    Returns:
+        Job names, longest first (ties keep plan order)
+    """
+    return sorted(costs, key=lambda name: -costs[name])
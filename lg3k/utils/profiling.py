@@ -0,0 +1,201 @@
+"""Per-module CPU and memory profiling.
+
+``--profile cpu`` runs each worker's ``generate_module_logs`` under
+cProfile and dumps one ``.prof`` file per module. ``--profile mem`` records
+a tracemalloc snapshot per module. tracemalloc traces the whole process,
+and since Python 3.12 only one cProfile profiler can be active at a time,
+so profiled modules run one at a time. A merged summary lists the
+hottest functions or allocation sites. For CPU runs it also splits time
+between generator, formatter and writer code.
+
+Only the worker threads are profiled; time spent on ``--sink`` fan-out
+threads shows up as queue waits in the writer stage.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+# Supported profiling modes
+PROFILE_MODES = ("cpu", "mem")
+
+# Entries listed in the summary
+DEFAULT_TOP = 25
+
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 5
+
+# Stages CPU time is attributed to, by source location
+STAGES = ("generator", "formatter", "writer", "other")
+
+
+def classify(function: Tuple[str, int, str]) -> str:
+    """Attribute a profiled function to a pipeline stage.
+
+    Args:
+        function: pstats function key (filename, line number, name)
+
+    Returns:
+        One of STAGES
+    """
+    filename, _, name = function
+    path = filename.replace(os.sep, "/")
+    if (
+        "/lg3k/modules/" in path
+        or path.endswith(
+            ("/lg3k/utils/vocab.py", "/lg3k/utils/timestamp.py", "/random.py")
+        )
+        or (path == "~" and ("_random." in name or "_bisect." in name))
+    ):
+        return "generator"
+    if (
+        path.endswith(("/lg3k/utils/formats.py", "/lg3k/utils/templates.py"))
+        or path.startswith("<lg3k template")
+        or "/json/" in path
+    ):
+        return "formatter"
+    if "/lg3k/sinks/" in path or (path == "~" and "write" in name):
+        return "writer"
+    return "other"
+
+
+class RunProfiler:
+    """Profile the workers of one run and summarize the results."""
+
+    def __init__(self, mode: str, directory: str, run_id: str):
+        """Initialize the profiler.
+
+        Args:
+            mode: "cpu" or "mem"
+            directory: Directory for profile files and the summary
+            run_id: Suffix for file names (e.g. the run timestamp)
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Unknown profile mode '{mode}'. "
+                f"Available modes: {', '.join(PROFILE_MODES)}"
+            )
+        self.mode = mode
+        self.directory = directory
+        self.run_id = run_id
+        self.files: Dict[str, str] = {}
+        self.peaks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Held while a module is profiled; profilers cannot run concurrently
+        self._run_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, module: str, extension: str) -> str:
+        """Build a profile file path for a module."""
+        return os.path.join(self.directory, f"{module}_{self.run_id}{extension}")
+
+    def call(self, module: str, func: Callable, *args, **kwargs):
+        """Run a worker function under the profiler.
+
+        Args:
+            module: Module the worker generates
+            func: Worker function
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The function's return value
+        """
+        if self.mode == "cpu":
+            with self._run_lock:
+                profiler = cProfile.Profile()
+                try:
+                    return profiler.runcall(func, *args, **kwargs)
+                finally:
+                    path = self._path(module, ".prof")
+                    profiler.dump_stats(path)
+                    with self._lock:
+                        self.files[module] = path
+
+        with self._run_lock:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                path = self._path(module, ".tracemalloc")
+                snapshot.dump(path)
+                with self._lock:
+                    self.files[module] = path
+                    self.peaks[module] = peak
+
+    def _cpu_summary(self, top: int) -> str:
+        """Summarize the merged cProfile stats."""
+        out = io.StringIO()
+        stats = pstats.Stats(*self.files.values(), stream=out)
+        own_time = dict.fromkeys(STAGES, 0.0)
+        for function, (_, _, tottime, _, _) in stats.stats.items():
+            own_time[classify(function)] += tottime
+        total = sum(own_time.values()) or 1.0
+        out.write("Time by stage (own time):\n")
+        for stage in STAGES:
+            out.write(
+                f"  {stage:<10} {own_time[stage]:9.3f}s "
+                f"{own_time[stage] / total * 100:5.1f}%\n"
+            )
+        out.write("\n")
+        stats.sort_stats("tottime").print_stats(top)
+        return out.getvalue()
+
+    def _mem_summary(self, top: int) -> str:
+        """Summarize the tracemalloc snapshots."""
+        out = io.StringIO()
+        sites: Dict[str, list] = {}
+        out.write("Peak traced memory per module:\n")
+        for module, path in self.files.items():
+            out.write(f"  {module:<12} {self.peaks[module] / 1024:12.1f} KiB\n")
+            snapshot = tracemalloc.Snapshot.load(path)
+            for stat in snapshot.statistics("lineno"):
+                frame = stat.traceback[0]
+                site = sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += stat.size
+                site[1] += stat.count
+        out.write(f"\nTop {top} allocation sites (live at module end):\n")
+        ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+        for location, (size, count) in ranked[:top]:
+            out.write(f"  {size / 1024:10.1f} KiB {count:8d} blocks  {location}\n")
+        return out.getvalue()
+
+    def summary(self, top: int = DEFAULT_TOP) -> str:
+        """Build the merged summary of all profiled modules.
+
+        Args:
+            top: Number of functions or allocation sites to list
+
+        Returns:
+            Summary text
+        """
+        modules = ", ".join(self.files) or "none"
+        header = (
+            f"lg3k {self.mode} profile of {len(self.files)} module(s): {modules}\n\n"
+        )
+        if not self.files:
+            return header
+        if self.mode == "cpu":
+            return header + self._cpu_summary(top)
+        return header + self._mem_summary(top)
+
+    def write_summary(self, top: int = DEFAULT_TOP) -> str:
+        """Write the merged summary next to the profile files.
+
+        Returns:
+            Path of the summary file
+        """
+        path = os.path.join(self.directory, f"summary_{self.mode}_{self.run_id}.txt")
+        with open(path, "w") as f:
+            f.write(self.summary(top))
+        return path
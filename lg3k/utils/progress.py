@@ -1,4 +1,33 @@
-"""Progress tracking utilities."""
+"""Progress tracking utilities.
+
+Besides the progress bar helpers, this module provides lock-free progress
+counters. Workers publish how many lines they have generated (plus bytes
+written, CPU time and write timings) into a shared counter array with one
+slot per module. Each slot has a single writer, so no lock is needed. The
+array lives in shared memory, so worker processes created after the board
+can publish too. One ``ProgressReporter`` thread samples the counters at a
+fixed refresh rate and redraws the display, however many workers are
+running.
+"""
+
+import threading
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Callable, Dict, Optional, Tuple
+
+# Counters each worker publishes, in slot order
+COUNTER_FIELDS = (
+    "done",
+    "bytes",
+    "cpu_ns",
+    "flush_ns",
+    "flushes",
+    "started_ns",
+    "finished_ns",
+)
+
+# Seconds between progress redraws
+DEFAULT_REFRESH = 0.2
 
 
 def create_progress_bar(percentage: float, width: int = 20) -> str:
@@ -35,3 +64,143 @@ def update_progress(current: int, total: int) -> str:
     # Create progress bar and ensure consistent width for progress values
     progress_bar = create_progress_bar(percentage)
     return f"{progress_bar} {percentage:5.1f}%"
+
+
+class ProgressSlot:
+    """A module's slot on a progress board (single writer)."""
+
+    __slots__ = ("_counters", "_base")
+
+    def __init__(self, counters, base: int):
+        """Initialize the slot.
+
+        Args:
+            counters: Shared counter array
+            base: Index of the slot's first counter in the array
+        """
+        self._counters = counters
+        self._base = base
+
+    def publish(
+        self,
+        done: int,
+        written: int = 0,
+        cpu_ns: int = 0,
+        flush_ns: int = 0,
+        flushes: int = 0,
+    ) -> None:
+        """Publish the worker's running totals.
+
+        Args:
+            done: Lines generated
+            written: Bytes written
+            cpu_ns: Worker CPU time in nanoseconds
+            flush_ns: Time spent writing batches in nanoseconds
+            flushes: Number of batches written
+        """
+        counters, base = self._counters, self._base
+        counters[base] = done
+        counters[base + 1] = written
+        counters[base + 2] = cpu_ns
+        counters[base + 3] = flush_ns
+        counters[base + 4] = flushes
+
+    def start(self) -> None:
+        """Record when the worker started."""
+        self._counters[self._base + 5] = time.monotonic_ns()
+
+    def finish(self) -> None:
+        """Record when the worker finished."""
+        self._counters[self._base + 6] = time.monotonic_ns()
+
+
+class ProgressBoard:
+    """Shared per-module counters of generated and expected lines."""
+
+    def __init__(self, totals: Dict[str, int]):
+        """Initialize the board.
+
+        Args:
+            totals: Expected lines per module (0 if unknown), in display order
+        """
+        self.names = list(totals)
+        self._index = {name: index for index, name in enumerate(self.names)}
+        self.counters = RawArray("q", len(self.names) * len(COUNTER_FIELDS))
+        self.totals = RawArray("q", [totals[name] for name in self.names])
+
+    def slot(self, name: str) -> ProgressSlot:
+        """Get the slot a module's worker publishes to."""
+        return ProgressSlot(self.counters, self._index[name] * len(COUNTER_FIELDS))
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Read (done, total) per module without stopping the workers."""
+        counters = self.counters[:]
+        totals = self.totals[:]
+        width = len(COUNTER_FIELDS)
+        return {
+            name: (counters[index * width], totals[index])
+            for index, name in enumerate(self.names)
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Read all counters per module, plus the expected line total."""
+        counters = self.counters[:]
+        totals = self.totals[:]
+        width = len(COUNTER_FIELDS)
+        result = {}
+        for index, name in enumerate(self.names):
+            values = counters[index * width : (index + 1) * width]
+            result[name] = dict(zip(COUNTER_FIELDS, values), total=totals[index])
+        return result
+
+
+class ProgressReporter:
+    """Background thread redrawing progress from a board at a fixed rate."""
+
+    def __init__(
+        self,
+        board: ProgressBoard,
+        render: Callable[[Dict[str, Tuple[int, int]]], None],
+        interval: float = DEFAULT_REFRESH,
+    ):
+        """Initialize the reporter.
+
+        Args:
+            board: Board to sample
+            render: Called with each changed snapshot
+            interval: Seconds between samples
+        """
+        self.board = board
+        self.render = render
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last = None
+
+    def _sample(self) -> None:
+        """Render the current snapshot if it changed."""
+        snapshot = self.board.snapshot()
+        if snapshot != self._last:
+            self._last = snapshot
+            self.render(snapshot)
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "ProgressReporter":
+        """Start the reporter thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="lg3k-progress", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread and render the final state."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sample()
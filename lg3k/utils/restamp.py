@@ -0,0 +1,161 @@
+"""Timestamp re-stamping for replayed log lines.
+
+Replaying a stored corpus keeps every line as it is except for its
+timestamps, which are shifted by a fixed amount. Every timestamp of the
+corpus' layout is found with its pattern and rendered again in the same
+layout, so lines keep their length; LLM-format records, for example,
+repeat the record's timestamp in their ``input`` and ``output``.
+Supported layouts are those of the built-in formats:
+
+- ``iso``: ISO 8601 (native, syslog, ECS and smart home lines)
+- ``apache``: ``22/Mar/2024:15:30:45`` (Apache and nginx access logs)
+- ``cef``: ``rt=Mar 22 2024 15:30:45``
+- ``bsd``: ``Mar 22 15:30:45`` at the start of the line (iptables)
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+# Lines searched for a timestamp when detecting a corpus' layout
+DETECT_LINES = 20
+
+
+def _render_iso(value: datetime, width: int) -> bytes:
+    """Render an ISO timestamp with as many fraction digits as the original."""
+    return value.isoformat(timespec="microseconds")[:width].encode("ascii")
+
+
+def _parse_bsd(text: str) -> datetime:
+    """Parse a year-less BSD syslog timestamp in the current year."""
+    return datetime.strptime(f"{datetime.now().year} {text}", "%Y %b %d %H:%M:%S")
+
+
+def _render_bsd(value: datetime, width: int) -> bytes:
+    """Render a BSD syslog timestamp with a space-padded day."""
+    return (
+        f"{value.strftime('%b')} {value.day:2d} {value.strftime('%H:%M:%S')}"
+    ).encode("ascii")
+
+
+class TimestampLayout:
+    """How one kind of timestamp is found, parsed and rendered."""
+
+    def __init__(
+        self,
+        name: str,
+        pattern: bytes,
+        parse: Callable[[str], datetime],
+        render: Callable[[datetime, int], bytes],
+        anchored: bool = False,
+    ):
+        """Initialize the layout.
+
+        Args:
+            name: Layout name
+            pattern: Regex for the timestamp, with the timestamp in group 1
+            parse: Function parsing the timestamp text
+            render: Function rendering a datetime given the original width
+            anchored: Whether the timestamp must start the line
+        """
+        self.name = name
+        self.pattern = pattern
+        self.parse = parse
+        self.render = render
+        self.search = re.compile((rb"^" if anchored else b"") + pattern).search
+        # Every timestamp in a buffer (only at line starts if anchored)
+        prefix = rb"(?m)^()" if anchored else rb"()"
+        self.every = re.compile(prefix + pattern)
+
+
+LAYOUTS: Dict[str, TimestampLayout] = {
+    layout.name: layout
+    for layout in (
+        TimestampLayout(
+            "iso",
+            rb"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)",
+            datetime.fromisoformat,
+            _render_iso,
+        ),
+        TimestampLayout(
+            "apache",
+            rb"\[(\d{2}/[A-Z][a-z]{2}/\d{4}:\d{2}:\d{2}:\d{2}) ",
+            lambda text: datetime.strptime(text, "%d/%b/%Y:%H:%M:%S"),
+            lambda value, width: value.strftime("%d/%b/%Y:%H:%M:%S").encode("ascii"),
+        ),
+        TimestampLayout(
+            "cef",
+            rb"\brt=([A-Z][a-z]{2} \d{2} \d{4} \d{2}:\d{2}:\d{2})",
+            lambda text: datetime.strptime(text, "%b %d %Y %H:%M:%S"),
+            lambda value, width: value.strftime("%b %d %Y %H:%M:%S").encode("ascii"),
+        ),
+        TimestampLayout(
+            "bsd",
+            rb"([A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}) ",
+            _parse_bsd,
+            _render_bsd,
+            anchored=True,
+        ),
+    )
+}
+
+
+def detect_layout(data: bytes) -> Optional[TimestampLayout]:
+    """Find the timestamp layout of a corpus from its first lines.
+
+    Args:
+        data: Start of the corpus
+
+    Returns:
+        The layout whose timestamp comes first in the lines, or None if no
+        line has a timestamp
+    """
+    for line in data.split(b"\n", DETECT_LINES)[:DETECT_LINES]:
+        found = []
+        for layout in LAYOUTS.values():
+            match = layout.search(line)
+            if match:
+                found.append((match.start(1), layout))
+        if found:
+            return min(found, key=lambda item: item[0])[1]
+    return None
+
+
+class Restamper:
+    """Shift every timestamp in the lines by a fixed amount."""
+
+    def __init__(self, shift: timedelta, layout: Optional[TimestampLayout] = None):
+        """Initialize the restamper.
+
+        Args:
+            shift: Amount to move timestamps by
+            layout: Timestamp layout (detected from the first buffer if None)
+        """
+        self.shift = shift
+        self.layout = layout
+
+    def _replace(self, match: "re.Match") -> bytes:
+        """Render one shifted timestamp."""
+        text = match.group(2)
+        value = self.layout.parse(text.decode("ascii")) + self.shift
+        return (
+            match.group(0)[: match.start(2) - match.start(0)]
+            + self.layout.render(value, len(text))
+            + match.group(0)[match.end(2) - match.start(0) :]
+        )
+
+    def apply(self, data: bytes) -> bytes:
+        """Re-stamp a buffer of whole lines.
+
+        Args:
+            data: Lines to re-stamp (not split mid-line)
+
+        Returns:
+            The lines with shifted timestamps
+        """
+        if self.layout is None:
+            # Detection is retried until a buffer has a timestamp
+            self.layout = detect_layout(data)
+        if self.layout is None or not self.shift:
+            return data
+        return self.layout.every.sub(self._replace, data)
@@ -0,0 +1,105 @@
+"""Per-service random number generators for reproducible output.
+
+Each generator module draws its randomness from its own
+``random.Random`` instance, obtained with ``get_rng``. A service is
+generated by one worker at a time, so seeding its generator makes its
+output depend only on the seed and the service name, even while other
+services run in parallel. Seeded shards of a service share its generator
+through ``RngTurns``. Unseeded generators are seeded from the operating
+system, so output varies between runs as before. A generator's state can
+be saved and restored to resume a service.
+"""
+
+import random
+import threading
+import zlib
+from typing import Dict
+
+_generators: Dict[str, random.Random] = {}
+
+
+def get_rng(name: str) -> random.Random:
+    """Get a service's random number generator.
+
+    Args:
+        name: Service name
+
+    Returns:
+        The service's generator (the same instance on every call)
+    """
+    rng = _generators.get(name)
+    if rng is None:
+        rng = _generators.setdefault(name, random.Random())
+    return rng
+
+
+def derive_seed(seed: int, name: str) -> int:
+    """Derive a stable per-service seed from a run seed.
+
+    Args:
+        seed: Run seed
+        name: Service name
+
+    Returns:
+        Seed that differs per service but not between runs
+    """
+    return (seed << 32) ^ zlib.crc32(name.encode("utf-8"))
+
+
+def seed_rng(name: str, seed: int) -> random.Random:
+    """Seed a service's generator for a run.
+
+    Args:
+        name: Service name
+        seed: Run seed (combined with the name via derive_seed)
+
+    Returns:
+        The service's generator
+    """
+    rng = get_rng(name)
+    rng.seed(derive_seed(seed, name))
+    return rng
+
+
+def get_state(name: str) -> list:
+    """Get a service's generator state in a JSON-safe form."""
+    version, internal, gauss = get_rng(name).getstate()
+    return [version, list(internal), gauss]
+
+
+def set_state(name: str, state: list) -> None:
+    """Restore a generator state saved with get_state()."""
+    version, internal, gauss = state
+    get_rng(name).setstate((version, tuple(internal), gauss))
+
+
+class RngTurns:
+    """One stream's turns at a generator shared with other streams.
+
+    The shards of a service all draw from the service's generator. Each
+    shard keeps its own generator state and swaps it in while it holds the
+    service's lock, so shards run side by side, taking turns batch by
+    batch, and each one's output depends only on its own seed.
+    """
+
+    def __init__(self, name: str, seed: int, lock: threading.Lock):
+        """Initialize the stream.
+
+        Args:
+            name: Service name
+            seed: Seed of this stream
+            lock: Lock shared by the service's streams
+        """
+        self.rng = get_rng(name)
+        self.lock = lock
+        self.state = random.Random(seed).getstate()
+
+    def acquire(self) -> None:
+        """Take the generator, set to this stream's state."""
+        self.lock.acquire()
+        self.rng.setstate(self.state)
+
+    def release(self) -> None:
+        """Save this stream's state and hand the generator back."""
+        self.state = self.rng.getstate()
+        self.lock.release()
@@ -0,0 +1,110 @@
+"""User-defined log line templates.
+
+A template such as ``{ts:%d/%b/%Y:%H:%M:%S} {ip} "{method} {path}" {status}``
+is parsed once and compiled into a specialised Python function that builds
+each line with a single f-string, so there is no per-line template parsing.
+
+Fields name keys of the module's structured records. ``ts`` is an alias for
+``timestamp``; a format spec on a timestamp field is a ``strftime`` pattern,
+on any other field it is a regular ``format()`` spec. Missing fields render
+as ``-`` without their spec, so a spec such as ``{brightness:03d}`` works
+in modules whose records do not all have the field. Literal braces are
+written as ``{{`` and ``}}``.
+"""
+
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Field aliases accepted in templates
+FIELD_ALIASES = {"ts": "timestamp"}
+
+# Fields holding datetime values
+TIMESTAMP_FIELDS = {"timestamp"}
+
+# Placeholder for fields missing from a record
+MISSING = "-"
+
+
+def parse_template(template: str) -> List[Tuple[str, Optional[str], str, str]]:
+    """Parse a template into (literal, field, spec, conversion) parts.
+
+    Args:
+        template: Template string
+
+    Returns:
+        List of parsed parts; field is None for a trailing literal
+
+    Raises:
+        ValueError: If the template is malformed or uses positional fields
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None:
+            if not field or field.isdigit():
+                raise ValueError("Template fields must be named, e.g. {ip}")
+            if conversion not in (None, "s", "r"):
+                raise ValueError(f"Unsupported conversion '!{conversion}'")
+            field = FIELD_ALIASES.get(field, field)
+        parts.append((literal, field, spec or "", conversion or ""))
+    return parts
+
+
+def compile_template(
+    template: str, fields: Optional[Iterable[str]] = None
+) -> Callable[[Dict], str]:
+    """Compile a template into a render function.
+
+    Args:
+        template: Template string
+        fields: Field names the records provide; when given, unknown
+            template fields are rejected up front
+
+    Returns:
+        Function turning a record into a log line
+
+    Raises:
+        ValueError: If the template is malformed or references unknown fields
+    """
+    parts = parse_template(template)
+    if fields is not None:
+        available = set(fields)
+        unknown = sorted(
+            {field for _, field, _, _ in parts if field and field not in available}
+        )
+        if unknown:
+            raise ValueError(
+                f"Unknown template field(s): {', '.join(unknown)}. "
+                f"Available fields: {', '.join(sorted(available))}"
+            )
+
+    # Bind literals, keys and specs as constants so the generated code
+    # needs no escaping and does no lookups beyond the record itself
+    namespace = {"MISSING": MISSING}
+    pieces = []
+    for index, (literal, field, spec, conversion) in enumerate(parts):
+        if literal:
+            namespace[f"l{index}"] = literal
+            pieces.append(f"{{l{index}}}")
+        if field is None:
+            continue
+        namespace[f"k{index}"] = field
+        value = f"r.get(k{index}, MISSING)"
+        if field in TIMESTAMP_FIELDS:
+            if spec:
+                namespace[f"s{index}"] = spec
+                value = f"r[k{index}].strftime(s{index})"
+            else:
+                value = f"r[k{index}].isoformat()"
+        elif conversion == "r":
+            value = f"repr({value})"
+        elif spec:
+            # The spec may not suit the placeholder of a missing field
+            namespace[f"s{index}"] = spec
+            value = f"(format(r[k{index}], s{index}) if k{index} in r else MISSING)"
+        pieces.append(f"{{{value}}}")
+
+    source = f'def render(r):\n    return f"{"".join(pieces)}"\n'
+    exec(compile(source, f"<lg3k template {template!r}>", "exec"), namespace)
+    render = namespace["render"]
+    render.__doc__ = f"Render a record with the template {template!r}."
+    return render
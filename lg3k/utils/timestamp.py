@@ -1,6 +1,57 @@
-"""Timestamp generation utilities."""
+"""Timestamp generation utilities.
 
-from datetime import datetime
+Timestamps come from the wall clock unless the current thread has a
+``SyntheticClock``, which seeded runs use so that their output (and a
+resumed run's output) is reproducible.
+"""
+
+import random
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+_local = threading.local()
+
+# Mean seconds between synthetic timestamps
+DEFAULT_CLOCK_INTERVAL = 0.05
+
+
+class SyntheticClock:
+    """Clock advancing by random, exponentially distributed steps."""
+
+    def __init__(
+        self,
+        start: datetime,
+        rng: random.Random,
+        mean_interval: float = DEFAULT_CLOCK_INTERVAL,
+    ):
+        """Initialize the clock.
+
+        Args:
+            start: First timestamp
+            rng: Generator drawing the steps (the service's generator)
+            mean_interval: Mean seconds between readings
+        """
+        self.now = start
+        self.rng = rng
+        self.rate = 1.0 / mean_interval
+
+    def __call__(self) -> datetime:
+        """Read the clock and advance it."""
+        value = self.now
+        self.now += timedelta(seconds=self.rng.expovariate(self.rate))
+        return value
+
+
+def set_clock(clock: Optional[SyntheticClock]) -> None:
+    """Use a synthetic clock on the current thread (None for wall time)."""
+    _local.clock = clock
+
+
+def get_clock() -> Optional[SyntheticClock]:
+    """Get the current thread's synthetic clock, if any."""
+    return getattr(_local, "clock", None)
 
 
 def get_timestamp() -> str:
@@ -9,4 +60,43 @@ def get_timestamp() -> str:
     Returns:
         ISO formatted timestamp string
     """
-    return datetime.now().isoformat()
+    return get_datetime().isoformat()
+
+
+def get_datetime() -> datetime:
+    """Get current timestamp as a datetime for structured records.
+
+    Returns:
+        Naive local datetime
+    """
+    clock = getattr(_local, "clock", None)
+    return clock() if clock is not None else datetime.now()
+
+
+# Seconds per duration unit
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as "90", "90s", "15m", "2h" or "1h30m".
+
+    Args:
+        value: Duration string; bare numbers are seconds
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        ValueError: If the duration is malformed or not positive
+    """
+    text = value.strip().lower()
+    try:
+        seconds = float(text)
+    except ValueError:
+        matches = re.findall(r"(\d+(?:\.\d+)?)([smhd])", text)
+        if not matches or "".join(n + u for n, u in matches) != text:
+            raise ValueError(f"Invalid duration '{value}' (use e.g. 90s, 15m, 2h)")
+        seconds = sum(float(n) * DURATION_UNITS[u] for n, u in matches)
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: '{value}'")
+    return seconds
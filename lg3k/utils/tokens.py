@@ -0,0 +1,234 @@
+"""Token counting and sample packing for LLM-format output.
+
+``--tokenizer`` counts the tokens of every LLM record and reports a
+histogram of the counts. ``--pack-tokens N`` also packs records into
+sequences of at most N tokens, the way trainers fill a fixed context
+length. Each output line is then one sequence:
+``{"text": ..., "num_tokens": ..., "num_records": ...}``.
+
+A record's text is its prompt (``PROMPT_TEMPLATE``), and records in a
+sequence are joined by ``SEPARATOR``. Records are tokenized a batch at a
+time when the generator flushes its output.
+
+Tokenizers:
+
+- a ``tokenizer.json`` file, loaded offline with the optional
+  ``tokenizers`` package (``lg3k[tokenizers]``)
+- ``whitespace``: words and punctuation marks
+- ``bytes``: UTF-8 bytes, as seen by byte-level models
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+try:
+    from tokenizers import Tokenizer
+
+    HAS_TOKENIZERS = True
+except ImportError:
+    Tokenizer = None
+    HAS_TOKENIZERS = False
+
+# Prompt text of an LLM record
+PROMPT_TEMPLATE = (
+    "### Instruction:\n{instruction}\n\n### Input:\n{input}\n\n### Response:\n{output}"
+)
+
+# Text between the records of a packed sequence
+SEPARATOR = "\n\n"
+
+# Words and punctuation marks, for the whitespace tokenizer
+_WORDS = re.compile(r"\w+|[^\w\s]")
+
+
+class WhitespaceTokenizer:
+    """Count words and punctuation marks."""
+
+    name = "whitespace"
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens of several texts."""
+        return [len(_WORDS.findall(text)) for text in texts]
+
+
+class BytesTokenizer:
+    """Count UTF-8 bytes."""
+
+    name = "bytes"
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens of several texts."""
+        return [len(text) if text.isascii() else len(text.encode()) for text in texts]
+
+
+class FileTokenizer:
+    """Count tokens with a Hugging Face ``tokenizer.json`` file."""
+
+    def __init__(self, path: str):
+        """Load the tokenizer.
+
+        Args:
+            path: tokenizer.json file
+
+        Raises:
+            ImportError: If the tokenizers package is not installed
+        """
+        if not HAS_TOKENIZERS:
+            raise ImportError(
+                "tokenizers is required for tokenizer files "
+                "(pip install 'lg3k[tokenizers]')"
+            )
+        self.name = path
+        self._tokenizer = Tokenizer.from_file(path)
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens of several texts."""
+        encodings = self._tokenizer.encode_batch(texts, add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+
+BUILTIN_TOKENIZERS = {"whitespace": WhitespaceTokenizer, "bytes": BytesTokenizer}
+
+
+def load_tokenizer(spec: str):
+    """Load a built-in tokenizer or a tokenizer file.
+
+    Args:
+        spec: Built-in tokenizer name or path to a tokenizer.json file
+
+    Returns:
+        Tokenizer providing count_batch()
+
+    Raises:
+        ValueError: If spec is neither a built-in name nor an existing file
+    """
+    if spec in BUILTIN_TOKENIZERS:
+        return BUILTIN_TOKENIZERS[spec]()
+    if not os.path.isfile(spec):
+        raise ValueError(
+            f"Unknown tokenizer '{spec}': expected a tokenizer.json file or one "
+            f"of {', '.join(BUILTIN_TOKENIZERS)}"
+        )
+    return FileTokenizer(spec)
+
+
+def bucket(tokens: int) -> int:
+    """Get the histogram bucket of a token count (the next power of two)."""
+    return 1 << max(0, tokens - 1).bit_length()
+
+
+class TokenPacker:
+    """Count the tokens of LLM records and optionally pack them."""
+
+    def __init__(
+        self, tokenizer, pack_tokens: Optional[int] = None, newline: str = "\n"
+    ):
+        """Initialize the packer.
+
+        Args:
+            tokenizer: Tokenizer providing count_batch()
+            pack_tokens: Tokens per packed sequence (None to only count)
+            newline: Line ending of the lines passed to process()
+
+        Raises:
+            ValueError: If pack_tokens is not positive
+        """
+        if pack_tokens is not None and pack_tokens < 1:
+            raise ValueError("Packed sequences must hold at least one token")
+        self.tokenizer = tokenizer
+        self.pack_tokens = pack_tokens
+        self.newline = newline
+        self.separator_tokens = tokenizer.count_batch([SEPARATOR])[0]
+        # Record counts per bucket, totals and packing results
+        self.histogram: Dict[int, int] = {}
+        self.records = 0
+        self.tokens = 0
+        self.max_tokens = 0
+        self.sequences = 0
+        self.packed_tokens = 0
+        self.oversized = 0
+        self._texts: List[str] = []
+        self._size = 0
+
+    def _emit(self) -> str:
+        """Turn the pending records into one sequence line."""
+        line = json.dumps(
+            {
+                "text": SEPARATOR.join(self._texts),
+                "num_tokens": self._size,
+                "num_records": len(self._texts),
+            }
+        )
+        self.sequences += 1
+        self.packed_tokens += self._size
+        self._texts = []
+        self._size = 0
+        return line + self.newline
+
+    def process(self, lines: List[str], final: bool = False) -> List[str]:
+        """Count a batch of LLM JSON lines and pack them.
+
+        Args:
+            lines: LLM-format JSON lines
+            final: Whether this is the last batch (emits the last sequence)
+
+        Returns:
+            The lines unchanged when only counting, otherwise the finished
+            sequence lines
+        """
+        texts = [PROMPT_TEMPLATE.format(**json.loads(line)) for line in lines]
+        counts = self.tokenizer.count_batch(texts) if texts else []
+        for count in counts:
+            key = bucket(count)
+            self.histogram[key] = self.histogram.get(key, 0) + 1
+        self.records += len(counts)
+        self.tokens += sum(counts)
+        self.max_tokens = max(self.max_tokens, *counts, 0)
+        if self.pack_tokens is None:
+            return lines
+
+        # Greedy packing in generation order; a record longer than a
+        # sequence gets one of its own
+        output = []
+        for text, count in zip(texts, counts):
+            if count > self.pack_tokens:
+                self.oversized += 1
+            size = count + (self.separator_tokens if self._texts else 0)
+            if self._texts and self._size + size > self.pack_tokens:
+                output.append(self._emit())
+                size = count
+            self._texts.append(text)
+            self._size += size
+        if final and self._texts:
+            output.append(self._emit())
+        return output
+
+    def summary(self) -> Dict:
+        """Summarize the token counts for the run results."""
+        summary = {
+            "tokenizer": self.tokenizer.name,
+            "records": self.records,
+            "tokens": self.tokens,
+            "mean_tokens": self.tokens / self.records if self.records else 0.0,
+            "max_tokens": self.max_tokens,
+            # Records per token count bucket: "64" counts 33 to 64 tokens
+            "histogram": {
+                str(key): self.histogram[key] for key in sorted(self.histogram)
+            },
+        }
+        if self.pack_tokens is not None:
+            summary.update(
+                {
+                    "pack_tokens": self.pack_tokens,
+                    "sequences": self.sequences,
+                    "fill_ratio": (
+                        self.packed_tokens / (self.sequences * self.pack_tokens)
+                        if self.sequences
+                        else 0.0
+                    ),
+                    "oversized_records": self.oversized,
+                }
+            )
+        return summary
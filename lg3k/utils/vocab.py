@@ -0,0 +1,235 @@
+"""Heavy-tailed vocabulary utilities.
+
+Vocabularies are built once into tables of interned strings and sampled
+by index with a Zipfian popularity distribution, which gives realistic
+cardinality and hot-key behaviour for paths, users and user agents.
+"""
+
+import random
+import sys
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, List
+
+# Building blocks for synthetic URL spaces
+PATH_SEGMENTS = [
+    "api",
+    "v1",
+    "v2",
+    "users",
+    "posts",
+    "comments",
+    "products",
+    "orders",
+    "cart",
+    "search",
+    "static",
+    "images",
+    "docs",
+    "blog",
+    "account",
+    "settings",
+    "auth",
+    "media",
+    "assets",
+    "reports",
+]
+QUERY_KEYS = ["page", "limit", "sort", "q", "id", "lang", "ref", "filter"]
+FILE_EXTENSIONS = ["", "", "", ".html", ".json", ".css", ".js", ".png"]
+
+USER_AGENT_TEMPLATES = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{major}.0.{build}.{patch} Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_{minor}) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/{major_safari}.{minor} Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:{major}.0) Gecko/20100101 Firefox/{major}.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS {ios}_{minor} like Mac OS X) "
+    "AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+    "curl/7.{minor}.{patch}",
+    "python-requests/2.{minor}.{patch}",
+    "Go-http-client/1.1",
+]
+
+
+class ZipfSampler:
+    """Sample indices in ``[0, size)`` following a Zipf distribution.
+
+    The cumulative distribution is precomputed once into a compact
+    ``array('d')`` so each sample is a single ``random()`` call plus a
+    binary search.
+    """
+
+    def __init__(self, size: int, exponent: float = 1.1):
+        """Initialize the sampler.
+
+        Args:
+            size: Number of distinct ranks
+            exponent: Zipf exponent ``s`` (higher values are more skewed)
+
+        Raises:
+            ValueError: If size is not positive or exponent is negative
+        """
+        if size < 1:
+            raise ValueError("Vocabulary size must be at least 1")
+        if exponent < 0:
+            raise ValueError("Zipf exponent must not be negative")
+        self.size = size
+        self.exponent = exponent
+        cdf = array("d")
+        total = 0.0
+        for rank in range(1, size + 1):
+            total += rank**-exponent
+            cdf.append(total)
+        self._cdf = cdf
+        self._total = total
+
+    def sample(self, rng: random.Random = random) -> int:
+        """Draw a single index.
+
+        Args:
+            rng: Random source (default: the global ``random`` module)
+
+        Returns:
+            Index of the sampled rank, 0 being the most popular
+        """
+        return min(bisect_right(self._cdf, rng.random() * self._total), self.size - 1)
+
+
+class Vocabulary:
+    """Interned string table sampled with Zipfian popularity."""
+
+    def __init__(self, words: List[str], exponent: float = 1.1):
+        """Initialize the vocabulary.
+
+        Args:
+            words: Strings ordered from most to least popular
+            exponent: Zipf exponent used for sampling
+        """
+        self.words = [sys.intern(word) for word in words]
+        self.sampler = ZipfSampler(len(self.words), exponent)
+
+    def __len__(self) -> int:
+        """Return the number of distinct strings."""
+        return len(self.words)
+
+    def sample(self, rng: random.Random = random) -> str:
+        """Draw a string according to its popularity."""
+        return self.words[self.sampler.sample(rng)]
+
+
+# Candidates drawn per requested entry before a vocabulary is given up on
+MAX_ATTEMPTS_PER_WORD = 20
+
+
+def build_vocabulary(
+    size: int, builder: Callable[[random.Random, int], str], seed: int = 0
+) -> List[str]:
+    """Build a list of unique strings with a private, seeded RNG.
+
+    Args:
+        size: Number of distinct strings to build
+        builder: Callable producing a candidate string from (rng, index)
+        seed: Seed so the same vocabulary is produced on every run
+
+    Returns:
+        List of unique strings in rank order
+
+    Raises:
+        ValueError: If the builder cannot produce size distinct strings
+            within MAX_ATTEMPTS_PER_WORD candidates per string
+    """
+    rng = random.Random(seed)
+    words = []
+    seen = set()
+    attempts = size * MAX_ATTEMPTS_PER_WORD
+    index = 0
+    while len(words) < size:
+        if index >= attempts:
+            raise ValueError(
+                f"Could only build {len(words)} distinct vocabulary entries "
+                f"of the {size} requested; use a smaller size"
+            )
+        word = builder(rng, index)
+        index += 1
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def _build_path(rng: random.Random, index: int) -> str:
+    """Build a synthetic URL path with an optional query string."""
+    depth = rng.randint(1, 4)
+    segments = [rng.choice(PATH_SEGMENTS) for _ in range(depth)]
+    if rng.random() < 0.5:
+        segments.append(str(rng.randint(1, 1_000_000)))
+    path = "/" + "/".join(segments) + rng.choice(FILE_EXTENSIONS)
+    if rng.random() < 0.4:
+        keys = rng.sample(QUERY_KEYS, rng.randint(1, 3))
+        query = "&".join(f"{key}={rng.randint(1, 500)}" for key in keys)
+        path = f"{path}?{query}"
+    return path
+
+
+def _build_endpoint(rng: random.Random, index: int) -> str:
+    """Build a synthetic REST API endpoint."""
+    version = rng.choice(["v1", "v1", "v2"])
+    resource = rng.choice(PATH_SEGMENTS[3:10])
+    endpoint = f"/api/{version}/{resource}"
+    if rng.random() < 0.7:
+        endpoint += f"/{rng.randint(1, 1_000_000)}"
+        if rng.random() < 0.3:
+            endpoint += "/" + rng.choice(PATH_SEGMENTS[3:10])
+    if rng.random() < 0.3:
+        endpoint += f"?limit={rng.choice([10, 25, 50, 100])}"
+    return endpoint
+
+
+def _build_user_id(rng: random.Random, index: int) -> str:
+    """Build a synthetic user identifier."""
+    return f"user{index:07d}"
+
+
+def _build_user_agent(rng: random.Random, index: int) -> str:
+    """Build a synthetic user agent string."""
+    return rng.choice(USER_AGENT_TEMPLATES).format(
+        major=rng.randint(90, 125),
+        major_safari=rng.randint(13, 17),
+        minor=rng.randint(0, 9),
+        build=rng.randint(1000, 6500),
+        patch=rng.randint(0, 200),
+        ios=rng.randint(13, 17),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_url_paths(size: int = 50_000, exponent: float = 1.1) -> Vocabulary:
+    """Get the shared URL path vocabulary, building it on first use.
+
+    Args:
+        size: Number of distinct paths
+        exponent: Zipf exponent for path popularity
+
+    Returns:
+        Vocabulary of URL paths with query strings
+    """
+    return Vocabulary(build_vocabulary(size, _build_path, seed=1), exponent)
+
+
+@lru_cache(maxsize=None)
+def get_api_endpoints(size: int = 20_000, exponent: float = 1.1) -> Vocabulary:
+    """Get the shared API endpoint vocabulary, building it on first use."""
+    return Vocabulary(build_vocabulary(size, _build_endpoint, seed=4), exponent)
+
+
+@lru_cache(maxsize=None)
+def get_user_ids(size: int = 100_000, exponent: float = 1.0) -> Vocabulary:
+    """Get the shared user ID vocabulary, building it on first use."""
+    return Vocabulary(build_vocabulary(size, _build_user_id, seed=2), exponent)
+
+
+@lru_cache(maxsize=None)
+def get_user_agents(size: int = 500, exponent: float = 1.3) -> Vocabulary:
+    """Get the shared user agent vocabulary, building it on first use."""
+    return Vocabulary(build_vocabulary(size, _build_user_agent, seed=3), exponent)
@@ -19,6 +19,13 @@ setup(
         "click>=8.0.0",
         "rich>=10.0.0",
     ],
+    extras_require={
+        "arrow": ["pyarrow>=14.0.0"],
+        "duckdb": ["duckdb>=0.10.0"],
+        "kafka": ["kafka-python>=2.0.2"],
+        "tokenizers": ["tokenizers>=0.15.0"],
+        "xxhash": ["xxhash>=3.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "lg3k=lg3k.main:main",
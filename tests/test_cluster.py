@@ -0,0 +1,147 @@
+"""Tests for distributed generation."""
+
+import hashlib
+import json
+import socket
+import threading
+from datetime import datetime
+
+from click.testing import CliRunner
+
+from lg3k.cluster import (
+    PROTOCOL_VERSION,
+    Coordinator,
+    cluster_cli,
+    plan_shards,
+    read_message,
+    run_shard,
+    run_worker,
+    send_message,
+)
+from lg3k.main import load_modules
+
+START = datetime(2024, 1, 1)
+
+
+def make_settings(services):
+    """Build coordinator settings for the given services."""
+    return {
+        "config": {"services": services},
+        "format": "default",
+        "checksum": "blake2b",
+    }
+
+
+def test_plan_shards():
+    """Test shards cover every line with distinct seeds and clock starts."""
+    shards = plan_shards(["api", "os"], 2500, 1000, 7, START, {"os": ".jsonl"})
+    assert [(s["service"], s["lines"]) for s in shards] == [
+        ("api", 1000),
+        ("api", 1000),
+        ("api", 500),
+        ("os", 1000),
+        ("os", 1000),
+        ("os", 500),
+    ]
+    assert [s["id"] for s in shards] == list(range(6))
+    assert len({s["seed"] for s in shards}) == 6
+    assert shards[1]["start"] == "2024-01-01T00:00:50"
+    assert shards[4]["file"] == "os_part00001.jsonl"
+    assert plan_shards(["api"], 2500, 1000, 7, START) == shards[:3]
+
+
+def test_run_shard_reproducible(tmp_path):
+    """Test a shard produces the same bytes wherever it runs."""
+    modules = load_modules()
+    shard = plan_shards(["api"], 200, 200, 3, START)[0]
+    settings = make_settings(["api"])
+    first = run_shard(shard, settings, modules, str(tmp_path / "a"))
+    second = run_shard(shard, settings, modules, str(tmp_path / "b"))
+    assert first["lines"] == 200
+    assert first["checksum"] == second["checksum"]
+    assert first["min_timestamp"] == "2024-01-01T00:00:00"
+    data = (tmp_path / "a" / "api_part00000.log").read_bytes()
+    assert hashlib.blake2b(data, digest_size=32).hexdigest() == first["checksum"]
+
+
+def test_coordinator_with_workers(tmp_path):
+    """Test two workers generate every shard and report manifest entries."""
+    services = ["api", "database"]
+    shards = plan_shards(services, 3000, 1000, 1, START)
+    coordinator = Coordinator(shards, make_settings(services), port=0).start()
+    workers = [
+        threading.Thread(
+            target=run_worker,
+            args=("127.0.0.1", coordinator.port, str(tmp_path / name), name),
+        )
+        for name in ("w1", "w2")
+    ]
+    for thread in workers:
+        thread.start()
+    assert coordinator.wait(timeout=60)
+    for thread in workers:
+        thread.join(timeout=10)
+    coordinator.stop()
+
+    entries = coordinator.manifest_entries()
+    assert [entry["shard"] for entry in entries] == list(range(6))
+    assert sum(entry["lines"] for entry in entries) == 6000
+    assert not coordinator.errors
+    for entry in entries:
+        data = (tmp_path / entry["worker"] / entry["file"]).read_bytes()
+        assert hashlib.blake2b(data, digest_size=32).hexdigest() == entry["checksum"]
+
+
+def test_coordinator_requeues_dropped_shard(tmp_path):
+    """Test a shard taken by a worker that disconnects goes to the next one."""
+    shards = plan_shards(["api"], 100, 100, 1, START)
+    coordinator = Coordinator(shards, make_settings(["api"]), port=0).start()
+    sock = socket.create_connection(("127.0.0.1", coordinator.port))
+    with sock, sock.makefile("rwb") as stream:
+        send_message(stream, {"type": "hello", "version": PROTOCOL_VERSION})
+        assert read_message(stream)["type"] == "settings"
+        send_message(stream, {"type": "request"})
+        assert read_message(stream)["shard"]["id"] == 0
+
+    assert run_worker("127.0.0.1", coordinator.port, str(tmp_path), "w") == 1
+    assert coordinator.wait(timeout=10)
+    coordinator.stop()
+    assert coordinator.manifest_entries()[0]["lines"] == 100
+
+
+def test_cli_coordinator(tmp_path, monkeypatch):
+    """Test the coordinator command writes the combined manifest."""
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api"]}, f)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    worker = threading.Thread(
+        target=run_worker, args=("127.0.0.1", port, str(tmp_path / "w"), "w")
+    )
+    worker.start()
+
+    result = CliRunner().invoke(
+        cluster_cli,
+        [
+            "coordinator",
+            "--count",
+            "250",
+            "--shard-size",
+            "100",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--json-output",
+        ],
+    )
+    worker.join(timeout=10)
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert output["logs_generated"] == 250
+    assert output["shards"] == 3
+    assert output["workers"] == ["w"]
+    with open(output["manifest"]) as f:
+        assert len(json.load(f)["files"]) == 3
@@ -12,6 +12,7 @@ from rich.console import Console
 
 from lg3k.main import (
     CustomCommand,
+    build_renderer,
     cli,
     format_json_output,
     format_progress_display,
@@ -628,6 +629,50 @@ def test_llm_format_handling():
     assert "This is a REST API log" in result["output"]
 
 
+def test_llm_format_analysis(tmp_path, monkeypatch):
+    """Test that LLM records explain the structured record of every module."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["database", "os", "firewall"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--llm-format", "-c", "20", "--seed", "1", "--json-output"]
+    )
+    assert result.exit_code == 0, result.output
+    for path in json.loads(result.output)["files"]:
+        with open(path) as f:
+            entries = [json.loads(line) for line in f]
+        assert len(entries) == 20
+        for entry in entries:
+            message = json.loads(entry["input"])["message"]
+            assert entry["output"].startswith(f"Message: {message}. ")
+            assert entry["output"].count("Message: ") == 1
+        if "database" in path:
+            assert all(" table" in entry["output"] for entry in entries)
+
+
+def test_llm_format_instructions(tmp_path, monkeypatch):
+    """Test that LLM instructions vary and are reproducible with a seed."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api"]}, f)
+
+    def run():
+        result = CliRunner().invoke(
+            cli, ["--llm-format", "-c", "200", "--seed", "3", "--json-output"]
+        )
+        assert result.exit_code == 0, result.output
+        with open(json.loads(result.output)["files"][0]) as f:
+            return [json.loads(line)["instruction"] for line in f]
+
+    instructions = run()
+    assert len(set(instructions)) > 5
+    assert instructions == run()
+
+
 def test_custom_command_error_handling():
     """Test CustomCommand error handling."""
 
@@ -1069,3 +1114,1002 @@ def test_generate_analysis_severity():
     log_entry["level"] = "CRITICAL"
     analysis = generate_analysis("generic", log_entry)
     assert "critical level event that requires immediate attention" in analysis
+
+
+def test_cli_format_per_service(tmp_path, monkeypatch):
+    """Test --format with per-service overrides from the config."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump(
+            {"services": ["web_server", "os"], "formats": {"web_server": "apache"}},
+            f,
+        )
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--count", "3", "--format", "syslog", "--json-output"])
+    assert result.exit_code == 0
+    files = json.loads(result.output)["files"]
+    with open(files[0]) as f:
+        assert "HTTP/1.1" in f.read()
+    with open(files[1]) as f:
+        lines = f.readlines()
+    assert len(lines) == 3
+    assert all(line.startswith("<") for line in lines)
+
+
+def test_cli_format_unsupported_for_service(tmp_path, monkeypatch):
+    """Test --format fails for services lacking the required fields."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["database"]}, f)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--format", "apache", "--json-output"])
+    assert result.exit_code == 1
+    assert "not supported for database" in result.output
+
+
+def test_build_renderer_declared_fields():
+    """Test formats are checked against declared fields without sampling."""
+    from lg3k.modules import firewall, smarthome
+    from lg3k.utils.rng import get_rng
+
+    rng = get_rng("smarthome")
+    state = rng.getstate()
+    build_renderer("smarthome", smarthome.generate_log, "syslog")
+    assert rng.getstate() == state
+    with pytest.raises(ValueError, match="not supported for smarthome"):
+        build_renderer("smarthome", smarthome.generate_log, "apache")
+    build_renderer("firewall", firewall.generate_log, "iptables")
+
+
+def test_cli_template_varying_fields(tmp_path, monkeypatch):
+    """Test templates over fields of only some smarthome records."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    template = "{ts} {device_id} {location} {brightness:03d}"
+    with open("config.json", "w") as f:
+        json.dump({"services": ["smarthome"], "templates": {"smarthome": template}}, f)
+    for seed in range(3):
+        result = CliRunner().invoke(
+            cli, ["--count", "20", "--seed", str(seed), "--json-output"]
+        )
+        assert result.exit_code == 0, result.output
+        with open(json.loads(result.output)["files"][0]) as f:
+            assert len(f.read().splitlines()) == 20
+
+    with open("config.json", "w") as f:
+        json.dump({"services": ["smarthome"], "templates": {"smarthome": "{nope}"}}, f)
+    result = CliRunner().invoke(cli, ["--count", "1", "--json-output"])
+    assert result.exit_code == 1
+    assert "nope" in result.output
+
+
+def test_cli_template(tmp_path, monkeypatch):
+    """Test per-service line templates from the config."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump(
+            {
+                "services": ["database"],
+                "templates": {"database": "{ts:%H:%M:%S} {operation} {table}"},
+            },
+            f,
+        )
+    result = CliRunner().invoke(cli, ["--count", "2", "--json-output"])
+    assert result.exit_code == 0
+    with open(json.loads(result.output)["files"][0]) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2
+    assert len(lines[0].split()) == 3
+
+
+def test_cli_output_format_parquet(tmp_path, monkeypatch):
+    """Test writing records directly to Parquet files."""
+    import json
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["firewall", "os"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--count",
+            "25",
+            "--output-format",
+            "parquet",
+            "--row-group-size",
+            "10",
+            "--json-output",
+        ],
+    )
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    assert output["config"]["file_format"] == "parquet"
+    metadata = pq.ParquetFile(output["files"][0]).metadata
+    assert metadata.num_rows == 25
+    assert metadata.num_row_groups == 3
+
+
+def test_cli_sqlite_sink(tmp_path, monkeypatch):
+    """Test loading all services into one SQLite database."""
+    import json
+    import sqlite3
+
+    from lg3k.modules import api
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "printer"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--count", "30", "--sink", "sqlite:///logs.db", "--json-output"]
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["files"] == ["logs.db"]
+    conn = sqlite3.connect("logs.db")
+    assert conn.execute('SELECT COUNT(*) FROM "api"').fetchone()[0] == 30
+    assert conn.execute('SELECT COUNT(*) FROM "printer"').fetchone()[0] == 30
+    # Tables have the modules' declared columns
+    columns = [row[1] for row in conn.execute('PRAGMA table_info("api")')]
+    conn.close()
+    assert columns == list(api.RECORD_FIELDS)
+    # The size of records loaded into a database is unknown
+    stats = json.loads(result.output)["stats"]
+    assert "bytes" not in stats["modules"]["api"]
+    assert "bytes_per_second" not in stats["modules"]["api"]
+    assert stats["total_size_bytes"] == 0
+
+
+def test_cli_syslog_sink(tmp_path, monkeypatch):
+    """Test streaming rendered lines to a syslog collector."""
+    import json
+    import socket
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    port = receiver.getsockname()[1]
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--count",
+            "5",
+            "--format",
+            "syslog",
+            "--sink",
+            f"syslog://127.0.0.1:{port}",
+            "--json-output",
+        ],
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["logs_generated"] == 5
+    messages = [receiver.recv(4096).decode() for _ in range(5)]
+    receiver.close()
+    assert all(" lg3k-os " in message for message in messages)
+
+
+def test_cli_multiple_sinks(tmp_path, monkeypatch):
+    """Test sending the same run to a database and a syslog collector."""
+    import json
+    import socket
+    import sqlite3
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    port = receiver.getsockname()[1]
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "nas"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--count",
+            "10",
+            "--sink",
+            "sqlite:///logs.db",
+            "--sink",
+            f"syslog://127.0.0.1:{port}",
+            "--json-output",
+        ],
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["files"] == ["logs.db"]
+    messages = [receiver.recv(4096).decode() for _ in range(20)]
+    receiver.close()
+    assert sum(" lg3k-nas " in message for message in messages) == 10
+    conn = sqlite3.connect("logs.db")
+    assert conn.execute('SELECT COUNT(*) FROM "api"').fetchone()[0] == 10
+    conn.close()
+
+
+def test_cli_llm_format_sinks(tmp_path, monkeypatch):
+    """Test LLM lines go to line sinks and record sinks are rejected."""
+    import json
+    import socket
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    port = receiver.getsockname()[1]
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--count",
+            "5",
+            "--llm-format",
+            "--sink",
+            f"syslog://127.0.0.1:{port}",
+            "--json-output",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    messages = [receiver.recv(4096).decode() for _ in range(5)]
+    receiver.close()
+    assert all('{"instruction": ' in message for message in messages)
+
+    for options in (["--sink", "sqlite:///logs.db"], ["--output-format", "arrow"]):
+        result = CliRunner().invoke(cli, ["--llm-format", *options, "--json-output"])
+        assert result.exit_code == 1
+        assert "--llm-format only supports" in result.output
+    assert not os.path.exists("logs.db")
+
+
+def test_generate_module_logs_publishes_progress(tmp_path):
+    """Test that workers publish progress to their board slot."""
+    from lg3k.main import WRITE_BATCH_SIZE, render_progress
+    from lg3k.utils.progress import ProgressBoard
+
+    count = WRITE_BATCH_SIZE * 2 + 5
+    board = ProgressBoard({"progress_module": count})
+    seen = []
+    slot = board.slot("progress_module")
+
+    def generator():
+        seen.append(board.snapshot()["progress_module"][0])
+        return "line"
+
+    logs = generate_module_logs(
+        "progress_module",
+        generator,
+        count,
+        str(tmp_path / "out.log"),
+        json_output=True,
+        progress=slot,
+    )
+    assert logs == count
+    assert seen[WRITE_BATCH_SIZE] == WRITE_BATCH_SIZE
+    assert board.snapshot()["progress_module"] == (count, count)
+    stats = board.stats()["progress_module"]
+    assert stats["bytes"] == count * len("line\n")
+    assert stats["flushes"] == 3
+    assert stats["finished_ns"] >= stats["started_ns"] > 0
+
+    with patch("lg3k.main.update_progress_display") as mock_display, patch.dict(
+        "lg3k.main.module_status", {"progress_module": "Running"}
+    ), patch.dict("lg3k.main.module_progress", {}, clear=True):
+        render_progress({"progress_module": (count // 2, count)})
+        from lg3k.main import module_progress
+
+        assert module_progress["progress_module"].endswith("49%")
+        mock_display.assert_called_once()
+
+
+def test_generate_module_logs_sink_bytes():
+    """Test line sinks are credited with the UTF-8 size of their lines."""
+    from lg3k.utils.progress import ProgressBoard
+
+    class LineSink:
+        records = False
+        batch_size = 10
+
+        def __init__(self):
+            self.lines = []
+
+        def write_batch(self, service, items):
+            self.lines.extend(items)
+
+    board = ProgressBoard({"sink_module": 25})
+    sink = LineSink()
+    generate_module_logs(
+        "sink_module",
+        lambda: "caf\u00e9 \u2713",
+        25,
+        None,
+        json_output=True,
+        sink=sink,
+        progress=board.slot("sink_module"),
+    )
+    assert len(sink.lines) == 25
+    assert board.stats()["sink_module"]["bytes"] == 25 * len(
+        "caf\u00e9 \u2713\n".encode()
+    )
+
+
+def test_cli_stats_file(tmp_path, monkeypatch):
+    """Test writing live stats for a headless run."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "os"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        ["--count", "40", "--stats-file", "stats.json", "--metrics-port", "0"],
+    )
+    assert result.exit_code == 0
+    with open("stats.json") as f:
+        stats = json.load(f)
+    assert stats["modules"]["api"]["lines"] == 40
+    assert stats["modules"]["os"]["bytes"] > 0
+    assert "Serving metrics on port" in result.output
+
+
+def test_cli_json_output_stats(tmp_path, monkeypatch):
+    """Test that --json-output reports sizes tracked while writing."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "smarthome"]}, f)
+    result = CliRunner().invoke(cli, ["--count", "250", "--json-output"])
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    stats = output["stats"]
+    sizes = {os.path.basename(path): os.path.getsize(path) for path in output["files"]}
+    assert stats["total_size_bytes"] == sum(sizes.values())
+    api = stats["modules"]["api"]
+    assert api["lines"] == 250
+    assert api["bytes"] == sizes[next(name for name in sizes if "api" in name)]
+    assert api["compression_ratio"] == 1.0
+    assert api["write_seconds"] >= 0 and api["generate_seconds"] > 0
+    assert stats["lines_per_second"] > 0
+
+
+def test_cli_json_output_stats_parquet(tmp_path, monkeypatch):
+    """Test compression ratios reported for Parquet output."""
+    import json
+
+    pytest.importorskip("pyarrow")
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["web_server"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--count", "2000", "--output-format", "parquet", "--json-output"]
+    )
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    web = output["stats"]["modules"]["web_server"]
+    assert web["bytes"] == os.path.getsize(output["files"][0])
+    assert web["compression_ratio"] > 1
+    assert output["stats"]["total_size_bytes"] == web["bytes"]
+
+
+def test_cli_profile_cpu(tmp_path, monkeypatch):
+    """Test per-module CPU profiles and the merged summary."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "os"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--count", "200", "--profile", "cpu", "--json-output"]
+    )
+    assert result.exit_code == 0
+    profile = json.loads(result.output)["profile"]
+    assert profile["mode"] == "cpu"
+    assert len(profile["files"]) == 2
+    assert all(os.path.exists(path) for path in profile["files"])
+    with open(profile["summary"]) as f:
+        summary = f.read()
+    assert "Time by stage" in summary
+    assert "generate_module_logs" in summary
+
+
+def test_cli_profile_cpu_threads(tmp_path, monkeypatch):
+    """Test CPU profiling several services on several worker threads."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "os", "database"]}, f)
+    result = CliRunner().invoke(
+        cli,
+        ["--count", "2000", "--profile", "cpu", "--threads", "3", "--json-output"],
+    )
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert output["success"]
+    assert len(output["profile"]["files"]) == 3
+    assert all(stats["lines"] == 2000 for stats in output["stats"]["modules"].values())
+
+    # Services profiled one at a time cannot share a run-wide deadline
+    result = CliRunner().invoke(
+        cli, ["--duration", "2s", "--profile", "cpu", "--json-output"]
+    )
+    assert result.exit_code == 1
+    assert "--duration" in json.loads(result.output)["error"]["message"]
+
+
+def test_cli_seed_reproducible(tmp_path, monkeypatch):
+    """Test that seeded runs produce identical logs."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "smarthome"]}, f)
+    contents = []
+    for output_dir in ("first", "second"):
+        result = CliRunner().invoke(
+            cli, ["--count", "300", "--seed", "9", "-o", output_dir, "--json-output"]
+        )
+        assert result.exit_code == 0
+        files = sorted(json.loads(result.output)["files"])
+        contents.append([open(path).read() for path in files])
+    assert contents[0] == contents[1]
+
+
+def test_cli_resume_from_checkpoint(tmp_path, monkeypatch):
+    """Test that a resumed run matches an uninterrupted one."""
+    import json
+    from datetime import datetime
+
+    import lg3k.modules.api as api_module
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 1, 1, 12, 0, 0)
+
+    # Both runs start their synthetic clocks at the same time
+    monkeypatch.setattr("lg3k.main.datetime", FrozenDatetime)
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "os"]}, f)
+    args = ["--count", "2500", "--seed", "3", "--checkpoint-interval", "0"]
+
+    result = CliRunner().invoke(cli, [*args, "-o", "full", "--json-output"])
+    assert result.exit_code == 0
+    expected = {
+        os.path.basename(path).split("_")[0]: open(path).read()
+        for path in json.loads(result.output)["files"]
+    }
+    expected_manifest = json.loads(result.output)["manifest"]["files"]
+
+    # Interrupt api after its second batch, leaving a torn write behind
+    generate_record = api_module.generate_record
+    calls = []
+
+    def failing_generate_record():
+        calls.append(1)
+        if len(calls) > 2100:
+            raise RuntimeError("node preempted")
+        return generate_record()
+
+    monkeypatch.setattr(api_module, "generate_record", failing_generate_record)
+    result = CliRunner().invoke(cli, [*args, "-o", "partial", "--json-output"])
+    assert result.exit_code == 1
+    monkeypatch.setattr(api_module, "generate_record", generate_record)
+    with open(os.path.join("partial", "checkpoint.json")) as f:
+        manifest = json.load(f)
+    assert manifest["modules"]["api"]["lines"] == 2000
+    api_file = os.path.join("partial", manifest["modules"]["api"]["file"])
+    with open(api_file, "a") as f:
+        f.write("torn line")
+
+    result = CliRunner().invoke(cli, ["--resume", "-o", "partial", "--json-output"])
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    assert output["logs_generated"] == 5000
+    for path in output["files"]:
+        assert open(path).read() == expected[os.path.basename(path).split("_")[0]]
+    resumed = {entry["file"]: entry for entry in output["manifest"]["files"]}
+    assert [entry["checksum"] for entry in resumed.values()] == [
+        entry["checksum"] for entry in expected_manifest
+    ]
+
+
+def test_cli_count_above_old_cap(tmp_path, monkeypatch):
+    """Test that --count is no longer capped at 1,000,000."""
+    import json
+
+    from lg3k.main import generate_module_logs
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os"]}, f)
+    result = CliRunner().invoke(cli, ["--count", "1000001", "--help"])
+    assert result.exit_code == 0
+
+    # Lines are streamed, so counts beyond the old cap only cost time
+    output_file = tmp_path / "os.log"
+    logs = generate_module_logs(
+        "os", lambda: "x", 1_000_001, str(output_file), json_output=True
+    )
+    assert logs == 1_000_001
+    assert output_file.stat().st_size == 2_000_002
+
+
+def test_cli_duration(tmp_path, monkeypatch):
+    """Test time-budgeted generation without a count."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os", "nas"]}, f)
+    result = CliRunner().invoke(cli, ["--duration", "0.3s", "--json-output"])
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    assert output["logs_generated"] > 200
+    assert output["time_taken"] < 5
+
+    # Open-ended services all run, even with fewer threads than services
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os", "nas", "api", "printer"]}, f)
+    result = CliRunner().invoke(cli, ["--duration", "0.3s", "-t", "1", "--json-output"])
+    assert result.exit_code == 0, result.output
+    modules = json.loads(result.output)["stats"]["modules"]
+    assert all(stats["lines"] > 0 for stats in modules.values())
+    assert len(modules) == 4
+
+    result = CliRunner().invoke(
+        cli, ["--duration", "1m", "--count", "50", "--json-output"]
+    )
+    assert json.loads(result.output)["logs_generated"] == 200
+
+    result = CliRunner().invoke(cli, ["--duration", "soon"])
+    assert result.exit_code != 0
+    assert "Invalid duration" in result.output
+
+
+def test_cli_target_bytes(tmp_path, monkeypatch):
+    """Test generating an exact volume split across services by weight."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "os"], "weights": {"api": 3}}, f)
+    result = CliRunner().invoke(
+        cli, ["--target-bytes", "100kb", "--json-output", "--format", "syslog"]
+    )
+    assert result.exit_code == 0
+    sizes = {
+        os.path.basename(path).split("_")[0]: os.path.getsize(path)
+        for path in json.loads(result.output)["files"]
+    }
+    assert sizes == {"api": 75000, "os": 25000}
+
+    result = CliRunner().invoke(cli, ["--target-bytes", "os=1234", "--json-output"])
+    output = json.loads(result.output)
+    assert output["stats"]["modules"]["api"]["lines"] == 100
+    assert output["stats"]["modules"]["os"]["bytes"] == 1234
+
+
+def test_cli_target_bytes_json_lines(tmp_path, monkeypatch):
+    """Test that byte targets never cut a JSON lines record."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api"]}, f)
+    for option in ("--llm-format", "--format=ecs"):
+        result = CliRunner().invoke(
+            cli, ["--target-bytes", "10000", option, "--json-output"]
+        )
+        assert result.exit_code == 0, result.output
+        (path,) = json.loads(result.output)["files"]
+        with open(path, "rb") as f:
+            data = f.read()
+        lines = data.decode().splitlines()
+        for line in lines:
+            json.loads(line)
+        assert data.endswith(b"\n")
+        assert 10000 - max(len(line) + 1 for line in lines) < len(data) <= 10000
+
+
+def test_cli_output_manifest(tmp_path, monkeypatch):
+    """Test the checksum manifest computed while writing."""
+    import hashlib
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "smarthome"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--count", "1500", "--checksum", "sha256", "--json-output"]
+    )
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    with open(output["manifest"]["path"]) as f:
+        entries = json.load(f)["files"]
+    assert entries == output["manifest"]["files"]
+    for path, entry in zip(output["files"], entries):
+        with open(path, "rb") as f:
+            data = f.read()
+        assert entry["file"] == os.path.basename(path)
+        assert entry["checksum"] == hashlib.sha256(data).hexdigest()
+        assert entry["bytes"] == len(data)
+        assert entry["lines"] == data.count(b"\n") == 1500
+        assert entry["min_timestamp"] <= entry["max_timestamp"]
+
+    result = CliRunner().invoke(
+        cli, ["--count", "10", "--checksum", "none", "-o", "plain", "--json-output"]
+    )
+    assert "manifest" not in json.loads(result.output)
+    assert not os.path.exists(os.path.join("plain", "manifest.json"))
+
+
+def test_cli_plan(tmp_path, monkeypatch):
+    """Test a skewed job plan with per-service counts, formats and shards."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os"]}, f)
+    plan = {
+        "defaults": {"format": "syslog"},
+        "services": {
+            "web_server": {"count": 900, "shards": 3},
+            "printer": {"count": 10, "format": "default"},
+            "api": {"target_bytes": 2000},
+        },
+    }
+    with open("plan.json", "w") as f:
+        json.dump(plan, f)
+    args = ["--plan", "plan.json", "--seed", "5", "--json-output"]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    lines = {name: stats["lines"] for name, stats in output["stats"]["modules"].items()}
+    assert lines == {
+        "web_server_part00000": 300,
+        "web_server_part00001": 300,
+        "web_server_part00002": 300,
+        "printer": 10,
+        "api": lines["api"],
+    }
+    assert output["stats"]["modules"]["api"]["bytes"] == 2000
+    with open(output["files"][0]) as f:
+        assert f.readline().startswith("<")
+    with open(output["files"][3]) as f:
+        assert not f.readline().startswith("<")
+
+    # Seeded shards are reproducible
+    rerun = json.loads(CliRunner().invoke(cli, [*args, "-o", "again"]).output)
+    checksums = [entry["checksum"] for entry in output["manifest"]["files"]]
+    assert [entry["checksum"] for entry in rerun["manifest"]["files"]] == checksums
+    assert len(set(checksums)) == 5
+
+
+def test_cli_merge(tmp_path, monkeypatch):
+    """Test merging all services into one timestamp-ordered file."""
+    import json
+    import re
+    from datetime import datetime
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["os", "api", "database"]}, f)
+    args = [
+        "--merge",
+        "--seed",
+        "3",
+        "-c",
+        "200",
+        "--checksum",
+        "sha256",
+        "--json-output",
+    ]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert output["logs_generated"] == 600
+    assert len(output["files"]) == 1
+    with open(output["files"][0]) as f:
+        lines = f.readlines()
+    assert len(lines) == 600
+    stamps = [
+        datetime.fromisoformat(re.search(r"\d{4}-\d{2}-\d{2}T[\d:.]+", line)[0])
+        for line in lines
+    ]
+    assert stamps == sorted(stamps)
+    components = {line.split("] [")[2].split("]")[0] for line in lines}
+    assert components == {"OS", "API", "Database"}
+
+    # Seeded merges are reproducible
+    rerun = json.loads(CliRunner().invoke(cli, [*args, "-o", "again"]).output)
+    checksum = output["manifest"]["files"][0]["checksum"]
+    assert rerun["manifest"]["files"][0]["checksum"] == checksum
+
+    # Byte targets drop each service's overflowing line instead of cutting it
+    args = ["--merge", "--seed", "2", "--json-output"]
+    result = CliRunner().invoke(cli, [*args, "--target-bytes", "20000", "-o", "sized"])
+    assert result.exit_code == 0, result.output
+    with open(json.loads(result.output)["files"][0]) as f:
+        lines = f.readlines()
+    assert 19000 < sum(len(line.encode()) for line in lines) <= 20000
+    full = json.loads(
+        CliRunner().invoke(cli, [*args, "-c", "200", "-o", "full"]).output
+    )
+    with open(full["files"][0]) as f:
+        assert set(lines) <= set(f.readlines())
+
+    result = CliRunner().invoke(cli, ["--merge", "--sink", "stdout://", "-c", "5"])
+    assert result.exit_code != 0
+
+
+def test_cli_dataset(tmp_path, monkeypatch):
+    """Test writing an LLM dataset with shards, splits and a dataset card."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "smarthome"]}, f)
+    args = ["--dataset", "data", "--shard-records", "100", "--seed", "4"]
+    result = CliRunner().invoke(cli, [*args, "-c", "500", "--json-output"])
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    dataset = output["dataset"]
+    kept = sum(split["records"] for split in dataset["splits"].values())
+    assert kept + dataset["duplicates"] == 1000
+    assert dataset["duplicates"] > 0
+    assert dataset["splits"]["train"]["records"] > dataset["splits"]["test"]["records"]
+    assert "data/README.md" in output["files"]
+
+    records = []
+    for path in sorted(tmp_path.glob("data/*.jsonl")):
+        with open(path) as f:
+            shard = [json.loads(line) for line in f]
+        assert 0 < len(shard) <= 100
+        records.extend(shard)
+    assert len(records) == kept
+    assert set(records[0]) == {"instruction", "input", "output"}
+    with open("data/README.md") as f:
+        assert "- Seed: 4" in f.read()
+
+    result = CliRunner().invoke(cli, [*args, "--splits", "90,10"])
+    assert result.exit_code != 0
+
+
+def test_cli_dedup(tmp_path, monkeypatch):
+    """Test dropping lines that repeat apart from their timestamps."""
+    import json
+    import re
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["database", "network"]}, f)
+    result = CliRunner().invoke(
+        cli, ["--dedup", "-c", "5000", "--seed", "2", "--json-output"]
+    )
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    dedup = output["dedup"]
+    assert dedup["duplicates"] > 0
+    assert output["logs_generated"] + dedup["duplicates"] == 10_000
+    stats = output["stats"]["modules"]["database"]
+    assert stats["lines"] + stats["duplicates"] == 5000
+    assert stats["dedup_ratio"] == dedup["modules"]["database"]["ratio"]
+    for path in output["files"]:
+        with open(path) as f:
+            lines = [re.sub(r"^\[[^]]*\]", "", line) for line in f]
+        assert len(set(lines)) == len(lines)
+
+    for options in (["--output-format", "parquet"], ["--sink", "sqlite:///x.db"]):
+        result = CliRunner().invoke(cli, ["--dedup", *options, "-c", "5"])
+        assert result.exit_code != 0
+        assert "--dedup only supports" in result.output
+    assert not os.path.exists("x.db")
+
+
+def test_cli_pack_tokens(tmp_path, monkeypatch):
+    """Test counting and packing LLM records into fixed-length sequences."""
+    import json
+
+    from lg3k.utils.tokens import WhitespaceTokenizer
+
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump({"services": ["api", "printer"]}, f)
+    args = ["--llm-format", "--tokenizer", "whitespace", "-c", "300"]
+    result = CliRunner().invoke(cli, [*args, "--pack-tokens", "1024", "--json-output"])
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    tokens = output["tokens"]
+    assert tokens["records"] == 600
+    assert sum(tokens["histogram"].values()) == 600
+
+    records = 0
+    for path in output["files"]:
+        with open(path) as f:
+            sequences = [json.loads(line) for line in f]
+        for sequence in sequences:
+            count = WhitespaceTokenizer().count_batch([sequence["text"]])[0]
+            assert count == sequence["num_tokens"] <= 1024
+            records += sequence["num_records"]
+        name = "api" if "api" in path else "printer"
+        assert len(sequences) == tokens["modules"][name]["sequences"]
+        assert output["stats"]["modules"][name]["lines"] == len(sequences)
+        assert output["stats"]["modules"][name]["records"] == 300
+    assert records == 600
+    # The manifest counts the sequence lines, and the records separately
+    for path, entry in zip(output["files"], output["manifest"]["files"]):
+        with open(path) as f:
+            assert entry["lines"] == len(f.readlines())
+        assert entry["records"] == 300
+
+    # Cached packed files replay with the same manifest
+    cached = [*args, "--pack-tokens", "1024", "--seed", "1", "--cache-dir", "cache"]
+    manifests = []
+    for directory in ("stored", "replayed"):
+        result = CliRunner().invoke(cli, [*cached, "-o", directory, "--json-output"])
+        output = json.loads(result.output)
+        manifests.append(
+            [
+                {key: value for key, value in entry.items() if key != "file"}
+                for entry in output["manifest"]["files"]
+            ]
+        )
+    assert sorted(output["cache"]["replayed"]) == ["api", "printer"]
+    assert manifests[0] == manifests[1]
+    assert output["stats"]["modules"]["api"]["records"] == 300
+
+    # Counting alone keeps one record per line
+    result = CliRunner().invoke(cli, [*args, "-o", "counted", "--json-output"])
+    output = json.loads(result.output)
+    assert "sequences" not in output["tokens"]["modules"]["api"]
+    with open(output["files"][0]) as f:
+        assert len(f.readlines()) == 300
+
+    result = CliRunner().invoke(cli, ["--tokenizer", "whitespace", "-c", "5"])
+    assert result.exit_code != 0
+
+
+def test_cli_plan_rate_and_sink(tmp_path, monkeypatch):
+    """Test plan rate limits and per-service sinks."""
+    import json
+    import sqlite3
+    import time
+
+    from lg3k.modules import database
+
+    monkeypatch.chdir(tmp_path)
+    plan = {
+        "services": {
+            "os": {"count": 60, "rate": 200},
+            "database": {"count": 50, "sink": "sqlite:///logs.db"},
+        }
+    }
+    with open("plan.json", "w") as f:
+        json.dump(plan, f)
+    started = time.monotonic()
+    result = CliRunner().invoke(cli, ["--plan", "plan.json", "--json-output"])
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert output["logs_generated"] == 110
+    assert time.monotonic() - started >= 0.25
+    assert "logs.db" in output["files"]
+    with sqlite3.connect("logs.db") as db:
+        assert db.execute("SELECT COUNT(*) FROM database").fetchone()[0] == 50
+        columns = [row[1] for row in db.execute("PRAGMA table_info(database)")]
+    assert columns[: len(database.RECORD_FIELDS)] == list(database.RECORD_FIELDS)
+
+
+def test_cli_plan_rate_duration(tmp_path, monkeypatch):
+    """Test a plan rate keeps applying until the --duration deadline."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    plan = {"services": {"web_server": {"count": 1_000_000, "rate": 20}}}
+    with open("plan.json", "w") as f:
+        json.dump(plan, f)
+    result = CliRunner().invoke(
+        cli, ["--plan", "plan.json", "--duration", "2s", "--json-output"]
+    )
+    assert result.exit_code == 0, result.output
+    # About 40 lines, plus at most one batch (rate / 10 lines) of slack
+    assert 20 <= json.loads(result.output)["logs_generated"] <= 50
+
+
+def test_cli_plan_seeded_shards_duration(tmp_path, monkeypatch):
+    """Test seeded shards run side by side instead of one after another."""
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    plan = {"services": {"web_server": {"shards": 4}, "api": {}}}
+    with open("plan.json", "w") as f:
+        json.dump(plan, f)
+    args = ["--plan", "plan.json", "--seed", "1", "--json-output"]
+    result = CliRunner().invoke(cli, [*args, "--duration", "1s", "-t", "4"])
+    assert result.exit_code == 0, result.output
+    modules = json.loads(result.output)["stats"]["modules"]
+    assert len(modules) == 5
+    assert all(stats["lines"] > 0 for stats in modules.values())
+
+    # Interleaved shards still depend only on their own seed
+    plan["services"]["web_server"]["count"] = 4000
+    with open("plan.json", "w") as f:
+        json.dump(plan, f)
+    checksums = []
+    for threads in ("1", "4"):
+        result = CliRunner().invoke(cli, [*args, "-t", threads, "-o", threads])
+        checksums.append(
+            [
+                entry["checksum"]
+                for entry in json.loads(result.output)["manifest"]["files"]
+            ]
+        )
+    assert checksums[0] == checksums[1]
+
+
+def test_cli_corpus_cache(tmp_path, monkeypatch):
+    """Test replaying seeded output from the corpus cache."""
+    import json
+    from datetime import datetime
+
+    starts = [datetime(2024, 1, 1, 12)]
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return starts[0]
+
+    monkeypatch.setattr("lg3k.main.datetime", FrozenDatetime)
+    monkeypatch.chdir(tmp_path)
+    with open("config.json", "w") as f:
+        json.dump(
+            {"services": ["api", "web_server"], "formats": {"web_server": "apache"}}, f
+        )
+    args = ["--count", "1500", "--seed", "4", "--json-output"]
+    cached = [*args, "--cache-dir", "cache"]
+
+    def run(*extra):
+        result = CliRunner().invoke(cli, [*extra])
+        assert result.exit_code == 0, result.output
+        output = json.loads(result.output)
+        contents = []
+        for path in output["files"]:
+            with open(path) as f:
+                contents.append(f.read())
+        return output, contents
+
+    first, first_contents = run(*cached, "-o", "first")
+    assert first["cache"]["stored"] == ["api", "web_server"]
+    second, second_contents = run(*cached, "-o", "second")
+    assert sorted(second["cache"]["replayed"]) == ["api", "web_server"]
+    assert second["logs_generated"] == 3000
+    assert second_contents == first_contents
+    assert second["manifest"]["files"] == first["manifest"]["files"]
+
+    # Re-stamped replays match fresh output generated at the new start time
+    starts[0] = datetime(2024, 3, 5, 8, 30)
+    restamped, restamped_contents = run(*cached, "--restamp", "-o", "third")
+    assert len(restamped["cache"]["replayed"]) == 2
+    fresh, fresh_contents = run(*args, "-o", "fresh")
+    assert restamped_contents == fresh_contents
+    assert restamped["manifest"]["files"] == fresh["manifest"]["files"]
+
+    # LLM records are re-stamped in their input and output as well
+    starts[0] = datetime(2024, 1, 1, 12)
+    llm = [*cached, "--llm-format"]
+    run(*llm, "-o", "llm_first")
+    starts[0] = datetime(2024, 3, 5, 8, 30)
+    _, restamped_contents = run(*llm, "--restamp", "-o", "llm_second")
+    _, fresh_contents = run(*args, "--llm-format", "-o", "llm_fresh")
+    assert restamped_contents == fresh_contents
+
+    result = CliRunner().invoke(cli, ["--cache-dir", "cache", "--json-output"])
+    assert result.exit_code == 1
+    assert "--seed" in json.loads(result.output)["error"]["message"]
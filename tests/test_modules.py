@@ -336,3 +336,60 @@ def test_smarthome_log_all_categories():
     assert all(
         count > 0 for count in categories.values()
     ), f"Not all categories were hit: {categories}"
+
+
+def test_web_server_configure():
+    """Test web server vocabulary sizes can be configured."""
+    from lg3k.utils.vocab import get_url_paths
+
+    original = web_server.PATH_COUNT
+    try:
+        web_server.configure({"paths": 10, "zipf_exponent": 1.5})
+        assert web_server.PATH_COUNT == 10
+        log = web_server.generate_log()
+        path = log.split(" - ")[1].split(" ", 1)[1]
+        assert path in get_url_paths(10, 1.5).words
+    finally:
+        web_server.configure({"paths": original, "zipf_exponent": 1.1})
+
+
+def test_api_configure():
+    """Test API vocabulary sizes can be configured."""
+    original = api.ENDPOINT_COUNT
+    try:
+        api.configure({"endpoint_count": 5})
+        assert api.ENDPOINT_COUNT == 5
+        assert "API Request" in api.generate_log()
+    finally:
+        api.configure({"endpoint_count": original})
+
+
+def test_generate_record_common_fields():
+    """Test every module produces structured records with common fields."""
+    from lg3k.modules import smarthome
+
+    for module in (api, database, firewall, nas, network, os, printer, web_server):
+        record = module.generate_record()
+        assert isinstance(record["timestamp"], datetime)
+        for field in ("level", "component", "message"):
+            assert isinstance(record[field], str)
+
+    record = smarthome.generate_record()
+    assert record["component"] == "SmartHome"
+    assert smarthome.render_log(record).startswith("SmartHome: {")
+    assert json.loads(record["message"])["type"] == record["type"]
+
+
+def test_record_fields_declared():
+    """Test records only use the fields and types their module declares."""
+    from lg3k.modules import smarthome
+
+    modules = (api, database, firewall, nas, network, os, printer, smarthome)
+    for module in modules + (web_server,):
+        seen = set()
+        for _ in range(500):
+            for name, value in module.generate_record().items():
+                assert isinstance(value, module.RECORD_FIELDS[name]), name
+                seen.add(name)
+        if module is not smarthome:
+            assert seen == set(module.RECORD_FIELDS)
@@ -0,0 +1,106 @@
+"""Tests for replaying log files."""
+
+import json
+import socket
+import time
+from datetime import datetime, timedelta
+
+from click.testing import CliRunner
+
+from lg3k.replay import iter_chunks, replay_cli, replay_file, split_lines
+
+LINES = b"".join(
+    f"[2024-01-01T00:00:0{i}.250000] [INFO] [OS] line {i}\n".encode() for i in range(5)
+)
+
+
+def test_iter_chunks():
+    """Test chunks end at line boundaries and cover the whole buffer."""
+    data = LINES + b"partial"
+    chunks = list(iter_chunks(data, 60))
+    assert b"".join(chunks) == data
+    assert all(chunk.endswith(b"\n") for chunk in chunks[:-1])
+    assert chunks[-1].endswith(b"partial")
+    assert split_lines(b"a\nb\nc") == [b"a\n", b"b\n", b"c"]
+    assert split_lines(b"a\n") == [b"a\n"]
+
+
+def test_replay_file_restamp(tmp_path):
+    """Test replayed timestamps start now and lines keep their length."""
+    path = tmp_path / "os_20240101.log"
+    path.write_bytes(LINES)
+    batches = []
+    lines, written = replay_file(str(path), batches.append)
+    data = b"".join(batches)
+    assert (lines, written) == (5, len(LINES))
+    assert len(data) == len(LINES)
+    first = datetime.fromisoformat(data[1:27].decode())
+    assert abs(first - datetime.now()) < timedelta(seconds=5)
+    assert (
+        data.split(b"\n")[1][1:27]
+        == (first + timedelta(seconds=1)).isoformat(timespec="microseconds").encode()
+    )
+
+    batches = []
+    replay_file(str(path), batches.append, restamp=False)
+    assert b"".join(batches) == LINES
+
+
+def test_replay_file_pacing(tmp_path):
+    """Test fixed-rate and original-timing replay."""
+    path = tmp_path / "os.log"
+    path.write_bytes(LINES * 6)
+    started = time.monotonic()
+    lines, _ = replay_file(str(path), lambda batch: None, rate=100)
+    assert lines == 30
+    assert time.monotonic() - started >= 0.25
+
+    # Four seconds of timestamps replayed ten times faster
+    path.write_bytes(LINES)
+    sent = []
+    started = time.monotonic()
+    replay_file(
+        str(path), lambda batch: sent.append(time.monotonic() - started), speed=10
+    )
+    assert len(sent) == 5
+    assert 0.35 <= sent[-1] < 2
+
+
+def test_cli_replay(tmp_path):
+    """Test replaying files to an output file and to a syslog sink."""
+    path = tmp_path / "os_20240101.log"
+    path.write_bytes(LINES)
+    output = tmp_path / "out.log"
+    result = CliRunner().invoke(
+        replay_cli,
+        [
+            "replay",
+            str(path),
+            str(path),
+            "-o",
+            str(output),
+            "--no-restamp",
+            "--json-output",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["lines"] == 10
+    assert output.read_bytes() == LINES * 2
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    port = receiver.getsockname()[1]
+    result = CliRunner().invoke(
+        replay_cli, ["replay", str(path), "--sink", f"syslog+udp://127.0.0.1:{port}"]
+    )
+    assert result.exit_code == 0, result.output
+    messages = [receiver.recv(4096).decode() for _ in range(5)]
+    receiver.close()
+    assert all(" lg3k-os - - - [" in message for message in messages)
+    assert messages[4].endswith("] [INFO] [OS] line 4")
+
+    result = CliRunner().invoke(
+        replay_cli, ["replay", str(path), "--rate", "10", "--original-timing"]
+    )
+    assert result.exit_code != 0
@@ -0,0 +1,505 @@
+"""Tests for output sinks."""
+
+from datetime import datetime
+
+import pytest
+
+from lg3k.modules import smarthome, web_server
+
+
+def test_columnar_sink_parquet(tmp_path):
+    """Test writing records to Parquet with fixed row groups."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    from lg3k.sinks.columnar import ColumnarSink
+
+    path = tmp_path / "web.parquet"
+    sink = ColumnarSink(str(path), "parquet", row_group_size=4)
+    records = [web_server.generate_record() for _ in range(10)]
+    for start in range(0, 10, 4):
+        sink.write_batch("web_server", records[start : start + 4])
+    sink.close()
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_rows == 10
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("status").to_pylist() == [r["status"] for r in records]
+    assert isinstance(table.column("timestamp")[0].as_py(), datetime)
+
+
+def test_columnar_sink_arrow_heterogeneous(tmp_path):
+    """Test Arrow output keeps every declared field of heterogeneous records."""
+    pa = pytest.importorskip("pyarrow")
+    from lg3k.sinks.columnar import ColumnarSink
+
+    path = tmp_path / "smarthome.arrow"
+    sink = ColumnarSink(
+        str(path), "arrow", row_group_size=10, fields=smarthome.RECORD_FIELDS
+    )
+    records = [smarthome.generate_record() for _ in range(200)]
+    for start in range(0, 200, 10):
+        sink.write_batch("smarthome", records[start : start + 10])
+    sink.write_batch("smarthome", [{"timestamp": datetime.now(), "level": "INFO"}])
+    sink.close()
+
+    with pa.ipc.open_file(path) as reader:
+        table = reader.read_all()
+    assert table.num_rows == 201
+    assert table.schema.names == list(smarthome.RECORD_FIELDS)
+    rows = table.to_pylist()
+    for record, row in zip(records, rows):
+        assert {key: row[key] for key in record} == record
+    assert rows[200]["message"] is None
+
+
+def test_columnar_sink_inferred_schema(tmp_path):
+    """Test records outside an inferred schema are rejected, not dropped."""
+    pytest.importorskip("pyarrow")
+    from lg3k.sinks.columnar import ColumnarSink
+
+    sink = ColumnarSink(str(tmp_path / "x.parquet"), "parquet")
+    sink.write_batch("custom", [{"a": 1, "b": None}])
+    with pytest.raises(ValueError, match="c"):
+        sink.write_batch("custom", [{"a": 2, "c": "x"}])
+    with pytest.raises(ValueError):
+        sink.write_batch("custom", [{"a": 2, "b": "x"}])
+    sink.close()
+
+
+def test_columnar_sink_invalid_options(tmp_path):
+    """Test columnar sink validation."""
+    pytest.importorskip("pyarrow")
+    from lg3k.sinks.columnar import ColumnarSink
+
+    with pytest.raises(ValueError):
+        ColumnarSink(str(tmp_path / "x.csv"), "csv")
+    with pytest.raises(ValueError):
+        ColumnarSink(str(tmp_path / "x.parquet"), "parquet", row_group_size=0)
+
+
+def test_open_sink_unknown_scheme():
+    """Test opening a sink with an unsupported scheme."""
+    from lg3k.sinks import open_sink
+
+    with pytest.raises(ValueError, match="Unsupported sink"):
+        open_sink("ftp://example.com/logs")
+
+
+def test_sqlite_sink(tmp_path):
+    """Test bulk loading records into SQLite tables."""
+    import sqlite3
+
+    from lg3k.sinks import open_sink
+
+    path = tmp_path / "logs.db"
+    sink = open_sink(f"sqlite:///{path}", commit_every=5)
+    sink.write_batch("web_server", [web_server.generate_record() for _ in range(8)])
+    sink.write_batch("smarthome", [smarthome.generate_record() for _ in range(20)])
+    sink.write_batch("smarthome", [{"level": "INFO", "new_field": 1.5}])
+    sink.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute('SELECT COUNT(*) FROM "web_server"').fetchone()[0] == 8
+    assert conn.execute('SELECT COUNT(*) FROM "smarthome"').fetchone()[0] == 21
+    row = conn.execute('SELECT new_field FROM "smarthome" WHERE new_field IS NOT NULL')
+    assert row.fetchone()[0] == 1.5
+    timestamp = conn.execute('SELECT timestamp FROM "web_server"').fetchone()[0]
+    assert datetime.fromisoformat(timestamp)
+    conn.close()
+
+
+def test_sqlite_sink_declared_fields(tmp_path):
+    """Test column types from declared fields rather than the first batch."""
+    import sqlite3
+
+    from lg3k.sinks import open_sink
+    from lg3k.sinks.sql import DuckDBSink, SQLiteSink
+
+    path = str(tmp_path / "logs.db")
+    sink = SQLiteSink(path)
+    sink.declare("smarthome", smarthome.RECORD_FIELDS)
+    sink.write_batch("smarthome", [{"timestamp": datetime.now(), "level": "INFO"}])
+    sink.close()
+    conn = sqlite3.connect(path)
+    types = {row[1]: row[2] for row in conn.execute('PRAGMA table_info("smarthome")')}
+    conn.close()
+    assert list(types) == list(smarthome.RECORD_FIELDS)
+    assert types["brightness"] == "INTEGER"
+    assert types["temperature"] == "REAL"
+    assert types["location"] == "TEXT"
+
+    # The scheme picks the database whatever its case
+    duckdb_path = tmp_path / "logs.duckdb"
+    try:
+        sink = open_sink(f"DUCKDB:///{duckdb_path}")
+    except ImportError:
+        # Without duckdb, no SQLite file is written in its place
+        assert not duckdb_path.exists()
+    else:
+        assert isinstance(sink, DuckDBSink)
+        sink.close()
+
+
+def test_sqlite_sink_existing_table(tmp_path):
+    """Test appending to a table created by an earlier run."""
+    import sqlite3
+
+    from lg3k.sinks.sql import SQLiteSink
+
+    path = str(tmp_path / "logs.db")
+    for _ in range(2):
+        sink = SQLiteSink(path)
+        sink.write_batch("os", [{"level": "INFO", "message": "x"}])
+        sink.close()
+    sink = SQLiteSink(path)
+    sink.write_batch("os", [{"level": "INFO", "extra": 1}])
+    sink.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT COUNT(*) FROM "os"').fetchone()[0] == 3
+    conn.close()
+
+
+def test_parse_path():
+    """Test SQLAlchemy-style database URIs."""
+    from lg3k.sinks.sql import parse_path
+
+    assert parse_path("sqlite:///logs.db") == "logs.db"
+    assert parse_path("sqlite:////tmp/logs.db") == "/tmp/logs.db"
+    with pytest.raises(ValueError):
+        parse_path("sqlite://")
+
+
+def test_duckdb_sink(tmp_path):
+    """Test bulk loading records into DuckDB."""
+    duckdb = pytest.importorskip("duckdb")
+    from lg3k.sinks import open_sink
+
+    path = tmp_path / "logs.duckdb"
+    sink = open_sink(f"duckdb:///{path}")
+    sink.write_batch("firewall", [{"timestamp": datetime.now(), "port": 22}] * 3)
+    sink.close()
+    conn = duckdb.connect(str(path))
+    assert conn.execute('SELECT COUNT(*) FROM "firewall"').fetchone()[0] == 3
+    conn.close()
+
+
+def _tcp_server():
+    """Start a TCP server collecting everything received, for syslog tests."""
+    import socketserver
+    import threading
+
+    received = []
+    done = threading.Event()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            received.append(self.rfile.read())
+            done.set()
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received, done
+
+
+def _http_server(statuses=()):
+    """Start an HTTP server recording POSTs; replies with the given statuses first."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests = []
+    pending = list(statuses)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            requests.append((self.path, dict(self.headers), body))
+            status = pending.pop(0) if pending else 200
+            payload = b'{"errors": false}'
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, requests
+
+
+def test_syslog_sink_udp():
+    """Test sending syslog datagrams over UDP."""
+    import socket
+
+    from lg3k.sinks import open_sink
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    port = receiver.getsockname()[1]
+    sink = open_sink(f"syslog://127.0.0.1:{port}?batch_size=2&linger=0")
+    sink.write_batch("os", ["<30>1 already syslog", "plain line", "third"])
+    sink.close()
+
+    messages = [receiver.recv(4096).decode() for _ in range(3)]
+    receiver.close()
+    assert messages[0] == "<30>1 already syslog"
+    assert messages[1].startswith("<14>1 - ")
+    assert messages[1].endswith(" lg3k-os - - - plain line")
+    assert sink.sent == 3
+
+
+@pytest.mark.parametrize("framing", ["octet", "lf"])
+def test_syslog_sink_tcp_framing(framing):
+    """Test RFC 6587 framing over TCP."""
+    from lg3k.sinks import open_sink
+
+    server, received, done = _tcp_server()
+    port = server.server_address[1]
+    sink = open_sink(f"syslog+tcp://127.0.0.1:{port}?framing={framing}&linger=0")
+    sink.write_batch("api", ["<14>1 first", "<14>1 second"])
+    sink.close()
+    assert done.wait(5)
+    server.shutdown()
+    server.server_close()
+
+    data = b"".join(received)
+    if framing == "octet":
+        assert data == b"11 <14>1 first12 <14>1 second"
+    else:
+        assert data == b"<14>1 first\n<14>1 second\n"
+
+
+def test_syslog_sink_invalid_framing():
+    """Test syslog option validation."""
+    from lg3k.sinks import open_sink
+
+    with pytest.raises(ValueError, match="framing"):
+        open_sink("syslog+tcp://127.0.0.1?framing=nul")
+
+
+def test_http_sink_elasticsearch_bulk():
+    """Test Elasticsearch _bulk bodies on a pooled connection."""
+    import json
+
+    from lg3k.sinks import open_sink
+
+    server, requests = _http_server()
+    port = server.server_address[1]
+    sink = open_sink(
+        f"http://u:p@127.0.0.1:{port}/_bulk?index=logs-{{service}}&refresh=true"
+        "&batch_size=2&linger=0"
+    )
+    sink.write_batch("web_server", ['{"message":"json"}', "plain", "third"])
+    sink.close()
+    server.shutdown()
+    server.server_close()
+
+    assert len(requests) == 2
+    path, headers, body = requests[0]
+    assert path == "/_bulk?refresh=true"
+    assert headers["Content-Type"] == "application/x-ndjson"
+    assert headers["Authorization"].startswith("Basic ")
+    lines = body.decode().splitlines()
+    assert json.loads(lines[0]) == {"create": {"_index": "logs-web_server"}}
+    assert lines[1] == '{"message":"json"}'
+    assert json.loads(lines[3]) == {"message": "plain", "service.name": "web_server"}
+
+
+def test_http_sink_loki_and_retry():
+    """Test Loki push bodies and retrying server errors."""
+    import json
+
+    from lg3k.sinks import open_sink
+
+    server, requests = _http_server(statuses=[503, 500])
+    port = server.server_address[1]
+    sink = open_sink(f"http://127.0.0.1:{port}/loki/api/v1/push?linger=0&backoff=0.01")
+    assert sink.shape == "loki"
+    sink.write_batch("database", ["a", "b"])
+    sink.write_batch("api", ["c"])
+    sink.close()
+    server.shutdown()
+    server.server_close()
+
+    assert len(requests) == 3
+    body = json.loads(requests[-1][2])
+    streams = {s["stream"]["service"]: s["values"] for s in body["streams"]}
+    assert [value for _, value in streams["database"]] == ["a", "b"]
+    assert streams["api"][0][1] == "c"
+    assert int(streams["api"][0][0]) > int(streams["database"][1][0])
+
+
+def test_http_sink_client_error():
+    """Test that client errors are not retried."""
+    from lg3k.sinks.http import HTTPSink
+
+    server, requests = _http_server(statuses=[400])
+    port = server.server_address[1]
+    sink = HTTPSink(f"http://127.0.0.1:{port}/ingest", linger=0)
+    assert sink.shape == "ndjson"
+    sink.write_batch("nas", ["x"])
+    with pytest.raises(RuntimeError, match="400"):
+        sink.close()
+    server.shutdown()
+    server.server_close()
+    assert len(requests) == 1
+
+
+def test_batching_sink_linger():
+    """Test that the linger thread flushes idle buffers."""
+    import threading
+
+    from lg3k.sinks.base import BatchingSink
+
+    flushed = threading.Event()
+
+    class Recorder(BatchingSink):
+        def _send(self, batch):
+            self.batch = batch
+            flushed.set()
+
+    sink = Recorder(batch_size=100, linger=0.05)
+    sink.write_batch("os", ["line"])
+    assert flushed.wait(5)
+    assert sink.batch == [("os", "line")]
+    sink.close()
+
+
+def test_kafka_uri():
+    """Test Kafka URI parsing and the optional dependency."""
+    from lg3k.sinks import kafka
+
+    brokers, topic, options = kafka.parse_kafka_uri(
+        "kafka://a,b:9093/events-{service}?acks=all"
+    )
+    assert brokers == ["a:9092", "b:9093"]
+    assert topic == "events-{service}"
+    assert options == {"acks": "all"}
+    assert kafka.parse_kafka_uri("kafka://a")[1] == kafka.DEFAULT_TOPIC
+    with pytest.raises(ValueError):
+        kafka.parse_kafka_uri("kafka:///topic")
+    if not kafka.HAS_KAFKA:
+        with pytest.raises(ImportError):
+            kafka.create_sink("kafka://localhost:9092")
+
+
+class _ListSink:
+    """In-memory sink recording batches."""
+
+    def __init__(self, records, batch_size=100, delay=0.0, fail=False):
+        self.records = records
+        self.batch_size = batch_size
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.closed = False
+
+    def write_batch(self, service, items):
+        import time
+
+        time.sleep(self.delay)
+        if self.fail:
+            raise OSError("collector down")
+        self.batches.append((service, list(items)))
+
+    def close(self):
+        self.closed = True
+
+
+def test_fanout_sink_mixed():
+    """Test fanning records and rendered lines out to several sinks."""
+    from lg3k.sinks.fanout import FanoutSink
+
+    record_sink = _ListSink(records=True, batch_size=50)
+    line_sink = _ListSink(records=False)
+    fanout = FanoutSink([record_sink, line_sink])
+    assert fanout.records and fanout.batch_size == 50
+    fanout.register("os", lambda record: f"line {record['n']}")
+    for start in range(0, 10, 5):
+        fanout.write_batch("os", [{"n": n} for n in range(start, start + 5)])
+    fanout.close()
+
+    assert record_sink.closed and line_sink.closed
+    assert [r["n"] for _, batch in record_sink.batches for r in batch] == list(
+        range(10)
+    )
+    assert line_sink.batches[1] == ("os", [f"line {n}" for n in range(5, 10)])
+
+
+def test_fanout_sink_backpressure():
+    """Test that a slow sink holds back the producer once its queue is full."""
+    import time
+
+    from lg3k.sinks.fanout import FanoutSink
+
+    fast = _ListSink(records=False)
+    slow = _ListSink(records=False, delay=0.05)
+    fanout = FanoutSink([fast, slow], queue_size=1)
+    start = time.monotonic()
+    for n in range(6):
+        fanout.write_batch("api", [str(n)])
+        assert fanout.queue_depths[1] <= 1
+    assert time.monotonic() - start >= 0.15
+    fanout.close()
+    assert len(fast.batches) == len(slow.batches) == 6
+
+
+def test_fanout_sink_error():
+    """Test that sink errors reach the producer and close()."""
+    from lg3k.sinks.fanout import FanoutSink
+
+    good = _ListSink(records=False)
+    fanout = FanoutSink([good, _ListSink(records=False, fail=True)])
+    fanout.write_batch("nas", ["x"])
+    with pytest.raises(OSError, match="collector down"):
+        fanout.close()
+    assert good.closed
+    with pytest.raises(ValueError):
+        FanoutSink([])
+
+
+def test_dataset_sink(tmp_path):
+    """Test split shards, near-duplicate removal and the dataset card."""
+    import json
+
+    from lg3k.sinks.dataset import DatasetSink
+
+    sink = DatasetSink(str(tmp_path / "data"), shard_records=20, dedup_window=1000)
+    lines = [
+        json.dumps({"input": f"event {n % 50} at 12:00:{n % 60:02d}"})
+        for n in range(200)
+    ]
+    sink.write_batch("os", lines[:100])
+    sink.write_batch("api", lines[100:])
+    sink.close()
+
+    summary = sink.summary()
+    assert summary["services"]["os"] == {"records": 1, "duplicates": 99}
+    assert summary["services"]["api"] == {"records": 0, "duplicates": 100}
+    kept = []
+    for path in sink.paths:
+        with open(path) as f:
+            kept.extend(f.read().splitlines())
+    assert kept == [lines[0]]
+
+    sink = DatasetSink(str(tmp_path / "full"), shard_records=20, dedup_window=0)
+    words = [
+        json.dumps({"input": f"event {chr(97 + n % 26)}{n // 26}x"}) for n in range(300)
+    ]
+    sink.write_batch("os", words)
+    sink.close()
+    counts = {
+        name: stats["records"] for name, stats in sink.summary()["splits"].items()
+    }
+    assert sum(counts.values()) == 300
+    assert counts["train"] > counts["validation"] and counts["train"] > counts["test"]
+    assert sink.summary()["splits"]["train"]["shards"] == -(-counts["train"] // 20)
+    with open(sink.card_path) as f:
+        card = f.read()
+    assert f"| train | {counts['train']} |" in card
+    assert "path: train-*.jsonl" in card
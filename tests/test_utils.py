@@ -137,3 +137,864 @@ def test_update_progress_edge_cases():
     assert "100.0%" in update_progress(100, 100)
     # Test intermediate value
     assert "50.0%" in update_progress(50, 100)
+
+
+def test_progress_board():
+    """Test publishing to and sampling a progress board."""
+    from lg3k.utils.progress import ProgressBoard
+
+    board = ProgressBoard({"api": 100, "os": 0})
+    board.slot("api").publish(40)
+    board.slot("os").publish(7)
+    assert board.snapshot() == {"api": (40, 100), "os": (7, 0)}
+
+
+def test_progress_reporter():
+    """Test that the reporter renders changed snapshots and the final state."""
+    import threading
+
+    from lg3k.utils.progress import ProgressBoard, ProgressReporter
+
+    board = ProgressBoard({"api": 10})
+    snapshots = []
+    rendered = threading.Event()
+
+    def render(snapshot):
+        snapshots.append(snapshot)
+        rendered.set()
+
+    reporter = ProgressReporter(board, render, interval=0.01).start()
+    assert rendered.wait(5)
+    board.slot("api").publish(10)
+    reporter.stop()
+    assert snapshots[0] == {"api": (0, 10)}
+    assert snapshots[-1] == {"api": (10, 10)}
+    assert len(snapshots) == len({tuple(s.items()) for s in snapshots})
+
+
+def test_zipf_sampler_is_skewed():
+    """Test Zipf sampler favours low ranks."""
+    import random
+
+    from lg3k.utils.vocab import ZipfSampler
+
+    sampler = ZipfSampler(1000, exponent=1.2)
+    rng = random.Random(42)
+    samples = [sampler.sample(rng) for _ in range(5000)]
+    assert all(0 <= index < 1000 for index in samples)
+    assert samples.count(0) > samples.count(999)
+    assert samples.count(0) > 500
+
+
+def test_zipf_sampler_invalid():
+    """Test Zipf sampler argument validation."""
+    from lg3k.utils.vocab import ZipfSampler
+
+    with pytest.raises(ValueError):
+        ZipfSampler(0)
+    with pytest.raises(ValueError):
+        ZipfSampler(10, exponent=-1)
+
+
+def test_vocabulary_is_interned_and_stable():
+    """Test vocabularies are unique, interned and reproducible."""
+    import sys
+
+    from lg3k.utils.vocab import Vocabulary, _build_path, build_vocabulary
+
+    words = build_vocabulary(200, _build_path, seed=7)
+    assert len(set(words)) == 200
+    assert words == build_vocabulary(200, _build_path, seed=7)
+    vocab = Vocabulary(words)
+    assert len(vocab) == 200
+    assert vocab.sample() in words
+    assert vocab.words[0] is sys.intern(words[0])
+    # Builders with fewer distinct strings than requested fail
+    with pytest.raises(ValueError):
+        build_vocabulary(5, lambda rng, index: str(index % 3))
+
+
+def _web_record():
+    """Build a fixed web server record for renderer tests."""
+    return {
+        "timestamp": datetime(2024, 1, 2, 3, 4, 5, 600000),
+        "level": "ERROR",
+        "component": "WebServer",
+        "message": "test message",
+        "ip": "10.1.2.3",
+        "method": "GET",
+        "path": "/index.html?q=1",
+        "status": 404,
+        "bytes": 512,
+        "user": "user0000001",
+        "user_agent": "curl/7.1.0",
+    }
+
+
+def test_render_default():
+    """Test rendering the native log format."""
+    from lg3k.utils.formats import render_default
+
+    line = render_default(_web_record())
+    assert line == "[2024-01-02T03:04:05.600000] [ERROR] [WebServer] test message"
+
+
+def test_compile_renderer_apache_and_nginx():
+    """Test Apache and nginx combined log renderers."""
+    from lg3k.utils.formats import compile_renderer
+
+    apache = compile_renderer("apache", "web_server", hostname="host")
+    line = apache(_web_record())
+    assert line.startswith("10.1.2.3 - user0000001 [02/Jan/2024:03:04:05 ")
+    assert '"GET /index.html?q=1 HTTP/1.1" 404 512 "-" "curl/7.1.0"' in line
+    nginx = compile_renderer("nginx", "web_server", hostname="host")
+    assert nginx(_web_record()) == line + ' "-"'
+
+
+def test_compile_renderer_syslog():
+    """Test RFC 5424 syslog renderer priorities."""
+    from lg3k.utils.formats import compile_renderer
+
+    render = compile_renderer("syslog", "os", hostname="host")
+    line = render(_web_record())
+    # daemon facility (3) * 8 + error severity (3)
+    assert line.startswith("<27>1 2024-01-02T03:04:05.600000")
+    assert " host lg3k-os - WebServer - test message" in line
+
+
+def test_compile_renderer_firewall_formats():
+    """Test CEF and iptables renderers for firewall records."""
+    from lg3k.modules.firewall import generate_record
+    from lg3k.utils.formats import compile_renderer
+
+    record = generate_record()
+    cef = compile_renderer("cef", "firewall", record.keys(), hostname="host")
+    line = cef(record)
+    assert line.startswith("CEF:0|LG3K|lg3k-firewall|")
+    assert f"src={record['src_ip']}" in line
+    iptables = compile_renderer("iptables", "firewall", record.keys(), "host")
+    assert f"SRC={record['src_ip']}" in iptables(record)
+    assert f"PROTO={record['protocol']}" in iptables(record)
+
+
+def test_compile_renderer_ecs():
+    """Test ECS JSON renderer field mapping."""
+    from lg3k.utils.formats import compile_renderer
+
+    render = compile_renderer("ecs", "web_server", hostname="host")
+    document = json.loads(render(_web_record()))
+    assert document["log.level"] == "error"
+    assert document["source.ip"] == "10.1.2.3"
+    assert document["http.response.status_code"] == 404
+    assert document["service.name"] == "web_server"
+    assert document["@timestamp"].startswith("2024-01-02T03:04:05.600000")
+
+
+def test_compile_renderer_errors():
+    """Test renderer compilation errors."""
+    from lg3k.utils.formats import compile_renderer
+
+    with pytest.raises(ValueError, match="Unknown log format"):
+        compile_renderer("xml", "web_server")
+    with pytest.raises(ValueError, match="not supported for database"):
+        compile_renderer("apache", "database", ["timestamp", "message"])
+
+
+def test_compile_template():
+    """Test compiling a user-defined line template."""
+    from lg3k.utils.templates import compile_template
+
+    render = compile_template(
+        '{ts:%d/%b/%Y:%H:%M:%S} {ip} "{method} {path}" {status} {bytes:>6} {{x}}'
+    )
+    line = render(_web_record())
+    assert line == '02/Jan/2024:03:04:05 10.1.2.3 "GET /index.html?q=1" 404    512 {x}'
+    assert compile_template("{timestamp} {missing}")(_web_record()) == (
+        "2024-01-02T03:04:05.600000 -"
+    )
+
+
+def test_compile_template_mixed_records():
+    """Test format specs on fields only some records of a module have."""
+    from lg3k.modules import smarthome
+    from lg3k.utils.templates import compile_template
+
+    render = compile_template("{ts} {brightness:03d}", smarthome.RECORD_FIELDS)
+    lines = [render(smarthome.generate_record()) for _ in range(200)]
+    ends = {line.rsplit(" ", 1)[1] for line in lines}
+    assert "-" in ends
+    assert all(end == "-" or (len(end) == 3 and end.isdigit()) for end in ends)
+
+
+def test_compile_template_errors():
+    """Test template validation."""
+    from lg3k.utils.templates import compile_template
+
+    with pytest.raises(ValueError, match="Unknown template field"):
+        compile_template("{nope}", fields=["timestamp", "ip"])
+    with pytest.raises(ValueError, match="must be named"):
+        compile_template("{} {0}")
+    with pytest.raises(ValueError):
+        compile_template("{unclosed")
+
+
+def test_collect_and_render_metrics():
+    """Test collecting board counters and rendering Prometheus text."""
+    from lg3k.utils.metrics import collect_metrics, render_prometheus
+    from lg3k.utils.progress import ProgressBoard
+
+    board = ProgressBoard({"api": 100, 'we"ird': 0})
+    slot = board.slot("api")
+    slot.start()
+    slot.publish(50, 2000, 1_500_000_000, 4_000_000, 2)
+    slot.finish()
+    metrics = collect_metrics(board, lambda: [3, 0])
+    api = metrics["modules"]["api"]
+    assert api["lines"] == 50 and api["target"] == 100 and api["bytes"] == 2000
+    assert api["cpu_seconds"] == 1.5
+    assert api["avg_flush_ms"] == 2.0
+    assert api["lines_per_second"] > 0 and not api["running"]
+    assert metrics["modules"]['we"ird']["lines_per_second"] == 0.0
+
+    text = render_prometheus(metrics)
+    assert "# TYPE lg3k_lines_generated_total counter" in text
+    assert 'lg3k_lines_generated_total{module="api"} 50' in text
+    assert 'lg3k_bytes_written_total{module="we\\"ird"} 0' in text
+    assert 'lg3k_sink_queue_depth{sink="0"} 3' in text
+    assert text.endswith("\n")
+
+
+def test_metrics_server():
+    """Test scraping the /metrics endpoint."""
+    import urllib.error
+    import urllib.request
+
+    from lg3k.utils.metrics import MetricsServer
+    from lg3k.utils.progress import ProgressBoard
+
+    board = ProgressBoard({"os": 10})
+    board.slot("os").publish(7)
+    server = MetricsServer(board).start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert (
+                'lg3k_lines_generated_total{module="os"} 7' in response.read().decode()
+            )
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=5)
+    finally:
+        server.stop()
+
+
+def test_stats_file_writer(tmp_path):
+    """Test periodic JSON stats files."""
+    import json
+
+    from lg3k.utils.metrics import StatsFileWriter
+    from lg3k.utils.progress import ProgressBoard
+
+    board = ProgressBoard({"nas": 5})
+    path = tmp_path / "stats.json"
+    writer = StatsFileWriter(board, str(path), interval=60).start()
+    board.slot("nas").publish(5, 80)
+    writer.stop()
+    stats = json.loads(path.read_text())
+    assert stats["modules"]["nas"]["bytes"] == 80
+    assert not (tmp_path / "stats.json.tmp").exists()
+
+
+def test_profiling_classify():
+    """Test attributing profiled functions to pipeline stages."""
+    from lg3k.utils.profiling import classify
+
+    assert classify(("/x/lg3k/modules/api.py", 1, "generate_record")) == "generator"
+    assert classify(("/x/lg3k/utils/formats.py", 1, "render")) == "formatter"
+    assert classify(("/x/lg3k/sinks/http.py", 1, "_send")) == "writer"
+    assert classify(("~", 0, "<method 'write' of '_io.BufferedWriter' objects>")) == (
+        "writer"
+    )
+    assert classify(("~", 0, "<built-in method time.time>")) == "other"
+
+
+@pytest.mark.parametrize("mode,extension", [("cpu", ".prof"), ("mem", ".tracemalloc")])
+def test_run_profiler(tmp_path, mode, extension):
+    """Test per-module profiles and the merged summary."""
+    from lg3k.utils.profiling import RunProfiler
+
+    profiler = RunProfiler(mode, str(tmp_path / "profiles"), "run")
+    for module in ("api", "os"):
+        assert profiler.call(module, lambda n: sorted(range(n)), 1000)[-1] == 999
+    assert set(profiler.files) == {"api", "os"}
+    assert all(path.endswith(extension) for path in profiler.files.values())
+    summary = open(profiler.write_summary(top=5)).read()
+    assert f"lg3k {mode} profile of 2 module(s): api, os" in summary
+    if mode == "cpu":
+        assert "Time by stage" in summary and "generator" in summary
+    else:
+        assert "allocation sites" in summary and profiler.peaks["api"] > 0
+
+    with pytest.raises(ValueError):
+        RunProfiler("wall", str(tmp_path), "run")
+
+
+def test_service_rng():
+    """Test per-service seeded generators and state round trips."""
+    from lg3k.utils.rng import derive_seed, get_rng, get_state, seed_rng, set_state
+
+    assert derive_seed(1, "api") != derive_seed(1, "os")
+    assert derive_seed(1, "api") == derive_seed(1, "api")
+    assert get_rng("api") is get_rng("api")
+
+    first = [seed_rng("api", 42).random() for _ in range(3)]
+    assert [seed_rng("api", 42).random() for _ in range(3)] == first
+    assert seed_rng("os", 42).random() != first[0]
+
+    state = get_state("api")
+    draws = [get_rng("api").random() for _ in range(3)]
+    set_state("api", json.loads(json.dumps(state)))
+    assert [get_rng("api").random() for _ in range(3)] == draws
+
+
+def test_rng_turns():
+    """Test interleaved streams at a shared generator keep their own draws."""
+    import random
+    import threading
+
+    from lg3k.utils.rng import RngTurns
+
+    lock = threading.Lock()
+    first, second = (RngTurns("api", seed, lock) for seed in (1, 2))
+    draws = {1: [], 2: []}
+    for _ in range(3):
+        for seed, turns in ((1, first), (2, second)):
+            turns.acquire()
+            draws[seed].append(turns.rng.random())
+            turns.release()
+    for seed in (1, 2):
+        expected = random.Random(seed)
+        assert draws[seed] == [expected.random() for _ in range(3)]
+    assert not lock.locked()
+
+
+def test_checkpoint_manifest(tmp_path):
+    """Test recording and restoring service checkpoints."""
+    from lg3k.utils.checkpoint import CheckpointManifest
+    from lg3k.utils.rng import seed_rng
+    from lg3k.utils.timestamp import get_datetime, set_clock
+
+    path = str(tmp_path / "checkpoint.json")
+    manifest = CheckpointManifest(path, 5, 100, "2024-01-01T00:00:00")
+    rng = seed_rng("nas", 5)
+    checkpoint = manifest.module("nas", str(tmp_path / "nas.log"), interval=60)
+    checkpoint.restore()
+    assert get_datetime() == datetime(2024, 1, 1)
+    checkpoint.save(10, 100)
+    assert not (tmp_path / "checkpoint.json").exists()
+    checkpoint.save(10, 100, force=True)
+    expected = (rng.random(), get_datetime())
+
+    loaded = CheckpointManifest.load(path)
+    assert loaded.modules["nas"]["file"] == "nas.log"
+    resumed = loaded.module("nas", str(tmp_path / "nas.log"), interval=60)
+    assert (resumed.lines, resumed.offset) == (10, 100)
+    seed_rng("nas", 0)
+    resumed.restore()
+    assert (rng.random(), get_datetime()) == expected
+    set_clock(None)
+
+    with pytest.raises(FileNotFoundError):
+        CheckpointManifest.load(str(tmp_path / "missing.json"))
+
+
+@pytest.mark.parametrize(
+    "value,seconds", [("90", 90.0), ("90s", 90.0), ("15m", 900.0), ("1h30m", 5400.0)]
+)
+def test_parse_duration(value, seconds):
+    """Test parsing --duration values."""
+    from lg3k.utils.timestamp import parse_duration
+
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "2x", "h", "0", "1h 2"])
+def test_parse_duration_invalid(value):
+    """Test rejecting malformed durations."""
+    from lg3k.utils.timestamp import parse_duration
+
+    with pytest.raises(ValueError):
+        parse_duration(value)
+
+
+@pytest.mark.parametrize(
+    "value,size", [("1000", 1000), ("50GB", 50 * 1000**3), ("1.5 MiB", 1572864)]
+)
+def test_parse_size(value, size):
+    """Test parsing --target-bytes sizes."""
+    from lg3k.utils.budget import parse_size
+
+    assert parse_size(value) == size
+
+
+def test_parse_size_invalid():
+    """Test rejecting malformed sizes."""
+    from lg3k.utils.budget import parse_size
+
+    for value in ("", "10 apples", "0"):
+        with pytest.raises(ValueError):
+            parse_size(value)
+
+
+def test_allocate_bytes():
+    """Test splitting a byte budget by weight."""
+    from lg3k.utils.budget import allocate_bytes, build_targets
+
+    shares = allocate_bytes(100, {"a": 1, "b": 1, "c": 1})
+    assert sum(shares.values()) == 100
+    assert sorted(shares.values()) == [33, 33, 34]
+    assert allocate_bytes(1000, {"a": 3, "b": 1}) == {"a": 750, "b": 250}
+    with pytest.raises(ValueError):
+        allocate_bytes(10, {"a": 0})
+
+    services = ["api", "os", "nas"]
+    assert build_targets([], services, {}) is None
+    assert build_targets(["os=5kb"], services, {}) == {"os": 5000}
+    assert build_targets(["3000", "os=1000"], services, {"api": 3}) == {
+        "os": 1000,
+        "api": 1500,
+        "nas": 500,
+    }
+    with pytest.raises(ValueError):
+        build_targets(["printer=1kb"], services, {})
+
+
+def test_fit_line():
+    """Test cutting the last line to an exact byte size."""
+    from lg3k.utils.budget import fit_line
+
+    assert fit_line("hello world\n", 6) == "hello\n"
+    assert fit_line("x\n", 1) == "\n"
+    line = fit_line("café au lait\n", 5)
+    assert line == "caf \n" and len(line.encode("utf-8")) == 5
+
+
+def test_file_digest(tmp_path):
+    """Test streaming checksums, timestamp ranges and the manifest file."""
+    import hashlib
+
+    from lg3k.utils.digest import FileDigest, write_manifest
+
+    path = tmp_path / "os.log"
+    path.write_bytes(b"first\nsecond\n")
+    digest = FileDigest(str(path))
+    digest.update_from_file(6)
+    digest.update(b"second\n")
+    digest.lines = 2
+    digest.observe(datetime(2024, 1, 2), datetime(2024, 1, 3))
+    digest.observe(datetime(2024, 1, 1), None)
+    entry = digest.summary()
+    assert entry["checksum"] == (
+        hashlib.blake2b(b"first\nsecond\n", digest_size=32).hexdigest()
+    )
+    assert entry["bytes"] == 13
+    assert entry["min_timestamp"] == "2024-01-01T00:00:00"
+    assert entry["max_timestamp"] == "2024-01-03T00:00:00"
+
+    manifest = write_manifest(str(tmp_path), [entry])
+    assert json.loads(open(manifest).read())["files"][0]["file"] == "os.log"
+    with pytest.raises(ValueError):
+        FileDigest(str(path), "md5")
+
+
+def test_file_digest_xxhash_missing(tmp_path):
+    """Test that xxHash checksums require the xxhash package."""
+    from lg3k.utils import digest
+
+    if digest.HAS_XXHASH:
+        pytest.skip("xxhash is installed")
+    with pytest.raises(ImportError):
+        digest.FileDigest(str(tmp_path / "os.log"), "xxh64")
+
+
+def test_load_plan(tmp_path):
+    """Test loading a plan with defaults and byte targets."""
+    from lg3k.utils.plan import load_plan
+
+    path = tmp_path / "plan.json"
+    path.write_text(
+        json.dumps(
+            {
+                "defaults": {"format": "syslog"},
+                "services": {
+                    "web_server": {"count": 900, "shards": 3},
+                    "api": {"target_bytes": "1KiB", "format": "ecs"},
+                },
+            }
+        )
+    )
+    plan = load_plan(str(path))
+    assert list(plan) == ["web_server", "api"]
+    assert plan["web_server"] == {"format": "syslog", "count": 900, "shards": 3}
+    assert plan["api"] == {"format": "ecs", "target_bytes": 1024}
+
+
+@pytest.mark.parametrize(
+    "services",
+    [
+        {},
+        {"api": {"cuont": 5}},
+        {"api": {"count": "5"}},
+        {"api": {"shards": 0}},
+        {"api": {"rate": True}},
+        {"api": []},
+    ],
+)
+def test_load_plan_invalid(tmp_path, services):
+    """Test that malformed plans are rejected."""
+    from lg3k.utils.plan import load_plan
+
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"services": services}))
+    with pytest.raises(ValueError):
+        load_plan(str(path))
+
+
+def test_plan_scheduling():
+    """Test shard splitting, job estimates and longest-first ordering."""
+    from lg3k.utils.plan import estimate_seconds, lpt_order, split_evenly
+
+    assert split_evenly(10, 3) == [4, 3, 3]
+    assert sum(split_evenly(9_000_001, 8)) == 9_000_001
+    assert estimate_seconds(1000, rate=10) == 100
+    assert estimate_seconds(None, 150_000) == estimate_seconds(1000)
+    assert estimate_seconds(None) == float("inf")
+    costs = {"printer": 1.0, "web_server": 90.0, "api": 9.0, "os": 1.0}
+    assert lpt_order(costs) == ["web_server", "api", "printer", "os"]
+
+
+def test_dataset_splits_and_keys():
+    """Test split parsing, near-duplicate keys and the bounded key window."""
+    from lg3k.utils.dataset import RecentKeys, content_key, parse_splits, split_for
+
+    assert parse_splits("8,1,1") == {"train": 0.8, "validation": 0.1, "test": 0.1}
+    for text in ("80,20", "a,b,c", "0,0,0", "90,-5,15"):
+        with pytest.raises(ValueError):
+            parse_splits(text)
+
+    first = content_key("[2024-01-01T00:00:00] DB SELECT on users - 0.5s")
+    second = content_key("[2024-03-09T10:11:12.123456] DB SELECT on users - 1.25s")
+    assert first == second
+    assert content_key("DB SELECT on posts") != content_key("DB SELECT on users")
+
+    splits = parse_splits("80,10,10")
+    keys = [content_key(f"record {chr(65 + n % 26)}{n // 26}x") for n in range(2000)]
+    chosen = [split_for(key, splits) for key in keys]
+    assert chosen == [split_for(key, splits) for key in keys]
+    assert 1450 < chosen.count("train") < 1750
+    assert split_for(2**64 - 1, splits) == "test"
+    assert split_for(0, parse_splits("0,0,1")) == "test"
+
+    window = RecentKeys(2)
+    assert [window.seen(key) for key in (1, 2, 1, 3, 1)] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+    with pytest.raises(ValueError):
+        RecentKeys(0)
+
+
+def test_bloom_filter():
+    """Test Bloom filter sizing, duplicate detection and timestamp stripping."""
+    from lg3k.utils.dedup import BloomFilter, strip_timestamps
+
+    bloom = BloomFilter(10_000, 0.01)
+    # About 9.6 bits and 7 hash functions per line for a 1% rate
+    assert 11_000 < bloom.memory_bytes < 13_000
+    assert bloom.hashes == 7
+    filling = sum(bloom.add(f"line {n}") for n in range(10_000))
+    assert filling < 100
+    assert all(bloom.add(f"line {n}") for n in range(0, 10_000, 7))
+    # New lines are dropped at about the configured rate
+    false_positives = sum(bloom.add(f"other {n}") for n in range(1000))
+    assert false_positives < 30
+    assert bloom.items == 11_000 - filling - false_positives
+    assert 0 < bloom.ratio < 1
+    for capacity, rate in ((0, 0.1), (10, 0), (10, 1)):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity, rate)
+
+    assert (
+        strip_timestamps("[2024-01-01T10:00:00.123456] [INFO] [OS] boot")
+        == strip_timestamps("[2025-06-30T23:59:59] [INFO] [OS] boot")
+        == "[] [INFO] [OS] boot"
+    )
+    assert strip_timestamps('1.2.3.4 - - [22/Mar/2024:15:30:45 +0000] "GET /"') == (
+        '1.2.3.4 - - +0000] "GET /"'
+    )
+
+
+def test_token_packer():
+    """Test token counting, the histogram and greedy sequence packing."""
+    import json
+
+    from lg3k.utils.tokens import TokenPacker, bucket, load_tokenizer
+
+    assert [bucket(n) for n in (0, 1, 2, 3, 64, 65)] == [1, 1, 2, 4, 64, 128]
+    whitespace = load_tokenizer("whitespace")
+    assert whitespace.count_batch(["GET /api - 200", ""]) == [5, 0]
+    assert load_tokenizer("bytes").count_batch(["é1"]) == [3]
+    with pytest.raises(ValueError, match="Unknown tokenizer"):
+        load_tokenizer("missing.json")
+
+    def record(words):
+        return json.dumps({"instruction": "a", "input": "b", "output": words}) + "\n"
+
+    # 15 tokens of template and 3 more for a one-word record
+    lines = [record("x"), record("x " * 20), record("x"), record("x " * 60)]
+    counter = TokenPacker(whitespace)
+    assert counter.process(lines) == lines
+    assert counter.summary()["histogram"] == {"32": 2, "64": 1, "128": 1}
+
+    packer = TokenPacker(whitespace, pack_tokens=60)
+    assert packer.separator_tokens == 0
+    sequences = [json.loads(line) for line in packer.process(lines[:3])]
+    assert [(s["num_tokens"], s["num_records"]) for s in sequences] == [(55, 2)]
+    sequences += [json.loads(line) for line in packer.process(lines[3:], True)]
+    assert [(s["num_tokens"], s["num_records"]) for s in sequences] == [
+        (55, 2),
+        (18, 1),
+        (77, 1),
+    ]
+    assert sequences[0]["text"].count("### Instruction:") == 2
+    summary = packer.summary()
+    assert summary["sequences"] == 3 and summary["oversized_records"] == 1
+    assert summary["records"] == 4 and summary["max_tokens"] == 77
+
+
+def test_file_tokenizer(tmp_path):
+    """Test counting tokens with a tokenizer.json file."""
+    tokenizers = pytest.importorskip("tokenizers")
+
+    from lg3k.utils.tokens import load_tokenizer
+
+    model = tokenizers.models.WordLevel({"[UNK]": 0, "db": 1}, unk_token="[UNK]")
+    tokenizer = tokenizers.Tokenizer(model)
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    path = tmp_path / "tokenizer.json"
+    tokenizer.save(str(path))
+    assert load_tokenizer(str(path)).count_batch(["db query slow", "db"]) == [3, 1]
+
+
+def test_analysis_rules():
+    """Test compiling present, values and ranges rules."""
+    from lg3k.utils.analysis import compile_rule
+
+    present = compile_rule({"field": "path", "present": "Path {path}."})
+    assert present({"path": "/x"}) == "Path /x."
+    assert present({}) is None
+
+    values = compile_rule(
+        {"field": "code", "values": {1: "One of {n}.", 2: "Two."}, "requires": "n"}
+    )
+    assert values({"code": 1, "n": 3}) == "One of 3."
+    assert values({"code": 2}) is None
+    assert values({"code": 3, "n": 3}) is None
+    assert values({"code": [1], "n": 3}) is None
+
+    ranges = compile_rule(
+        {"field": "usage", "ranges": [(0, "Low."), (50, None), (90, "High {usage}.")]}
+    )
+    assert [ranges({"usage": value}) for value in (-1, 0, 49.9, 50, 90, 100)] == [
+        None,
+        "Low.",
+        "Low.",
+        None,
+        "High 90.",
+        "High 100.",
+    ]
+    assert ranges({"usage": "90"}) is None
+    with pytest.raises(ValueError):
+        compile_rule({"field": "usage", "ranges": [(2, "a"), (1, "b")]})
+    with pytest.raises(ValueError):
+        compile_rule({"field": "usage"})
+
+
+def test_analysis_modules():
+    """Test that every module's records get explanations."""
+    import sys
+
+    from lg3k.main import load_modules
+    from lg3k.utils.analysis import ANALYSIS_RULES, analyze
+    from lg3k.utils.rng import seed_rng
+
+    modules = load_modules()
+    assert set(ANALYSIS_RULES) == set(modules)
+    for name, generate_log in modules.items():
+        seed_rng(name, 3)
+        record_func = sys.modules[generate_log.__module__].generate_record
+        explained = [analyze(name, record_func()) for _ in range(50)]
+        assert sum(map(bool, explained)) >= 25, name
+
+    record = {"level": "ERROR", "status": 503, "method": "GET", "endpoint": "/x"}
+    assert analyze("api", record) == [
+        "This is a error level event that requires immediate attention.",
+        "Server-side error detected in API response.",
+    ]
+    assert analyze("unknown", {"level": "WARNING"}) == [
+        "This is a warning that may require investigation."
+    ]
+
+
+def test_instruction_sampler():
+    """Test weighted instruction pools and per-level sampling."""
+    import random
+
+    from lg3k.utils.instructions import (
+        INSTRUCTION_TASKS,
+        InstructionPool,
+        get_instruction_sampler,
+    )
+
+    pool = InstructionPool([("a", 3), ("b", 1)])
+    rng = random.Random(1)
+    draws = [pool.sample(rng) for _ in range(4000)]
+    assert 2700 < draws.count("a") < 3300
+    with pytest.raises(ValueError):
+        InstructionPool([])
+    with pytest.raises(ValueError):
+        InstructionPool([("a", 0)])
+
+    sample = get_instruction_sampler("firewall")
+    rng = random.Random(2)
+    ordinary = [sample({"level": "INFO"}, rng) for _ in range(2000)]
+    severe = [sample({"level": "ERROR"}, rng) for _ in range(2000)]
+    assert len(set(ordinary)) > 10
+    assert all("{" not in text for text in ordinary)
+    assert "Analyze this log message and explain its meaning" in ordinary
+    assert any("firewall" in text for text in ordinary)
+    # Only errors are asked the paraphrases that presume a failure
+    error_prompt = INSTRUCTION_TASKS["root_cause"]["severe_templates"][0]
+    assert error_prompt in severe
+    assert error_prompt not in ordinary
+    # Unknown modules use the default subject
+    assert "{" not in get_instruction_sampler("custom")({}, rng)
+
+
+def test_instruction_sampler_ordinary_records():
+    """Test INFO records never get instructions presuming a failure."""
+    import random
+    import re
+
+    from lg3k.utils.instructions import MODULE_SUBJECTS, get_instruction_sampler
+
+    rng = random.Random(3)
+    failure = re.compile(r"error|alert|fail|fix|problem", re.IGNORECASE)
+    for module in MODULE_SUBJECTS:
+        sample = get_instruction_sampler(module)
+        for _ in range(2000):
+            for level in ("INFO", "WARNING"):
+                assert not failure.search(sample({"level": level}, rng)), module
+
+
+def test_merge_streams():
+    """Test merging ordered streams, with ties broken by stream order."""
+    from lg3k.utils.merge import merge_streams
+
+    first = [(1, "a1"), (3, "a3"), (3, "a3b")]
+    second = [(0, "b0"), (3, "b3"), (5, "b5")]
+    merged = list(merge_streams([iter(first), iter(second), iter([])]))
+    assert [line for _, _, line in merged] == ["b0", "a1", "a3", "a3b", "b3", "b5"]
+    assert [index for _, index, _ in merged] == [1, 0, 0, 0, 1, 1]
+
+
+def test_restamper():
+    """Test shifting timestamps in each layout without changing line lengths."""
+    from datetime import timedelta
+
+    from lg3k.utils.restamp import Restamper, detect_layout
+
+    lines = {
+        "iso": b"[2024-01-01T23:59:59.500000] [INFO] [API] at 2024-01-01T00:00:00\n",
+        "apache": b'1.2.3.4 - - [31/Dec/2023:23:59:59 +0000] "GET / HTTP/1.1" 200\n',
+        "cef": b"CEF:0|LG3K|lg3k-firewall|0.7.0|FW|x|3|rt=Jan 01 2024 00:00:00 dvc\n",
+        "bsd": b"Jan  9 10:00:00 host kernel: [LG3K-DROP] SRC=1.2.3.4\n",
+    }
+    expected = {
+        "iso": b"[2024-01-02T00:00:01.500000] [INFO] [API] at 2024-01-01T00:00:02\n",
+        "apache": b'1.2.3.4 - - [01/Jan/2024:00:00:01 +0000] "GET / HTTP/1.1" 200\n',
+        "cef": b"CEF:0|LG3K|lg3k-firewall|0.7.0|FW|x|3|rt=Jan 01 2024 00:00:02 dvc\n",
+        "bsd": b"Jan  9 10:00:02 host kernel: [LG3K-DROP] SRC=1.2.3.4\n",
+    }
+    shift = timedelta(seconds=2)
+    for name, line in lines.items():
+        assert detect_layout(line).name == name
+        restamped = Restamper(shift).apply(line * 2 + b"no timestamp\n")
+        assert restamped == expected[name] * 2 + b"no timestamp\n"
+    assert detect_layout(b"no timestamps here\n") is None
+    assert Restamper(shift).apply(b"plain\n") == b"plain\n"
+
+    # LLM records repeat the timestamp in their input and output
+    record = (
+        b'{"input": "[2024-01-01T10:00:00.250000] [INFO] [API] GET /", '
+        b'"output": "Logged at 2024-01-01T10:00:00.250000"}\n'
+    )
+    assert Restamper(shift).apply(record) == record.replace(
+        b"T10:00:00.25", b"T10:00:02.25"
+    )
+
+
+def test_corpus_cache(tmp_path, monkeypatch):
+    """Test storing, replaying with re-stamping and LRU eviction."""
+    import os
+    from datetime import timedelta
+
+    from lg3k.utils import cache as cache_module
+    from lg3k.utils.cache import CorpusCache, cache_key, entry_range
+
+    source = tmp_path / "api.log"
+    source.write_bytes(
+        b"[2024-01-01T00:00:00] [INFO] [API] one\n"
+        b"[2024-01-01T00:00:05] [INFO] [API] two\n"
+    )
+    meta = {
+        "lines": 2,
+        "start": "2024-01-01T00:00:00",
+        "min_timestamp": "2024-01-01T00:00:00",
+        "max_timestamp": "2024-01-01T00:00:05",
+    }
+    cache = CorpusCache(str(tmp_path / "cache"), 1 << 20)
+    key = cache_key({"service": "api", "seed": 1})
+    assert key == cache_key({"seed": 1, "service": "api"})
+    assert cache.lookup(key) is None
+    cache.store(key, str(source), meta)
+    assert cache.lookup(key) == meta
+
+    # Chunks smaller than a line are re-stamped whole lines at a time
+    monkeypatch.setattr(cache_module, "REPLAY_CHUNK_SIZE", 7)
+    chunks = []
+    output = tmp_path / "replay.log"
+    written = cache.replay(key, str(output), timedelta(hours=1), chunks.append)
+    assert (
+        output.read_bytes()
+        == b"".join(chunks)
+        == (
+            b"[2024-01-01T01:00:00] [INFO] [API] one\n"
+            b"[2024-01-01T01:00:05] [INFO] [API] two\n"
+        )
+    )
+    assert written == os.path.getsize(source)
+    assert entry_range(meta, timedelta(hours=1))[1].hour == 1
+
+    # The least recently used entry is evicted first
+    cache.store("b", str(source), meta)
+    os.utime(tmp_path / "cache" / f"{key}.gz", (1000, 1000))
+    os.utime(tmp_path / "cache" / "b.gz", (2000, 2000))
+    cache.lookup(key)
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / "cache" / "b.gz")
+    cache.store("c", str(source), meta)
+    assert cache.lookup("b") is None
+    assert cache.lookup(key) is not None and cache.lookup("c") is not None